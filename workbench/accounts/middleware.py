@@ -1,15 +1,55 @@
+import re
+from contextvars import ContextVar
+
 from django.conf import settings
 from django.contrib import messages
-from django.db import connections
+from django.db import connections, transaction
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils.translation import activate, gettext as _
 
 
+_user_name = ContextVar("audit_user_name", default=None)
+_WRITE_RE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|TRUNCATE)\b", re.IGNORECASE)
+
+
 def set_user_name(username):
-    connections["default"].cursor().execute(
-        "SET SESSION application_name TO %s", [username]
-    )
+    """
+    Set the user name recorded by the audit trigger
+
+    The name is not sent to the database right away but as a transaction-local
+    setting before the first write of each transaction, so that read-only
+    requests do not pay for it and no session state is left on the connection.
+    """
+    # The marker is registered as an on_commit callback when the setting has
+    # been sent; it vanishes when the transaction or savepoint ends, exactly
+    # like the transaction-local setting itself.
+    _user_name.set((username, lambda: None))
+    connection = connections["default"]
+    if _audit_user_name not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_audit_user_name)
+
+
+def _set_config(connection, username):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('workbench.user_name', %s, true)", [username])
+
+
+def _audit_user_name(execute, sql, params, many, context):
+    if (state := _user_name.get()) is None or not _WRITE_RE.search(sql):
+        return execute(sql, params, many, context)
+
+    username, marker = state
+    connection = context["connection"]
+    if not connection.in_atomic_block:
+        with transaction.atomic(using=connection.alias):
+            _set_config(connection, username)
+            return execute(sql, params, many, context)
+
+    if not any(func is marker for _sids, func, _robust in connection.run_on_commit):
+        _set_config(connection, username)
+        transaction.on_commit(marker, using=connection.alias)
+    return execute(sql, params, many, context)
 
 
 def user_middleware(get_response):
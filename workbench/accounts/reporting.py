@@ -22,14 +22,12 @@ def logged_hours(user):
         """
 WITH sq AS (
     SELECT
-        date_trunc('week', rendered_on) AS week,
-        project.type AS type,
+        date_trunc('week', day) AS week,
+        project_type AS type,
         SUM(hours) AS hours
-    FROM logbook_loggedhours hours
-    LEFT JOIN projects_service service ON hours.service_id=service.id
-    LEFT JOIN projects_project project ON service.project_id=project.id
-    WHERE rendered_by_id=%s AND rendered_on>=%s
-    GROUP BY week, project.type
+    FROM logbook_logbookday
+    WHERE user_id=%s AND day>=%s AND hours_count>0
+    GROUP BY week, project_type
 )
 SELECT series.week, sq.type, COALESCE(sq.hours, 0)
 FROM generate_series(%s, %s, '7 days') AS series(week)
@@ -90,14 +88,12 @@ ORDER BY series.week
         """
 WITH sq AS (
     SELECT
-        date_trunc('week', rendered_on) AS week,
+        date_trunc('week', day) AS week,
         customer.name AS customer,
         SUM(hours) AS hours
-    FROM logbook_loggedhours hours
-    LEFT JOIN projects_service service ON hours.service_id=service.id
-    LEFT JOIN projects_project project ON service.project_id=project.id
-    LEFT JOIN contacts_organization customer ON project.customer_id=customer.id
-    WHERE rendered_by_id=%s AND rendered_on>=%s
+    FROM logbook_logbookday d
+    LEFT JOIN contacts_organization customer ON d.customer_id=customer.id
+    WHERE d.user_id=%s AND d.day>=%s AND d.hours_count>0
     GROUP BY week, customer.name
 )
 SELECT series.week, COALESCE(sq.customer, ''), COALESCE(sq.hours, 0)
@@ -5,6 +5,7 @@ from workbench.accounts import views
 from workbench.accounts.forms import TeamForm, TeamSearchForm, UserSearchForm
 from workbench.accounts.models import Team, User
 from workbench.planning.views import team_planning, user_planning
+from workbench.tools.routing import reporting
 
 
 urlpatterns = [
@@ -40,7 +41,7 @@ urlpatterns = [
     ),
     path(
         "users/<int:pk>/statistics/",
-        views.ProfileView.as_view(),
+        reporting()(views.ProfileView.as_view()),
         name="accounts_user_statistics",
     ),
     # Teams
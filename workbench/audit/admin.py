@@ -1,9 +1,17 @@
+import datetime as dt
 import json
 
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from workbench.accounts.models import User
-from workbench.audit.models import LoggedAction, audit_user_id
+from workbench.audit.models import (
+    LoggedAction,
+    RequestSample,
+    TaskRun,
+    audit_user_id,
+)
+from workbench.audit.reporting import BUCKETS, repeated_queries, request_statistics
 from workbench.tools import admin
 
 
@@ -58,3 +66,38 @@ class LoggedActionAdmin(admin.ModelAdmin):
         return json.dumps(
             instance.changed_fields if instance.action == "U" else instance.row_data
         )
+
+
+@admin.register(RequestSample)
+class RequestSampleAdmin(admin.ModelAdmin):
+    date_hierarchy = "created_at"
+    list_display = [
+        "created_at",
+        "method",
+        "url_name",
+        "status_code",
+        "duration",
+        "query_count",
+        "query_time",
+    ]
+    list_filter = ["method", "status_code"]
+    search_fields = ["url_name"]
+
+    def changelist_view(self, request, extra_context=None):
+        since = timezone.now() - dt.timedelta(days=1)
+        return super().changelist_view(
+            request,
+            extra_context={
+                "buckets": BUCKETS,
+                "request_statistics": request_statistics(since),
+                "repeated_queries": repeated_queries(since),
+                **(extra_context or {}),
+            },
+        )
+
+
+@admin.register(TaskRun)
+class TaskRunAdmin(admin.ModelAdmin):
+    date_hierarchy = "created_at"
+    list_display = ["created_at", "name", "status", "started_at", "duration"]
+    list_filter = ["status", "name"]
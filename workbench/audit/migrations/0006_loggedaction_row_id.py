@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+with open(
+    os.path.join(settings.BASE_DIR, "workbench", "tools", "audit.sql"), encoding="utf-8"
+) as f:
+    AUDIT_SQL = f.read()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0005_auto_20210206_1042"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+ALTER TABLE audit_logged_actions ADD COLUMN IF NOT EXISTS row_id bigint;
+
+UPDATE audit_logged_actions
+SET row_id=(row_data -> 'id')::bigint
+WHERE row_id IS NULL AND (row_data -> 'id') ~ '^[0-9]+$';
+            """,
+            migrations.RunSQL.noop,
+        ),
+        # Creates the index and updates the trigger function
+        migrations.RunSQL(AUDIT_SQL),
+        migrations.AddField(
+            model_name="loggedaction",
+            name="row_id",
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
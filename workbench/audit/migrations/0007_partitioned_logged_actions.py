@@ -0,0 +1,167 @@
+from django.db import migrations
+
+
+# The audit log is partitioned by retention class (the audited table) and
+# each retention class by month, so that pruning old entries only has to drop
+# whole partitions. Tables which are not listed are kept forever and end up
+# in audit_logged_actions_default. See workbench.audit.tasks.prune_audit.
+PARTITIONING_SQL = """\
+CREATE OR REPLACE FUNCTION audit_create_partition(parent text, month date)
+RETURNS void AS $$
+DECLARE
+  _from date = date_trunc('month', month)::date;
+  _until date = (date_trunc('month', month) + interval '1 month')::date;
+  _name text = parent || '_' || to_char(month, 'YYYYMM');
+BEGIN
+  IF to_regclass(_name) IS NOT NULL THEN
+    RETURN;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+    _name, parent
+  );
+  -- Move entries which ended up in the default partition in the meantime
+  EXECUTE format(
+    'WITH moved AS ('
+    '  DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *'
+    ') INSERT INTO %I SELECT * FROM moved',
+    parent || '_default', _from, _until, _name
+  );
+  EXECUTE format(
+    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    parent, _name, _from, _until
+  );
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_create_partitions(parent text, months integer)
+RETURNS void AS $$
+BEGIN
+  PERFORM audit_create_partition(parent, m::date)
+  FROM generate_series(
+    date_trunc('month', current_date),
+    date_trunc('month', current_date) + months * interval '1 month',
+    interval '1 month'
+  ) m;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_drop_partitions(parent text, cutoff timestamptz)
+RETURNS void AS $$
+DECLARE
+  _name text;
+BEGIN
+  FOR _name IN
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON i.inhrelid=c.oid
+    WHERE
+      i.inhparent=parent::regclass
+      AND c.relname ~ '_[0-9]{6}$'
+      AND to_date(right(c.relname, 6), 'YYYYMM') + interval '1 month' <= cutoff
+  LOOP
+    EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, _name);
+    EXECUTE format('DROP TABLE %I', _name);
+  END LOOP;
+  EXECUTE format(
+    'DELETE FROM %I WHERE created_at < %L', parent || '_default', cutoff
+  );
+END
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE audit_logged_actions RENAME TO audit_logged_actions_old;
+ALTER TABLE audit_logged_actions_old
+  RENAME CONSTRAINT audit_logged_actions_pkey TO audit_logged_actions_old_pkey;
+ALTER SEQUENCE audit_logged_actions_event_id_seq OWNED BY NONE;
+
+CREATE TABLE audit_logged_actions (
+    event_id bigint NOT NULL DEFAULT nextval('audit_logged_actions_event_id_seq'),
+    table_name text not null,
+    user_name text,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    action TEXT NOT NULL CHECK (action IN ('I','D','U', 'T')),
+    row_data hstore,
+    changed_fields hstore,
+    row_id bigint,
+    PRIMARY KEY (event_id, table_name, created_at)
+) PARTITION BY LIST (table_name);
+
+CREATE TABLE audit_logged_actions_2y PARTITION OF audit_logged_actions
+FOR VALUES IN (
+  'accounts_specialistfield',
+  'accounts_team',
+  'logbook_break',
+  'logbook_loggedcost',
+  'logbook_loggedhours'
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_logged_actions_3y PARTITION OF audit_logged_actions
+FOR VALUES IN (
+  'awt_absence',
+  'invoices_projectedinvoice',
+  'deals_value',
+  'deals_deal',
+  'deals_contribution',
+  'awt_holiday',
+  'planning_milestone',
+  'planning_plannedwork'
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_logged_actions_5y PARTITION OF audit_logged_actions
+FOR VALUES IN (
+  'contacts_organization',
+  'contacts_person',
+  'contacts_phonenumber',
+  'contacts_emailaddress',
+  'contacts_postaladdress',
+  'projects_service',
+  'projects_project',
+  'offers_offer',
+  'invoices_recurringinvoice',
+  'invoices_invoice'
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_logged_actions_default PARTITION OF audit_logged_actions DEFAULT;
+CREATE TABLE audit_logged_actions_2y_default PARTITION OF audit_logged_actions_2y DEFAULT;
+CREATE TABLE audit_logged_actions_3y_default PARTITION OF audit_logged_actions_3y DEFAULT;
+CREATE TABLE audit_logged_actions_5y_default PARTITION OF audit_logged_actions_5y DEFAULT;
+
+SELECT audit_create_partition(parent, m::date)
+FROM
+  unnest(ARRAY[
+    'audit_logged_actions_2y',
+    'audit_logged_actions_3y',
+    'audit_logged_actions_5y'
+  ]) parent,
+  generate_series(
+    date_trunc('month', COALESCE(
+      (SELECT MIN(created_at) FROM audit_logged_actions_old), current_date
+    )),
+    date_trunc('month', current_date) + interval '3 months',
+    interval '1 month'
+  ) m;
+
+INSERT INTO audit_logged_actions (
+  event_id, table_name, user_name, created_at, action, row_data, changed_fields, row_id
+)
+SELECT
+  event_id, table_name, user_name, created_at, action, row_data, changed_fields, row_id
+FROM audit_logged_actions_old;
+
+DROP TABLE audit_logged_actions_old;
+
+CREATE INDEX logged_actions_relid_idx ON audit_logged_actions(table_name);
+CREATE INDEX logged_actions_row_id_idx ON audit_logged_actions(table_name, row_id);
+CREATE INDEX logged_actions_action_tstamp_tx_stm_idx ON audit_logged_actions(created_at);
+CREATE INDEX logged_actions_action_idx ON audit_logged_actions(action);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0006_loggedaction_row_id"),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITIONING_SQL),
+    ]
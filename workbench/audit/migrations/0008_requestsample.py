@@ -0,0 +1,59 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0007_partitioned_logged_actions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestSample",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="created at"
+                    ),
+                ),
+                ("url_name", models.CharField(max_length=200, verbose_name="URL name")),
+                ("method", models.CharField(max_length=10, verbose_name="method")),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(verbose_name="status code"),
+                ),
+                ("duration", models.FloatField(verbose_name="duration (ms)")),
+                (
+                    "query_count",
+                    models.PositiveIntegerField(verbose_name="query count"),
+                ),
+                ("query_time", models.FloatField(verbose_name="query time (ms)")),
+                (
+                    "slowest_queries",
+                    models.JSONField(default=list, verbose_name="slowest queries"),
+                ),
+                (
+                    "repeated_queries",
+                    models.JSONField(default=list, verbose_name="repeated queries"),
+                ),
+            ],
+            options={
+                "verbose_name": "request sample",
+                "verbose_name_plural": "request samples",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(fields=["created_at"], name="audit_request_created_at")
+                ],
+            },
+        ),
+    ]
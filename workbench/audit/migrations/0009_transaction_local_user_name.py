@@ -0,0 +1,21 @@
+import os
+
+from django.conf import settings
+from django.db import migrations
+
+
+with open(
+    os.path.join(settings.BASE_DIR, "workbench", "tools", "audit.sql"), encoding="utf-8"
+) as f:
+    AUDIT_SQL = f.read()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0008_requestsample"),
+    ]
+
+    operations = [
+        # Updates the trigger function to read the transaction-local user name
+        migrations.RunSQL(AUDIT_SQL),
+    ]
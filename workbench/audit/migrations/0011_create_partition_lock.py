@@ -0,0 +1,80 @@
+from django.db import migrations
+
+
+# Lock the default partition while moving its entries into a newly created
+# monthly partition and attaching it.
+FUNCTION_SQL = """\
+CREATE OR REPLACE FUNCTION audit_create_partition(parent text, month date)
+RETURNS void AS $$
+DECLARE
+  _from date = date_trunc('month', month)::date;
+  _until date = (date_trunc('month', month) + interval '1 month')::date;
+  _name text = parent || '_' || to_char(month, 'YYYYMM');
+BEGIN
+  IF to_regclass(_name) IS NOT NULL THEN
+    RETURN;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+    _name, parent
+  );
+  -- Keep concurrent inserts out of the default partition until the new
+  -- partition is attached, otherwise rows of the month inserted after
+  -- moving the entries would make the ATTACH PARTITION fail.
+  EXECUTE format(
+    'LOCK TABLE %I IN SHARE ROW EXCLUSIVE MODE', parent || '_default'
+  );
+  -- Move entries which ended up in the default partition in the meantime
+  EXECUTE format(
+    'WITH moved AS ('
+    '  DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *'
+    ') INSERT INTO %I SELECT * FROM moved',
+    parent || '_default', _from, _until, _name
+  );
+  EXECUTE format(
+    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    parent, _name, _from, _until
+  );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION audit_create_partition(parent text, month date)
+RETURNS void AS $$
+DECLARE
+  _from date = date_trunc('month', month)::date;
+  _until date = (date_trunc('month', month) + interval '1 month')::date;
+  _name text = parent || '_' || to_char(month, 'YYYYMM');
+BEGIN
+  IF to_regclass(_name) IS NOT NULL THEN
+    RETURN;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+    _name, parent
+  );
+  -- Move entries which ended up in the default partition in the meantime
+  EXECUTE format(
+    'WITH moved AS ('
+    '  DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *'
+    ') INSERT INTO %I SELECT * FROM moved',
+    parent || '_default', _from, _until, _name
+  );
+  EXECUTE format(
+    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    parent, _name, _from, _until
+  );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0010_taskrun"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTION_SQL, REVERSE_SQL),
+    ]
@@ -3,6 +3,7 @@ import re
 from django.contrib.postgres.fields import HStoreField
 from django.db import models
 from django.db.models import Q
+from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
@@ -14,6 +15,10 @@ class LoggedActionQuerySet(models.QuerySet):
     def with_data(self, **kwargs):
         queryset = self
         for key, value in kwargs.items():
+            if key == "id":
+                # Indexed together with table_name, see audit.sql
+                queryset = queryset.filter(row_id=value)
+                continue
             queryset = queryset.filter(
                 Q(**{"row_data__%s" % key: value})
                 | Q(**{"changed_fields__%s" % key: value})
@@ -41,6 +46,7 @@ class LoggedAction(models.Model):
     action = models.CharField(max_length=1, choices=ACTION_TYPES)
     row_data = HStoreField(null=True)
     changed_fields = HStoreField(null=True)
+    row_id = models.BigIntegerField(null=True)
 
     objects = LoggedActionQuerySet.as_manager()
 
@@ -63,3 +69,63 @@ class LoggedAction(models.Model):
         if self.changed_fields:
             return self.row_data | self.changed_fields
         return self.row_data
+
+
+class RequestSample(models.Model):
+    """
+    Timings of a single request, recorded by
+    ``workbench.middleware.request_instrumentation``
+    """
+
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
+    url_name = models.CharField(_("URL name"), max_length=200)
+    method = models.CharField(_("method"), max_length=10)
+    status_code = models.PositiveSmallIntegerField(_("status code"))
+    duration = models.FloatField(_("duration (ms)"))
+    query_count = models.PositiveIntegerField(_("query count"))
+    query_time = models.FloatField(_("query time (ms)"))
+    slowest_queries = models.JSONField(_("slowest queries"), default=list)
+    repeated_queries = models.JSONField(_("repeated queries"), default=list)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at"], name="audit_request_created_at")]
+        verbose_name = _("request sample")
+        verbose_name_plural = _("request samples")
+
+    def __str__(self):
+        return f"{self.method} {self.url_name} ({self.duration:.0f} ms)"
+
+
+class TaskRun(models.Model):
+    """
+    Outcome of a single task of ``./manage.py fairy_tasks``
+    """
+
+    SUCCESS = "success"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    STATUS_CHOICES = [
+        (SUCCESS, _("success")),
+        (FAILED, _("failed")),
+        (SKIPPED, _("skipped")),
+    ]
+
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
+    name = models.CharField(_("name"), max_length=100)
+    status = models.CharField(_("status"), max_length=10, choices=STATUS_CHOICES)
+    started_at = models.DateTimeField(_("started at"), blank=True, null=True)
+    duration = models.FloatField(_("duration (ms)"), blank=True, null=True)
+    error = models.TextField(_("error"), blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["name", "-created_at"], name="audit_taskrun_name")
+        ]
+        verbose_name = _("task run")
+        verbose_name_plural = _("task runs")
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
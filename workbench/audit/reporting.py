@@ -0,0 +1,73 @@
+from workbench.tools.reporting import query
+
+
+# Upper bounds (in milliseconds) of the request duration histogram buckets
+BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def request_statistics(since):
+    """
+    Return request counts, duration percentiles, SQL statistics and a
+    duration histogram per URL name, most expensive URL names first
+    """
+    rows = query(
+        """
+SELECT
+    url_name,
+    COUNT(*) AS requests,
+    SUM(duration) AS total,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY duration) AS p50,
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY duration) AS p95,
+    MAX(duration) AS max,
+    AVG(query_count) AS queries,
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY query_count) AS queries_p95,
+    AVG(query_time) AS query_time
+FROM audit_requestsample
+WHERE created_at >= %s
+GROUP BY url_name
+ORDER BY total DESC
+        """,
+        [since],
+        as_dict=True,
+    )
+
+    histograms = {row["url_name"]: [0] * (len(BUCKETS) + 1) for row in rows}
+    for url_name, bucket, count in query(
+        """
+SELECT url_name, width_bucket(duration, %s::float8[]), COUNT(*)
+FROM audit_requestsample
+WHERE created_at >= %s
+GROUP BY 1, 2
+        """,
+        [BUCKETS, since],
+    ):
+        histograms[url_name][bucket] = count
+
+    for row in rows:
+        row["histogram"] = histograms[row["url_name"]]
+    return rows
+
+
+def repeated_queries(since, *, limit=20):
+    """
+    Return statements executed repeatedly in the same request, which are most
+    often N+1 queries, ordered by their total number of executions
+    """
+    return query(
+        """
+SELECT
+    url_name,
+    statement->>'sql' AS sql,
+    COUNT(*) AS requests,
+    SUM((statement->>'count')::integer) AS executions,
+    MAX((statement->>'count')::integer) AS max_per_request,
+    SUM((statement->>'time')::float) AS time
+FROM audit_requestsample, jsonb_array_elements(repeated_queries) statement
+WHERE created_at >= %s
+GROUP BY 1, 2
+ORDER BY executions DESC
+LIMIT %s
+        """,
+        [since, limit],
+        as_dict=True,
+    )
@@ -1,45 +1,36 @@
-from workbench.audit.models import LoggedAction
+import datetime as dt
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from workbench.audit.models import RequestSample
 from workbench.tools.validation import in_days
 
 
+# Partitions of the audit log and the number of days their entries are kept.
+# The tables belonging to each partition are defined in the
+# audit.0007_partitioned_logged_actions migration.
+RETENTION = {
+    "audit_logged_actions_2y": 2 * 366,
+    "audit_logged_actions_3y": 3 * 366,
+    "audit_logged_actions_5y": 5 * 366,
+}
+
+
 def prune_audit():
-    LoggedAction.objects.filter(
-        table_name__in=[
-            "accounts_specialistfield",
-            "accounts_team",
-            "logbook_break",
-            "logbook_loggedcost",
-            "logbook_loggedhours",
-        ],
-        created_at__lt=in_days(-2 * 366),
-    ).delete()
+    with connections["default"].cursor() as cursor:
+        for partition, days in RETENTION.items():
+            # Drop monthly partitions older than the cutoff
+            cursor.execute(
+                "SELECT audit_drop_partitions(%s, %s)", [partition, in_days(-days)]
+            )
+            # Make sure partitions exist for the upcoming months
+            cursor.execute("SELECT audit_create_partitions(%s, 3)", [partition])
 
-    LoggedAction.objects.filter(
-        table_name__in=[
-            "awt_absence",
-            "invoices_projectedinvoice",
-            "deals_value",
-            "deals_deal",
-            "deals_contribution",
-            "awt_holiday",
-            "planning_milestone",
-            "planning_plannedwork",
-        ],
-        created_at__lt=in_days(-3 * 366),
-    ).delete()
 
-    LoggedAction.objects.filter(
-        table_name__in=[
-            "contacts_organization",
-            "contacts_person",
-            "contacts_phonenumber",
-            "contacts_emailaddress",
-            "contacts_postaladdress",
-            "projects_service",
-            "projects_project",
-            "offers_offer",
-            "invoices_recurringinvoice",
-            "invoices_invoice",
-        ],
-        created_at__lt=in_days(-5 * 366),
+def prune_request_samples():
+    RequestSample.objects.filter(
+        created_at__lt=timezone.now()
+        - dt.timedelta(days=settings.REQUEST_INSTRUMENTATION_DAYS)
     ).delete()
@@ -1,7 +1,11 @@
-from django.test import TestCase
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, modify_settings, override_settings
 
 from workbench import factories
-from workbench.audit.models import LoggedAction
+from workbench.audit.models import LoggedAction, RequestSample
+from workbench.middleware import QueryRecorder
 
 
 class AuditTest(TestCase):
@@ -29,3 +33,46 @@ class AuditTest(TestCase):
         self.assertNotContains(response, "<select")
         self.assertNotContains(response, "<textarea")
         # print(response, response.content.decode("utf-8"))
+
+    @modify_settings(
+        MIDDLEWARE={"prepend": "workbench.middleware.request_instrumentation"}
+    )
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_request_instrumentation(self):
+        """Request timings are recorded and aggregated per URL name"""
+        user = factories.UserFactory.create(is_admin=True)
+        self.client.force_login(user)
+        factories.ProjectFactory.create()
+
+        self.client.get("/projects/")
+        sample = RequestSample.objects.get()
+        self.assertEqual(sample.url_name, "projects_project_list")
+        self.assertEqual(sample.status_code, 200)
+        self.assertGreater(sample.query_count, 0)
+        self.assertTrue(sample.slowest_queries)
+
+        response = self.client.get("/admin/audit/requestsample/")
+        self.assertContains(response, "projects_project_list")
+
+        stdout = io.StringIO()
+        call_command("request_statistics", stdout=stdout)
+        self.assertIn("projects_project_list", stdout.getvalue())
+
+    def test_query_recorder(self):
+        """Statements differing only in the length of parameter lists repeat"""
+        recorder = QueryRecorder()
+
+        def execute(sql, params, many, context):
+            return None
+
+        for count in range(1, 7):
+            sql = "SELECT * FROM t WHERE id IN (%s)" % ", ".join(["%s"] * count)
+            recorder(execute, sql, [], many=False, context={})
+        recorder(execute, "SELECT 1", [], many=False, context={})
+
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(len(recorder.slowest_queries()), 5)
+        self.assertEqual(
+            [(row["sql"], row["count"]) for row in recorder.repeated_queries()],
+            [("SELECT * FROM t WHERE id IN (%s, ...)", 6)],
+        )
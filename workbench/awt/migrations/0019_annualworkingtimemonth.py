@@ -0,0 +1,245 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def decimal(verbose_name, **kwargs):
+    return models.DecimalField(
+        decimal_places=10,
+        default=0,
+        max_digits=20,
+        verbose_name=verbose_name,
+        **kwargs,
+    )
+
+
+# Mark snapshots as stale when something changes which influences the annual
+# working time of a user. Running sums and vacation days corrections depend on
+# all months of a year so the whole year is invalidated. Employment changes and
+# changes to the working time model of users invalidate all years.
+TRIGGERS_SQL = """\
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate(_users integer[], _days date[])
+RETURNS void AS $$
+BEGIN
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM unnest(_users, _days) AS k(user_id, day)
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=k.user_id
+    AND (k.day IS NULL OR date_trunc('year', s.month)=date_trunc('year', k.day));
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate_wtm(_wtm integer, _day date)
+RETURNS void AS $$
+BEGIN
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM accounts_user u
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=u.id
+    AND u.working_time_model_id=_wtm
+    AND date_trunc('year', s.month)=date_trunc('year', _day);
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_snapshot_loggedhours() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_snapshot_invalidate(
+      ARRAY(SELECT rendered_by_id FROM old_rows ORDER BY id),
+      ARRAY(SELECT rendered_on FROM old_rows ORDER BY id)
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_snapshot_invalidate(
+      ARRAY(SELECT rendered_by_id FROM new_rows ORDER BY id),
+      ARRAY(SELECT rendered_on FROM new_rows ORDER BY id)
+    );
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_snapshot_insert ON logbook_loggedhours;
+CREATE TRIGGER awt_snapshot_insert AFTER INSERT ON logbook_loggedhours
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE awt_snapshot_loggedhours();
+
+DROP TRIGGER IF EXISTS awt_snapshot_update ON logbook_loggedhours;
+CREATE TRIGGER awt_snapshot_update AFTER UPDATE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE awt_snapshot_loggedhours();
+
+DROP TRIGGER IF EXISTS awt_snapshot_delete ON logbook_loggedhours;
+CREATE TRIGGER awt_snapshot_delete AFTER DELETE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE awt_snapshot_loggedhours();
+
+CREATE OR REPLACE FUNCTION awt_snapshot_row() RETURNS trigger AS $$
+BEGIN
+  IF TG_TABLE_NAME = 'awt_absence' THEN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM awt_snapshot_invalidate(ARRAY[OLD.user_id], ARRAY[OLD.starts_on]);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM awt_snapshot_invalidate(ARRAY[NEW.user_id], ARRAY[NEW.starts_on]);
+    END IF;
+  ELSIF TG_TABLE_NAME = 'awt_vacationdaysoverride' THEN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM awt_snapshot_invalidate(
+        ARRAY[OLD.user_id], ARRAY[make_date(OLD.year, 1, 1)]
+      );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM awt_snapshot_invalidate(
+        ARRAY[NEW.user_id], ARRAY[make_date(NEW.year, 1, 1)]
+      );
+    END IF;
+  ELSIF TG_TABLE_NAME = 'awt_holiday' THEN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM awt_snapshot_invalidate_wtm(OLD.working_time_model_id, OLD.date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM awt_snapshot_invalidate_wtm(NEW.working_time_model_id, NEW.date);
+    END IF;
+  ELSIF TG_TABLE_NAME = 'awt_year' THEN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM awt_snapshot_invalidate_wtm(
+        OLD.working_time_model_id, make_date(OLD.year, 1, 1)
+      );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM awt_snapshot_invalidate_wtm(
+        NEW.working_time_model_id, make_date(NEW.year, 1, 1)
+      );
+    END IF;
+  ELSIF TG_TABLE_NAME = 'accounts_user' THEN
+    PERFORM awt_snapshot_invalidate(ARRAY[NEW.id], ARRAY[NULL::date]);
+  ELSE
+    -- awt_employment: Employments may span several years
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM awt_snapshot_invalidate(ARRAY[OLD.user_id], ARRAY[NULL::date]);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM awt_snapshot_invalidate(ARRAY[NEW.user_id], ARRAY[NULL::date]);
+    END IF;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_snapshot_absence ON awt_absence;
+CREATE TRIGGER awt_snapshot_absence AFTER INSERT OR UPDATE OR DELETE ON awt_absence
+  FOR EACH ROW EXECUTE PROCEDURE awt_snapshot_row();
+
+DROP TRIGGER IF EXISTS awt_snapshot_override ON awt_vacationdaysoverride;
+CREATE TRIGGER awt_snapshot_override
+  AFTER INSERT OR UPDATE OR DELETE ON awt_vacationdaysoverride
+  FOR EACH ROW EXECUTE PROCEDURE awt_snapshot_row();
+
+DROP TRIGGER IF EXISTS awt_snapshot_holiday ON awt_holiday;
+CREATE TRIGGER awt_snapshot_holiday AFTER INSERT OR UPDATE OR DELETE ON awt_holiday
+  FOR EACH ROW EXECUTE PROCEDURE awt_snapshot_row();
+
+DROP TRIGGER IF EXISTS awt_snapshot_year ON awt_year;
+CREATE TRIGGER awt_snapshot_year AFTER INSERT OR UPDATE OR DELETE ON awt_year
+  FOR EACH ROW EXECUTE PROCEDURE awt_snapshot_row();
+
+DROP TRIGGER IF EXISTS awt_snapshot_employment ON awt_employment;
+CREATE TRIGGER awt_snapshot_employment
+  AFTER INSERT OR UPDATE OR DELETE ON awt_employment
+  FOR EACH ROW EXECUTE PROCEDURE awt_snapshot_row();
+
+DROP TRIGGER IF EXISTS awt_snapshot_user ON accounts_user;
+CREATE TRIGGER awt_snapshot_user AFTER UPDATE ON accounts_user
+  FOR EACH ROW WHEN (OLD.working_time_model_id IS DISTINCT FROM NEW.working_time_model_id)
+  EXECUTE PROCEDURE awt_snapshot_row();
+"""
+
+DROP_TRIGGERS_SQL = """\
+DROP TRIGGER IF EXISTS awt_snapshot_insert ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS awt_snapshot_update ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS awt_snapshot_delete ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS awt_snapshot_absence ON awt_absence;
+DROP TRIGGER IF EXISTS awt_snapshot_override ON awt_vacationdaysoverride;
+DROP TRIGGER IF EXISTS awt_snapshot_holiday ON awt_holiday;
+DROP TRIGGER IF EXISTS awt_snapshot_year ON awt_year;
+DROP TRIGGER IF EXISTS awt_snapshot_employment ON awt_employment;
+DROP TRIGGER IF EXISTS awt_snapshot_user ON accounts_user;
+DROP FUNCTION IF EXISTS awt_snapshot_row();
+DROP FUNCTION IF EXISTS awt_snapshot_loggedhours();
+DROP FUNCTION IF EXISTS awt_snapshot_invalidate_wtm(integer, date);
+DROP FUNCTION IF EXISTS awt_snapshot_invalidate(integer[], date[]);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0026_specialistfield_expected_hourly_rate"),
+        ("awt", "0018_holiday_working_time_model"),
+        ("logbook", "0022_logbookday"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnnualWorkingTimeMonth",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="month")),
+                ("percentage", decimal("percentage")),
+                ("available_vacation_days", decimal("available vacation days")),
+                ("target", decimal("target")),
+                ("hours", decimal("hours")),
+                ("absence_vacation", decimal("vacation")),
+                ("absence_sickness", decimal("sickness")),
+                ("absence_paid", decimal("paid leave")),
+                ("absence_school", decimal("school attendance")),
+                ("absence_correction", decimal("working time correction")),
+                ("vacation_days_correction", decimal("vacation days correction")),
+                (
+                    "vacation_days_balance",
+                    decimal(
+                        "vacation days balance",
+                        help_text="Remaining vacation days at the end of the month.",
+                    ),
+                ),
+                ("monthly_sum", decimal("monthly sum")),
+                ("running_sum", decimal("running sum")),
+                (
+                    "is_stale",
+                    models.BooleanField(default=True, verbose_name="is stale"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "annual working time month",
+                "verbose_name_plural": "annual working time months",
+                "ordering": ["user", "month"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "month"),
+                        name="awt_annualworkingtimemonth_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+
+# Invalidations take shared advisory locks on the users whose snapshots they
+# mark as stale. annual_working_time() takes exclusive locks on the same keys
+# before recomputing snapshots, so invalidations wait for recomputations to
+# commit and recomputations wait for in-flight invalidations.
+FUNCTIONS_SQL = """\
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate(_users integer[], _days date[])
+RETURNS void AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'awt_annualworkingtimemonth'::regclass::oid::integer, u.user_id
+  )
+  FROM (SELECT DISTINCT unnest(_users) AS user_id ORDER BY 1) AS u;
+
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM unnest(_users, _days) AS k(user_id, day)
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=k.user_id
+    AND (k.day IS NULL OR date_trunc('year', s.month)=date_trunc('year', k.day));
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate_wtm(_wtm integer, _day date)
+RETURNS void AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'awt_annualworkingtimemonth'::regclass::oid::integer, u.id
+  )
+  FROM (SELECT id FROM accounts_user WHERE working_time_model_id=_wtm ORDER BY id) AS u;
+
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM accounts_user u
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=u.id
+    AND u.working_time_model_id=_wtm
+    AND date_trunc('year', s.month)=date_trunc('year', _day);
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate(_users integer[], _days date[])
+RETURNS void AS $$
+BEGIN
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM unnest(_users, _days) AS k(user_id, day)
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=k.user_id
+    AND (k.day IS NULL OR date_trunc('year', s.month)=date_trunc('year', k.day));
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_snapshot_invalidate_wtm(_wtm integer, _day date)
+RETURNS void AS $$
+BEGIN
+  UPDATE awt_annualworkingtimemonth s SET is_stale=true
+  FROM accounts_user u
+  WHERE
+    NOT s.is_stale
+    AND s.user_id=u.id
+    AND u.working_time_model_id=_wtm
+    AND date_trunc('year', s.month)=date_trunc('year', _day);
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("awt", "0019_annualworkingtimemonth"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTIONS_SQL, REVERSE_SQL),
+    ]
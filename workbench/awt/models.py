@@ -304,3 +304,100 @@ class VacationDaysOverride(models.Model):
     @property
     def pretty_days(self):
         return days(self.days, plus_sign=self.type == self.Type.RELATIVE)
+
+
+class AnnualWorkingTimeMonthQuerySet(models.QuerySet):
+    def stale(self):
+        return self.filter(is_stale=True)
+
+
+class AnnualWorkingTimeMonth(models.Model):
+    """
+    Monthly annual working time snapshot of a user
+
+    Rows are marked as stale by database triggers when logged hours, absences,
+    employments, holidays, years or vacation days overrides change; see
+    ``awt.0019_annualworkingtimemonth``. Stale rows are recomputed by
+    ``reporting.annual_working_time``.
+    """
+
+    SNAPSHOT_FIELDS = [
+        "percentage",
+        "available_vacation_days",
+        "target",
+        "hours",
+        "absence_vacation",
+        "absence_sickness",
+        "absence_paid",
+        "absence_school",
+        "absence_correction",
+        "vacation_days_correction",
+        "vacation_days_balance",
+        "monthly_sum",
+        "running_sum",
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name=_("user"),
+        related_name="+",
+    )
+    month = models.DateField(_("month"))
+    percentage = models.DecimalField(
+        _("percentage"), max_digits=20, decimal_places=10, default=0
+    )
+    available_vacation_days = models.DecimalField(
+        _("available vacation days"), max_digits=20, decimal_places=10, default=0
+    )
+    target = models.DecimalField(
+        _("target"), max_digits=20, decimal_places=10, default=0
+    )
+    hours = models.DecimalField(_("hours"), max_digits=20, decimal_places=10, default=0)
+    absence_vacation = models.DecimalField(
+        _("vacation"), max_digits=20, decimal_places=10, default=0
+    )
+    absence_sickness = models.DecimalField(
+        _("sickness"), max_digits=20, decimal_places=10, default=0
+    )
+    absence_paid = models.DecimalField(
+        _("paid leave"), max_digits=20, decimal_places=10, default=0
+    )
+    absence_school = models.DecimalField(
+        _("school attendance"), max_digits=20, decimal_places=10, default=0
+    )
+    absence_correction = models.DecimalField(
+        _("working time correction"), max_digits=20, decimal_places=10, default=0
+    )
+    vacation_days_correction = models.DecimalField(
+        _("vacation days correction"), max_digits=20, decimal_places=10, default=0
+    )
+    vacation_days_balance = models.DecimalField(
+        _("vacation days balance"),
+        max_digits=20,
+        decimal_places=10,
+        default=0,
+        help_text=_("Remaining vacation days at the end of the month."),
+    )
+    monthly_sum = models.DecimalField(
+        _("monthly sum"), max_digits=20, decimal_places=10, default=0
+    )
+    running_sum = models.DecimalField(
+        _("running sum"), max_digits=20, decimal_places=10, default=0
+    )
+    is_stale = models.BooleanField(_("is stale"), default=True)
+
+    objects = AnnualWorkingTimeMonthQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month"], name="awt_annualworkingtimemonth_unique"
+            )
+        ]
+        ordering = ["user", "month"]
+        verbose_name = _("annual working time month")
+        verbose_name_plural = _("annual working time months")
+
+    def __str__(self):
+        return f"{self.user}: {local_date_format(self.month, fmt='F Y')}"
@@ -2,6 +2,7 @@ import datetime as dt
 from collections import defaultdict
 from decimal import ROUND_UP, Decimal
 
+from django.db import connection, transaction
 from django.db.models import Sum
 from django.db.models.functions import ExtractMonth
 from django.utils.datastructures import OrderedSet
@@ -10,6 +11,7 @@ from workbench.accounts.features import FEATURES
 from workbench.accounts.models import User
 from workbench.awt.models import (
     Absence,
+    AnnualWorkingTimeMonth,
     Employment,
     Holiday,
     VacationDaysOverride,
@@ -19,6 +21,7 @@ from workbench.awt.utils import days_per_month, monthly_days
 from workbench.invoices.utils import next_valid_day
 from workbench.logbook.models import LoggedHours
 from workbench.tools.formats import Z1, Z2
+from workbench.tools.routing import primary
 
 
 class Months(dict):
@@ -59,6 +62,7 @@ class Months(dict):
             "hours": [Z1 for i in range(12)],
             "holiday_public": [Z1 for i in range(12)],
             "holiday_company": [Z1 for i in range(12)],
+            "vacation_days_balance": [Z1 for i in range(12)],
             "employments": OrderedSet(),
         }
         return value
@@ -117,46 +121,92 @@ def holiday_days_by_month(year, working_time_model_id):
     return result, objects
 
 
-def annual_working_time(year, *, users):  # noqa: C901
-    absences = defaultdict(
-        lambda: {
-            "absence_vacation": [],
-            "absence_sickness": [],
-            "absence_paid": [],
-            "absence_school": [],
-            "absence_correction": [],
-        }
-    )
-    months = Months(year=year, users=users)
-    vacation_days_credit = defaultdict(lambda: Z1)
-    dpm = days_per_month(year)
+def _absences_time(data):
+    return [
+        sum(
+            (
+                data["absence_vacation"][i],
+                data["absence_sickness"][i],
+                data["absence_paid"][i],
+                data["absence_school"][i],
+                data["absence_correction"][i],
+                data["vacation_days_correction"][i],
+            ),
+            Z1,
+        )
+        * data["year"].working_time_per_day
+        for i in range(12)
+    ]
 
-    overrides = {
-        override.user_id: override
-        for override in VacationDaysOverride.objects.filter(year=year, user__in=users)
-    }
 
-    # Compute holidays once per working time model.
-    _empty_holidays = {Holiday.Kind.PUBLIC: [Z1] * 12, Holiday.Kind.COMPANY: [Z1] * 12}
-    holidays_by_wtm = {}
-    holiday_list_by_wtm = {}
-    for wtm_id in {y.working_time_model_id for y in months.year_by_wtm.values()}:
-        h, hl = holiday_days_by_month(year, wtm_id)
-        holidays_by_wtm[wtm_id] = h
-        holiday_list_by_wtm[wtm_id] = hl
+def _working_time(data):
+    at = _absences_time(data)
+    return [sum((data["hours"][i], at[i]), Z1) for i in range(12)]
+
+
+def _monthly_sums(data):
+    wt = _working_time(data)
+    return [wt[i] - data["target"][i] for i in range(12)]
+
 
-    for employment in Employment.objects.filter(
-        user__in=months.users_with_wtm
-    ).order_by("-date_from"):
+def _available_vacation_days(data, override):
+    available = sum(data["available_vacation_days"])
+    if override is None:
+        return available
+    if override.type == override.Type.ABSOLUTE:
+        return override.days
+    if override.type == override.Type.RELATIVE:
+        return available + override.days
+    raise Exception(f"Unknown override type {override.type}")  # pragma: no cover
+
+
+def _split_absence(absence):
+    starts_on = absence.starts_on
+    ends_on = absence.ends_on or starts_on
+
+    if starts_on.month == ends_on.month:
+        return [(absence.starts_on.month, absence.days)]
+
+    total = Decimal((ends_on - starts_on).days + 1)
+    one_day = dt.timedelta(days=1)
+
+    calendar_days_per_month = [
+        (
+            m,
+            Decimal(
+                (
+                    # end of absence or last day of this month
+                    min(ends_on, next_valid_day(ends_on.year, m, 99) - one_day)
+                    # start of absence or first day of this month
+                    - max(starts_on, dt.date(starts_on.year, m, 1))
+                ).days
+                # Always off by one
+                + 1
+            ),
+        )
+        for m in range(starts_on.month, ends_on.month + 1)
+    ]
+    return [(m, absence.days * d / total) for m, d in calendar_days_per_month]
+
+
+def _compute_months(year, months, *, employments, absences, overrides, holidays):
+    """
+    Compute the monthly values of all users in ``months`` and return the
+    snapshot rows
+    """
+    dpm = days_per_month(year)
+
+    for employment in employments:
+        if employment.user_id not in months:
+            continue
         percentage_factor = Decimal(employment.percentage) / 100
         available_vacation_days_per_month = (
             Decimal(employment.vacation_weeks) * 5 / 12 * percentage_factor
         )
         month_data = months[employment.user_id]
-        wtm_id = month_data["year"].working_time_model_id
-        holidays = holidays_by_wtm.get(wtm_id, _empty_holidays)
+        wtm_holidays = holidays(month_data["year"].working_time_model_id)
         total_holiday_days = [
-            holidays[Holiday.Kind.PUBLIC][i] + holidays[Holiday.Kind.COMPANY][i]
+            wtm_holidays[Holiday.Kind.PUBLIC][i] + wtm_holidays[Holiday.Kind.COMPANY][i]
             for i in range(12)
         ]
 
@@ -179,12 +229,11 @@ def annual_working_time(year, *, users):  # noqa: C901
             month_data["available_vacation_days"][m] += (
                 available_vacation_days_per_month * partial_month_factor
             )
-            month_data["employments"].add(employment)
 
     for row in (
         LoggedHours.objects
         .order_by()
-        .filter(rendered_by__in=months.users_with_wtm, rendered_on__year=year)
+        .filter(rendered_by__in=list(months), rendered_on__year=year)
         .values("rendered_by")
         .annotate(month=ExtractMonth("rendered_on"))
         .values("rendered_by", "month")
@@ -193,61 +242,25 @@ def annual_working_time(year, *, users):  # noqa: C901
         month_data = months[row["rendered_by"]]
         month_data["hours"][row["month"] - 1] += row["hours__sum"]
 
-    remaining = defaultdict(
-        lambda: Z1,
-        {
-            user: sum(month_data["available_vacation_days"])
-            for user, month_data in months.items()
-        },
-    )
-    for user_id, override in overrides.items():
-        if override.type == override.Type.ABSOLUTE:
-            remaining[user_id] = override.days
-        elif override.type == override.Type.RELATIVE:
-            remaining[user_id] += override.days
-        else:  # pragma: no cover
-            raise Exception(f"Unknown override type {override.type}")
-    available_vacation_days = defaultdict(lambda: Z1, remaining)
+    remaining = {
+        user_id: _available_vacation_days(month_data, overrides.get(user_id))
+        for user_id, month_data in months.items()
+    }
+    vacation_days = defaultdict(lambda: [Z1] * 12)
 
-    for absence in Absence.objects.filter(
-        user__in=months.users_with_wtm, starts_on__year=year, is_working_time=True
-    ).order_by("starts_on"):
+    for absence in absences:
+        if absence.user_id not in months:
+            continue
         month_data = months[absence.user_id]
         key = "absence_%s" % absence.reason
-        absences[absence.user_id][key].append(absence)
-
-        starts_on = absence.starts_on
-        ends_on = absence.ends_on or starts_on
-
-        if starts_on.month == ends_on.month:
-            days = [(absence.starts_on.month, absence.days)]
-        else:
-            total = Decimal((ends_on - starts_on).days + 1)
-            one_day = dt.timedelta(days=1)
-
-            calendar_days_per_month = [
-                (
-                    m,
-                    Decimal(
-                        (
-                            # end of absence or last day of this month
-                            min(ends_on, next_valid_day(ends_on.year, m, 99) - one_day)
-                            # start of absence or first day of this month
-                            - max(starts_on, dt.date(starts_on.year, m, 1))
-                        ).days
-                        # Always off by one
-                        + 1
-                    ),
-                )
-                for m in range(starts_on.month, ends_on.month + 1)
-            ]
-            days = [(m, absence.days * d / total) for m, d in calendar_days_per_month]
+        days = _split_absence(absence)
 
         for month, d in days:
             month_data[key][month - 1] += d
 
         if absence.is_vacation:
             for m, d in days:
+                vacation_days[absence.user_id][m - 1] += d
                 if d > remaining[absence.user_id]:
                     month_data["vacation_days_correction"][m - 1] += (
                         remaining[absence.user_id] - d
@@ -255,9 +268,158 @@ def annual_working_time(year, *, users):  # noqa: C901
 
                 remaining[absence.user_id] = max(0, remaining[absence.user_id] - d)
 
-    for user_id, vacation_days in remaining.items():
-        if vacation_days > 0:
-            vacation_days_credit[user_id] = vacation_days
+    rows = []
+    for user_id, month_data in months.items():
+        # Clamping the remaining days at zero does not depend on the order of
+        # absences, so the balance can be computed month by month.
+        available = _available_vacation_days(month_data, overrides.get(user_id))
+        used = Z1
+        running_sum = Z1
+        for m, monthly_sum in enumerate(_monthly_sums(month_data)):
+            used += vacation_days[user_id][m]
+            running_sum += monthly_sum
+            month_data["vacation_days_balance"][m] = max(0, available - used)
+            rows.append(
+                AnnualWorkingTimeMonth(
+                    user_id=user_id,
+                    month=month_data["months"][m],
+                    **{
+                        field: month_data[field][m]
+                        for field in AnnualWorkingTimeMonth.SNAPSHOT_FIELDS
+                        if field not in {"monthly_sum", "running_sum"}
+                    },
+                    monthly_sum=monthly_sum,
+                    running_sum=running_sum,
+                    is_stale=False,
+                )
+            )
+    return rows
+
+
+def _lock_snapshots(user_ids):
+    # The triggers invalidating snapshots take shared locks on the same keys,
+    # see awt.0020_snapshot_locks. Holding the exclusive locks until the end of
+    # the transaction ensures that no invalidation slips in between reading the
+    # inputs and writing the recomputed snapshots.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """\
+SELECT pg_advisory_xact_lock(
+  'awt_annualworkingtimemonth'::regclass::oid::integer, user_id
+)
+FROM (SELECT unnest(%s::integer[]) AS user_id ORDER BY 1) AS u
+""",
+            [sorted(user_ids)],
+        )
+
+
+def annual_working_time(year, *, users):
+    months = Months(year=year, users=users)
+
+    # Load fresh snapshots and recompute the months of all other users.
+    snapshots = defaultdict(list)
+    for snapshot in AnnualWorkingTimeMonth.objects.filter(
+        user__in=months.users_with_wtm, month__year=year
+    ).order_by("month"):
+        snapshots[snapshot.user_id].append(snapshot)
+    fresh = {
+        user_id
+        for user_id, rows in snapshots.items()
+        if len(rows) == 12 and not any(row.is_stale for row in rows)
+    }
+    if missing := {user.id for user in months.users_with_wtm} - fresh:
+        # Read all inputs from the primary database after acquiring the locks,
+        # including the working time models of users
+        with transaction.atomic(), primary():
+            _lock_snapshots(missing)
+            current = User.objects.in_bulk([user.id for user in users])
+            users = [current[user.id] for user in users if user.id in current]
+            return _annual_working_time(
+                Months(year=year, users=users), snapshots=snapshots, fresh=fresh
+            )
+    return _annual_working_time(months, snapshots=snapshots, fresh=fresh)
+
+
+def _annual_working_time(months, *, snapshots, fresh):
+    year = months.year
+    users = months.users
+
+    overrides = {
+        override.user_id: override
+        for override in VacationDaysOverride.objects.filter(year=year, user__in=users)
+    }
+
+    # Compute holidays once per working time model.
+    _empty_holidays = {Holiday.Kind.PUBLIC: [Z1] * 12, Holiday.Kind.COMPANY: [Z1] * 12}
+    holidays_by_wtm = {}
+    holiday_list_by_wtm = {}
+    for wtm_id in {y.working_time_model_id for y in months.year_by_wtm.values()}:
+        h, hl = holiday_days_by_month(year, wtm_id)
+        holidays_by_wtm[wtm_id] = h
+        holiday_list_by_wtm[wtm_id] = hl
+
+    employments = list(
+        Employment.objects.filter(
+            user__in=months.users_with_wtm,
+            date_from__lte=dt.date(year, 12, 31),
+            date_until__gte=dt.date(year, 1, 1),
+        ).order_by("-date_from")
+    )
+    working_time_absences = list(
+        Absence.objects.filter(
+            user__in=months.users_with_wtm, starts_on__year=year, is_working_time=True
+        ).order_by("starts_on")
+    )
+
+    stale = {}
+    for user in months.users_with_wtm:
+        if user.id in fresh:
+            month_data = months[user.id]
+            for m, snapshot in enumerate(snapshots[user.id]):
+                for field in AnnualWorkingTimeMonth.SNAPSHOT_FIELDS:
+                    month_data[field][m] = getattr(snapshot, field)
+        else:
+            stale[user.id] = months[user.id]
+
+    if stale:
+        rows = _compute_months(
+            year,
+            stale,
+            employments=employments,
+            absences=working_time_absences,
+            overrides=overrides,
+            holidays=lambda wtm_id: holidays_by_wtm.get(wtm_id, _empty_holidays),
+        )
+        AnnualWorkingTimeMonth.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "month"],
+            update_fields=[*AnnualWorkingTimeMonth.SNAPSHOT_FIELDS, "is_stale"],
+        )
+
+    for employment in employments:
+        months[employment.user_id]["employments"].add(employment)
+
+    absences = defaultdict(
+        lambda: {
+            "absence_vacation": [],
+            "absence_sickness": [],
+            "absence_paid": [],
+            "absence_school": [],
+            "absence_correction": [],
+        }
+    )
+    for absence in working_time_absences:
+        absences[absence.user_id]["absence_%s" % absence.reason].append(absence)
+
+    available_vacation_days = defaultdict(lambda: Z1)
+    vacation_days_credit = defaultdict(lambda: Z1)
+    for user_id, month_data in months.items():
+        available_vacation_days[user_id] = _available_vacation_days(
+            month_data, overrides.get(user_id)
+        )
+        if (credit := month_data["vacation_days_balance"][11]) > 0:
+            vacation_days_credit[user_id] = credit
 
     other_absences = defaultdict(list)
     for absence in Absence.objects.filter(
@@ -274,42 +436,14 @@ def annual_working_time(year, *, users):  # noqa: C901
             month_data["holiday_public"][m] = holidays[Holiday.Kind.PUBLIC][m]
             month_data["holiday_company"][m] = holidays[Holiday.Kind.COMPANY][m]
 
-    def absences_time(data):
-        return [
-            sum(
-                (
-                    data["absence_vacation"][i],
-                    data["absence_sickness"][i],
-                    data["absence_paid"][i],
-                    data["absence_school"][i],
-                    data["absence_correction"][i],
-                    data["vacation_days_correction"][i],
-                ),
-                Z1,
-            )
-            * data["year"].working_time_per_day
-            for i in range(12)
-        ]
-
-    def working_time(data):
-        at = absences_time(data)
-        return [sum((data["hours"][i], at[i]), Z1) for i in range(12)]
-
-    def monthly_sums(data):
-        sums = [None] * 12
-        wt = working_time(data)
-        for i in range(12):
-            sums[i] = wt[i] - data["target"][i]
-        return sums
-
     statistics = []
     for user in months.users_with_wtm:
         month_data = months[user.id]
         wtm_id = month_data["year"].working_time_model_id
         holidays = holidays_by_wtm.get(wtm_id, _empty_holidays)
-        sums = monthly_sums(month_data)
-        at = absences_time(month_data)
-        wt = working_time(month_data)
+        sums = _monthly_sums(month_data)
+        at = _absences_time(month_data)
+        wt = _working_time(month_data)
         balance = (
             sum(sums)
             + month_data["year"].working_time_per_day * vacation_days_credit[user.id]
@@ -11,7 +11,12 @@ from time_machine import travel
 from workbench import factories
 from workbench.accounts.features import FEATURES, F
 from workbench.accounts.models import User
-from workbench.awt.models import Absence, Employment, Holiday
+from workbench.awt.models import (
+    Absence,
+    AnnualWorkingTimeMonth,
+    Employment,
+    Holiday,
+)
 from workbench.awt.reporting import (
     active_users,
     annual_working_time,
@@ -609,6 +614,54 @@ class AWTTest(TestCase):
         # (30 - 1.5) * 8 + 11 * 30 * 8 = 228 + 2640 = 2868
         self.assertAlmostEqual(awt["totals"]["target"], Decimal(2868))
 
+    def test_snapshots(self):
+        """Annual working time is read from snapshots while they are fresh"""
+        service = factories.ServiceFactory.create()
+        user = service.project.owned_by
+        factories.YearFactory.create(
+            year=2018, working_time_model=user.working_time_model
+        )
+        user.employments.create(
+            date_from=dt.date(2018, 1, 1), percentage=100, vacation_weeks=5
+        )
+        user.absences.create(starts_on=dt.date(2018, 3, 1), days=5, reason="vacation")
+
+        def running_sum():
+            return annual_working_time(2018, users=[user])["statistics"][0]["totals"][
+                "running_sum"
+            ]
+
+        self.assertAlmostEqual(running_sum(), Decimal(-2840))
+        self.assertEqual(AnnualWorkingTimeMonth.objects.filter(user=user).count(), 12)
+        self.assertEqual(AnnualWorkingTimeMonth.objects.stale().count(), 0)
+
+        snapshot = AnnualWorkingTimeMonth.objects.get(month=dt.date(2018, 3, 1))
+        self.assertAlmostEqual(snapshot.vacation_days_balance, Decimal(20))
+        self.assertAlmostEqual(snapshot.running_sum, Decimal(-680))
+
+        with self.assertNumQueries(7):
+            self.assertAlmostEqual(running_sum(), Decimal(-2840))
+
+        user.loggedhours.create(
+            service=service,
+            created_by=user,
+            hours=40,
+            description="anything",
+            rendered_on=dt.date(2018, 6, 1),
+        )
+        self.assertEqual(AnnualWorkingTimeMonth.objects.stale().count(), 12)
+        self.assertAlmostEqual(running_sum(), Decimal(-2800))
+
+        Holiday.objects.create(
+            working_time_model=user.working_time_model,
+            date=dt.date(2018, 1, 2),
+            name="Berchtoldstag",
+            fraction=Decimal(1),
+            kind=Holiday.Kind.PUBLIC,
+        )
+        self.assertEqual(AnnualWorkingTimeMonth.objects.stale().count(), 12)
+        self.assertAlmostEqual(running_sum(), Decimal(-2792))
+
     def test_is_previous_month_locked_starting_today(self):
         """Examples of is_previous_month_locked_starting_today"""
         with travel(dt.date(2021, 1, 1)):
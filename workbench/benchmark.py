@@ -0,0 +1,395 @@
+"""
+Benchmark harness for the reporting engines
+
+``generate`` fills the database with a deterministic dataset of users,
+projects, offers, logged hours, invoices, absences and planned work.
+``run`` times the engines and records the number and duration of their SQL
+queries. Use ``./manage.py benchmark`` to run it against a local database.
+
+The dataset and the engines use the fixed reference day ``TODAY`` instead of
+the current date so that reports of different days can be compared.
+"""
+
+import datetime as dt
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.db import connections
+from django.test import RequestFactory
+from django.utils import timezone
+
+from workbench import factories
+from workbench.accounts.models import Team, User
+from workbench.awt.models import Absence
+from workbench.awt.reporting import annual_working_time
+from workbench.invoices.models import Invoice
+from workbench.invoices.utils import recurring
+from workbench.logbook.models import LoggedCost, LoggedHours
+from workbench.middleware import QueryRecorder
+from workbench.offers.models import Offer
+from workbench.planning.models import PlannedWork
+from workbench.planning.reporting import team_planning
+from workbench.projects.models import Project
+from workbench.reporting.project_budget_statistics import project_budget_statistics
+from workbench.reporting.squeeze import squeeze_data
+from workbench.reporting.views import key_data_view
+from workbench.tools.validation import monday
+
+
+TODAY = dt.date(2025, 6, 30)
+
+ENGINES = [
+    "planning.team_planning",
+    "reporting.squeeze_data",
+    "reporting.key_data_view",
+    "awt.annual_working_time",
+    "reporting.project_budget_statistics",
+    "projects.grouped_services",
+]
+
+
+def _aware(day):
+    return timezone.make_aware(dt.datetime.combine(day, dt.time(9)))
+
+
+def _weekdays(start, end):
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += dt.timedelta(days=1)
+
+
+def generate(*, users=50, years=5, seed=1, today=TODAY):  # noqa: C901
+    """
+    Create a deterministic dataset covering ``years`` years up to ``today``
+
+    The number of customers, projects and all other rows scales with the
+    number of users.
+    """
+    rng = random.Random(seed)
+    first_day = dt.date(today.year - years + 1, 1, 1)
+
+    service_types = factories.service_types()
+    rates = {
+        service_type: service_type.hourly_rate
+        for service_type in vars(service_types).values()
+    }
+    working_time_model = factories.WorkingTimeModelFactory.create(name="Benchmark")
+    for year in range(first_day.year, today.year + 1):
+        factories.YearFactory.create(working_time_model=working_time_model, year=year)
+
+    team = factories.TeamFactory.create(name="Benchmark")
+    staff = []
+    for idx in range(users):
+        user = factories.UserFactory.create(
+            _full_name=f"Benchmark User {idx}",
+            _short_name=f"bench{idx}",
+            email=f"bench{idx}@example.com",
+            working_time_model=working_time_model,
+        )
+        factories.EmploymentFactory.create(
+            user=user,
+            date_from=first_day,
+            percentage=rng.choice([60, 80, 100, 100, 100]),
+            hourly_labor_costs=rng.randint(60, 120),
+        )
+        staff.append(user)
+    team.members.set(staff)
+
+    customers = [
+        factories.OrganizationFactory.create(
+            name=f"Customer {idx}", primary_contact=rng.choice(staff)
+        )
+        for idx in range(max(1, users // 2))
+    ]
+    contacts = {
+        customer: factories.PersonFactory.create(
+            organization=customer, primary_contact=customer.primary_contact
+        )
+        for customer in customers
+    }
+
+    projects_by_year = {}
+    services_by_project = {}
+    for year in range(first_day.year, today.year + 1):
+        projects_by_year[year] = []
+        for idx in range(users):
+            customer = rng.choice(customers)
+            created_on = dt.date(year, rng.randint(1, 12), rng.randint(1, 28))
+            if created_on > today:
+                created_on = dt.date(year, 1, 1)
+            project = factories.ProjectFactory.create(
+                customer=customer,
+                contact=contacts[customer],
+                owned_by=rng.choice(staff),
+                title=f"Project {year}/{idx}",
+                type=rng.choice([
+                    Project.ORDER,
+                    Project.ORDER,
+                    Project.ORDER,
+                    Project.MAINTENANCE,
+                    Project.INTERNAL,
+                ]),
+                created_at=_aware(created_on),
+                closed_on=dt.date(year + 1, 6, 30) if year < today.year - 1 else None,
+            )
+            services = []
+            for offer_idx in range(rng.randint(1, 2)):
+                offer = factories.OfferFactory.create(
+                    project=project,
+                    owned_by=project.owned_by,
+                    title=f"Offer {offer_idx}",
+                    status=Offer.ACCEPTED,
+                    offered_on=created_on,
+                    closed_on=created_on,
+                    postal_address=customer.name,
+                )
+                for service_idx in range(rng.randint(3, 6)):
+                    service_type = rng.choice(list(rates))
+                    services.append(
+                        factories.ServiceFactory.create(
+                            project=project,
+                            offer=offer,
+                            title=f"Service {service_idx}",
+                            effort_type=service_type.title,
+                            effort_rate=rates[service_type],
+                            effort_hours=rng.randint(5, 80),
+                        )
+                    )
+            services_by_project[project] = services
+            projects_by_year[year].append((created_on, project))
+
+    # Logged hours: two to four entries per user and working day on projects
+    # which have been started this or the previous year
+    rows = []
+    for day in _weekdays(first_day, today):
+        candidates = [
+            project
+            for year in (day.year - 1, day.year)
+            for created_on, project in projects_by_year.get(year, ())
+            if created_on <= day and not (project.closed_on and project.closed_on < day)
+        ]
+        if not candidates:
+            continue
+        for user in staff:
+            for _idx in range(rng.randint(2, 4)):
+                rows.append(
+                    LoggedHours(
+                        service=rng.choice(services_by_project[rng.choice(candidates)]),
+                        created_at=_aware(day),
+                        created_by=user,
+                        rendered_on=day,
+                        rendered_by=user,
+                        hours=Decimal(rng.choice([1, 1.5, 2, 2.5, 3, 4])),
+                        description="Work",
+                    )
+                )
+    LoggedHours.objects.bulk_create(rows, batch_size=5000)
+
+    # Third party costs, invoices and projected invoices
+    costs = []
+    for year, projects in projects_by_year.items():
+        for created_on, project in projects:
+            services = services_by_project[project]
+            for _idx in range(2):
+                costs.append(
+                    LoggedCost(
+                        service=rng.choice(services),
+                        created_by=project.owned_by,
+                        rendered_by=project.owned_by,
+                        rendered_on=created_on,
+                        cost=rng.randint(100, 2000),
+                        third_party_costs=rng.randint(80, 1800),
+                        description="Licenses",
+                    )
+                )
+
+            for month in recurring(created_on.replace(day=1), "quarterly"):
+                if month > min(today, dt.date(year + 1, 12, 31)):
+                    break
+                factories.InvoiceFactory.create(
+                    customer=project.customer,
+                    contact=project.contact,
+                    project=project,
+                    owned_by=project.owned_by,
+                    title=f"Invoice {month:%Y-%m}",
+                    invoiced_on=month,
+                    due_on=month + dt.timedelta(days=30),
+                    closed_on=month + dt.timedelta(days=30)
+                    if month < today - dt.timedelta(days=60)
+                    else None,
+                    status=Invoice.PAID
+                    if month < today - dt.timedelta(days=60)
+                    else Invoice.SENT,
+                    subtotal=rng.randint(1000, 20000),
+                    postal_address=project.customer.name,
+                )
+
+            if project.closed_on is None and project.type == Project.ORDER:
+                factories.ProjectedInvoiceFactory.create(
+                    project=project,
+                    invoiced_on=today + dt.timedelta(days=rng.randint(10, 180)),
+                    gross_margin=rng.randint(1000, 10000),
+                )
+    LoggedCost.objects.bulk_create(costs, batch_size=5000)
+
+    # Absences: vacation weeks and a few sick days per year
+    absences = []
+    for user in staff:
+        for year in range(first_day.year, today.year + 1):
+            for _idx in range(5):
+                starts_on = monday(dt.date(year, 1, 1)) + dt.timedelta(
+                    weeks=rng.randint(1, 50)
+                )
+                absences.append(
+                    Absence(
+                        user=user,
+                        starts_on=starts_on,
+                        ends_on=starts_on + dt.timedelta(days=4),
+                        days=5,
+                        description="Vacation",
+                        reason=Absence.VACATION,
+                        is_vacation=True,
+                    )
+                )
+            for _idx in range(3):
+                absences.append(
+                    Absence(
+                        user=user,
+                        starts_on=dt.date(year, rng.randint(1, 12), rng.randint(1, 28)),
+                        days=1,
+                        description="Sick",
+                        reason=Absence.SICKNESS,
+                        is_vacation=False,
+                    )
+                )
+    Absence.objects.bulk_create([
+        absence for absence in absences if absence.starts_on <= today
+    ])
+
+    # Planned work on the projects of the last two years
+    this_week = monday(today)
+    planned = []
+    for year in (today.year - 1, today.year):
+        for _created_on, project in projects_by_year.get(year, ()):
+            if project.closed_on:
+                continue
+            for _idx in range(rng.randint(1, 3)):
+                start = this_week + dt.timedelta(weeks=rng.randint(-8, 20))
+                user = rng.choice(staff)
+                planned.append(
+                    PlannedWork(
+                        project=project,
+                        user=user,
+                        created_by=user,
+                        title="Planned work",
+                        planned_hours=rng.randint(8, 120),
+                        weeks=[
+                            start + dt.timedelta(weeks=week)
+                            for week in range(rng.randint(2, 8))
+                        ],
+                    )
+                )
+    PlannedWork.objects.bulk_create(planned)
+
+    return {
+        "users": users,
+        "years": years,
+        "seed": seed,
+        "today": today.isoformat(),
+        "projects": sum(len(projects) for projects in projects_by_year.values()),
+        "logged_hours": len(rows),
+        "invoices": Invoice.objects.filter(project__in=services_by_project).count(),
+        "absences": len(absences),
+        "planned_work": len(planned),
+    }
+
+
+def engines(*, today=TODAY):
+    """
+    Return a mapping of engine names to argument-less callables
+
+    The names are listed in ``ENGINES``.
+    """
+    year = [dt.date(today.year, 1, 1), dt.date(today.year, 12, 31)]
+    last_year = [dt.date(today.year - 1, 1, 1), dt.date(today.year - 1, 12, 31)]
+    team = Team.objects.filter(name="Benchmark").first()
+    users = list(User.objects.filter(_short_name__startswith="bench"))
+    request = RequestFactory().get("/report/key-data/")
+    request.user = User.objects.filter(is_active=True).order_by("pk").first()
+
+    def grouped_services():
+        for project in Project.objects.open().order_by("pk")[:20]:
+            project.grouped_services  # noqa: B018
+
+    return {
+        "planning.team_planning": lambda: team_planning(
+            team,
+            [monday(today) - dt.timedelta(weeks=8), today + dt.timedelta(weeks=26)],
+        ),
+        "reporting.squeeze_data": lambda: squeeze_data(last_year),
+        "reporting.key_data_view": lambda: key_data_view(request),
+        "awt.annual_working_time": lambda: annual_working_time(today.year, users=users),
+        "reporting.project_budget_statistics": lambda: project_budget_statistics(
+            Project.objects.filter(created_at__year__gte=year[0].year - 1)
+        ),
+        "projects.grouped_services": grouped_services,
+    }
+
+
+def measure(fn, *, repeat=3):
+    """
+    Run ``fn`` ``repeat`` times and return wall times and query statistics
+    of all runs
+    """
+    runs = []
+    for _idx in range(repeat):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            start = time.perf_counter()
+            fn()
+            duration = (time.perf_counter() - start) * 1000
+        runs.append({
+            "time": round(duration, 3),
+            "queries": recorder.count,
+            "query_time": round(recorder.time, 3),
+        })
+    warm = runs[1:] or runs
+    return {
+        "runs": runs,
+        "cold": runs[0]["time"],
+        "median": round(statistics.median(run["time"] for run in warm), 3),
+        "queries": runs[0]["queries"],
+        "repeated_queries": recorder.repeated_queries(),
+    }
+
+
+def run(*, repeat=3, only=None, today=TODAY):
+    return {
+        name: measure(fn, repeat=repeat)
+        for name, fn in engines(today=today).items()
+        if not only or name in only
+    }
+
+
+def compare(previous, current):
+    """
+    Yield ``(name, previous median, current median, ratio, previous queries,
+    current queries)`` for engines contained in both reports
+    """
+    for name, result in current["engines"].items():
+        if before := previous["engines"].get(name):
+            yield (
+                name,
+                before["median"],
+                result["median"],
+                result["median"] / before["median"] if before["median"] else None,
+                before["queries"],
+                result["queries"],
+            )
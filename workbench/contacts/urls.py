@@ -10,6 +10,7 @@ from workbench.contacts.forms import (
 )
 from workbench.contacts.models import Organization, Person
 from workbench.contacts.views import OrganizationListView, person_vcard, select
+from workbench.tools.typeahead import Typeahead
 
 
 def autocomplete_filter(*, request, queryset):
@@ -20,6 +21,21 @@ def autocomplete_filter(*, request, queryset):
     )
 
 
+organization_typeahead = Typeahead(
+    Organization.objects.active,
+    tables=["contacts_organization"],
+)
+person_typeahead = Typeahead(
+    lambda: Person.objects.active().select_related("organization"),
+    tables=["contacts_organization", "contacts_person"],
+    label_from_instance=lambda person: person.name_with_organization,
+    tags_from_instance=lambda person: {"employee"} if person.organization_id else (),
+    filter=lambda request: (
+        frozenset({"employee"}) if request.GET.get("only_employees") else frozenset()
+    ),
+)
+
+
 urlpatterns = [
     path("", lambda request: redirect("contacts_person_list"), name="contacts"),
     path(
@@ -32,6 +48,7 @@ urlpatterns = [
         generic.AutocompleteView.as_view(
             model=Organization,
             queryset=Organization.objects.active(),
+            typeahead=organization_typeahead,
         ),
         name="contacts_organization_autocomplete",
     ),
@@ -69,6 +86,7 @@ urlpatterns = [
             queryset=Person.objects.active().select_related("organization"),
             filter=autocomplete_filter,
             label_from_instance=lambda person: person.name_with_organization,
+            typeahead=person_typeahead,
         ),
         name="contacts_person_autocomplete",
     ),
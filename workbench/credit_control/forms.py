@@ -1,11 +1,11 @@
 import datetime as dt
-import re
 
 from django import forms
 from django.contrib import messages
 from django.utils.html import format_html, mark_safe
 from django.utils.translation import gettext, gettext_lazy as _
 
+from workbench.credit_control.matching import InvoiceMatcher
 from workbench.credit_control.models import CreditEntry, Ledger
 from workbench.invoices.models import Invoice
 from workbench.tools.formats import currency, local_date_format
@@ -130,18 +130,10 @@ class AccountStatementUploadForm(Form):
         return data
 
     def save(self):
-        created_entries = []
-        ledger = self.cleaned_data["ledger"]
-
-        for data in reversed(self.statement_list):  # From past to present
-            reference_number = data.pop("reference_number")
-
-            c, created = ledger.transactions.get_or_create(
-                reference_number=reference_number, defaults=data
-            )
-            if created:
-                created_entries.append(c)
-        return created_entries
+        return CreditEntry.objects.import_statement(
+            self.cleaned_data["ledger"],
+            list(reversed(self.statement_list)),  # From past to present
+        )
 
 
 class AssignCreditEntriesForm(forms.Form):
@@ -150,6 +142,7 @@ class AssignCreditEntriesForm(forms.Form):
 
         super().__init__(*args, **kwargs)
 
+        matcher = InvoiceMatcher()
         self.entries = []
         for entry in CreditEntry.objects.reverse().filter(
             invoice__isnull=True, notes=""
@@ -171,12 +164,7 @@ class AssignCreditEntriesForm(forms.Form):
                             " ".join((
                                 format_html('<span title="{}">', invoice.description),
                                 format_html(
-                                    "<strong>{}</strong>"
-                                    if re.search(
-                                        r"\b" + invoice.code + r"\b",
-                                        entry.payment_notice,
-                                    )
-                                    else "{}",
+                                    "<strong>{}</strong>" if code_matches else "{}",
                                     invoice,
                                 ),
                                 invoice.status_badge,
@@ -208,12 +196,7 @@ class AssignCreditEntriesForm(forms.Form):
                             ))
                         ),
                     )
-                    for invoice in Invoice.objects
-                    .open()
-                    .filter(total=entry.total)
-                    .select_related(
-                        "contact__organization", "customer", "owned_by", "project"
-                    )[:100]
+                    for invoice, code_matches in matcher.matches(entry)
                 ],
                 coerce=int,
                 required=False,
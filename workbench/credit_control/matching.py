@@ -0,0 +1,66 @@
+import re
+from collections import defaultdict
+
+from workbench.invoices.models import Invoice
+
+
+_CODE_RE = re.compile(r"(?<!\w)\d+(?:-\d+)*(?!\w)")
+
+
+def notice_codes(payment_notice):
+    """
+    Return all strings in the payment notice which could be an invoice code,
+    that is all runs of hyphen separated digit groups delimited by word
+    boundaries
+    """
+    codes = set()
+    for match in _CODE_RE.finditer(payment_notice):
+        parts = match.group().split("-")
+        codes.update(
+            "-".join(parts[start:end])
+            for start in range(len(parts))
+            for end in range(start + 1, len(parts) + 1)
+        )
+    return codes
+
+
+class InvoiceMatcher:
+    """
+    Propose open invoices for credit entries
+
+    Open invoices are loaded once and indexed by their total and their code.
+    Invoices matching both the total and a code mentioned in the payment notice
+    are ranked first, followed by invoices matching only the code and invoices
+    matching only the total.
+    """
+
+    def __init__(self, invoices=None):
+        if invoices is None:
+            invoices = Invoice.objects.open().select_related(
+                "contact__organization", "customer", "owned_by", "project"
+            )
+        self.by_total = defaultdict(list)
+        self.by_code = {}
+        for invoice in invoices:
+            self.by_total[invoice.total].append(invoice)
+            self.by_code[invoice.code] = invoice
+
+    def matches(self, entry, *, limit=100):
+        """
+        Return a list of ``(invoice, code_matches)`` tuples, best matches first
+        """
+        same_total = self.by_total.get(entry.total, [])
+        by_code = {
+            invoice.id: invoice
+            for code in notice_codes(entry.payment_notice)
+            if (invoice := self.by_code.get(code))
+        }
+        ranked = sorted(
+            [*same_total, *(i for i in by_code.values() if i.total != entry.total)],
+            key=lambda invoice: (
+                invoice.id not in by_code,
+                invoice.total != entry.total,
+                -invoice.id,
+            ),
+        )
+        return [(invoice, invoice.id in by_code) for invoice in ranked[:limit]]
@@ -42,6 +42,26 @@ class CreditEntryQuerySet(SearchQuerySet):
     def processed(self):
         return self.filter(~Q(invoice__isnull=True) | ~Q(notes=""))
 
+    def import_statement(self, ledger, entries):
+        """
+        Create credit entries for all parsed statement rows whose reference
+        number is not known yet and return the created entries
+        """
+        known = set(
+            self.filter(
+                reference_number__in=[entry["reference_number"] for entry in entries]
+            ).values_list("reference_number", flat=True)
+        )
+        new = {}
+        for data in entries:
+            if data["reference_number"] not in known:
+                new.setdefault(
+                    data["reference_number"], CreditEntry(ledger=ledger, **data)
+                )
+        for entry in new.values():
+            entry.update_fts()
+        return self.bulk_create(new.values())
+
 
 @model_urls
 class CreditEntry(Model):
@@ -78,8 +98,11 @@ class CreditEntry(Model):
     def __str__(self):
         return self.reference_number
 
-    def save(self, *args, **kwargs):
+    def update_fts(self):
         self._fts = " ".join(str(part) for part in [self.invoice or "", self.total])
+
+    def save(self, *args, **kwargs):
+        self.update_fts()
         super().save(*args, **kwargs)
 
     save.alters_data = True
@@ -7,28 +7,19 @@ from django.utils.translation import activate, gettext as _
 
 from workbench.credit_control.models import CreditEntry, Ledger
 from workbench.invoices.models import Invoice
-from workbench.tools.pdf import PDFDocument
+from workbench.tools.pdf import render_invoices
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
 
-def append_invoice(*, zf, invoice, qr):
-    with io.BytesIO() as buf:
-        pdf = PDFDocument(buf)
-        pdf.init_invoice_letter()
-        pdf.process_invoice(invoice, qr=qr)
-        try:
-            pdf.generate()
-        except Exception:
-            print(f"Error while processing invoice {invoice} (ID {invoice.id})")
-            raise
-
+def append_invoices(*, zf, invoices, qr, workers):
+    for invoice, pdf in render_invoices(invoices, qr=qr, workers=workers):
         zf.writestr(
             "{}/{}.pdf".format(invoice.invoiced_on.strftime("%Y.%m"), invoice.code),
-            buf.getvalue(),
+            pdf,
         )
 
 
-def paid_debtors_zip(date_range, *, file, qr=False):
+def paid_debtors_zip(date_range, *, file, qr=False, workers=1):
     activate(settings.WORKBENCH.PDF_LANGUAGE)
     xlsx = WorkbenchXLSXDocument()
 
@@ -44,9 +35,11 @@ def paid_debtors_zip(date_range, *, file, qr=False):
     }
 
     with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        invoices = list(invoices)
+        append_invoices(zf=zf, invoices=invoices, qr=qr, workers=workers)
+
         rows = []
         for invoice in invoices:
-            append_invoice(zf=zf, invoice=invoice, qr=qr)
             rows.append([
                 invoice.code,
                 invoice.is_freezed,
@@ -123,6 +116,8 @@ def paid_debtors_zip(date_range, *, file, qr=False):
             ],
         )
 
+        invoice_ids = {invoice.id for invoice in invoices}
+        additional = {}
         for ledger in Ledger.objects.all():
             rows = []
             for entry in (
@@ -140,13 +135,8 @@ def paid_debtors_zip(date_range, *, file, qr=False):
                     entry.notes,
                 ))
 
-                if entry.invoice and entry.invoice not in invoices:
-                    print(entry.invoice)
-                    append_invoice(
-                        zf=zf,
-                        invoice=entry.invoice,
-                        qr=qr,
-                    )
+                if entry.invoice and entry.invoice.id not in invoice_ids:
+                    additional[entry.invoice.id] = entry.invoice
 
             if rows:
                 xlsx.add_sheet(slugify(ledger.name))
@@ -162,6 +152,8 @@ def paid_debtors_zip(date_range, *, file, qr=False):
                     rows,
                 )
 
+        append_invoices(zf=zf, invoices=additional.values(), qr=qr, workers=workers)
+
         with io.BytesIO() as buf:
             xlsx.workbook.save(buf)
             zf.writestr("debtors.xlsx", buf.getvalue())
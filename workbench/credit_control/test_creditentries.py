@@ -1,19 +1,27 @@
 import datetime as dt
+import io
 import os
+import tempfile
+import zipfile
 from decimal import Decimal
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 
 from workbench import factories
+from workbench.credit_control.matching import InvoiceMatcher, notice_codes
 from workbench.credit_control.models import CreditEntry
 from workbench.credit_control.parsers import (
     parse_postfinance_csv,
     postfinance_preprocess_notice,
     postfinance_reference_number,
 )
+from workbench.credit_control.reporting import paid_debtors_zip
+from workbench.invoices.models import Invoice
 from workbench.tools.forms import WarningsForm
+from workbench.tools.pdf import render_invoices
 from workbench.tools.testing import check_code, messages
 
 
@@ -62,6 +70,35 @@ class CreditEntriesTest(TestCase):
             ],
         )
 
+    def test_paid_debtors_zip(self):
+        """The debtors archive contains the PDFs of all relevant invoices"""
+        invoices = [
+            factories.InvoiceFactory.create(
+                invoiced_on=dt.date(2025, month, 1), status=Invoice.SENT
+            )
+            for month in [3, 4]
+        ]
+        previous = factories.InvoiceFactory.create(
+            invoiced_on=dt.date(2024, 12, 1), status=Invoice.PAID
+        )
+        factories.CreditEntryFactory.create(
+            invoice=previous, value_date=dt.date(2025, 1, 10)
+        )
+
+        with io.BytesIO() as buf:
+            paid_debtors_zip([dt.date(2025, 1, 1), dt.date(2025, 12, 31)], file=buf)
+            names = set(zipfile.ZipFile(buf).namelist())
+
+        self.assertEqual(
+            names,
+            {
+                f"2025.03/{invoices[0].code}.pdf",
+                f"2025.04/{invoices[1].code}.pdf",
+                f"2024.12/{previous.code}.pdf",
+                "debtors.xlsx",
+            },
+        )
+
     def test_account_statement_upload(self):
         """Uploading account statements with and without duplicates"""
         self.client.force_login(factories.UserFactory.create())
@@ -241,3 +278,79 @@ class CreditEntriesTest(TestCase):
             response,
             "This invoice has already been assigned to a previous credit entry in this form.",
         )
+
+    def test_import_statement(self):
+        """Statements are imported with one existence query and one insert"""
+        ledger = factories.LedgerFactory.create()
+        factories.CreditEntryFactory.create(ledger=ledger, reference_number="known")
+        rows = [
+            {
+                "reference_number": reference_number,
+                "value_date": dt.date(2026, 1, 1),
+                "total": Decimal(10),
+                "payment_notice": "",
+            }
+            for reference_number in ["known", "new-1", "new-2", "new-1"]
+        ]
+
+        with self.assertNumQueries(2):
+            created = CreditEntry.objects.import_statement(ledger, rows)
+
+        self.assertEqual(
+            [entry.reference_number for entry in created], ["new-1", "new-2"]
+        )
+        self.assertEqual(CreditEntry.objects.count(), 3)
+        self.assertEqual(CreditEntry.objects.get(reference_number="new-1")._fts, "10")
+
+    def test_invoice_matcher(self):
+        """Open invoices are proposed by code and total, best matches first"""
+        self.assertEqual(
+            notice_codes("Rechnung 2026-0001-0002, x1234"),
+            {"2026", "0001", "0002", "2026-0001", "0001-0002", "2026-0001-0002"},
+        )
+
+        by_total = factories.InvoiceFactory.create(subtotal=100, liable_to_vat=False)
+        by_both = factories.InvoiceFactory.create(subtotal=100, liable_to_vat=False)
+        by_code = factories.InvoiceFactory.create(subtotal=90, liable_to_vat=False)
+        factories.InvoiceFactory.create(subtotal=50, liable_to_vat=False)
+        entry = factories.CreditEntryFactory.create(
+            total=100, payment_notice=f"{by_both.code} and {by_code.code}"
+        )
+
+        with self.assertNumQueries(1):
+            matcher = InvoiceMatcher()
+        self.assertEqual(
+            matcher.matches(entry),
+            [(by_both, True), (by_code, True), (by_total, False)],
+        )
+
+
+class RenderInvoicesTest(TransactionTestCase):
+    # Worker processes use their own connections and only see committed data
+
+    def test_render_invoices_pool(self):
+        """Invoice PDFs are rendered in worker processes"""
+        invoices = [
+            factories.InvoiceFactory.create(
+                invoiced_on=dt.date(2025, month, 1), status=Invoice.SENT
+            )
+            for month in [3, 4, 5]
+        ]
+
+        rendered = dict(render_invoices(invoices, workers=2, chunk_size=1))
+        self.assertEqual(set(rendered), set(invoices))
+        self.assertTrue(all(pdf.startswith(b"%PDF") for pdf in rendered.values()))
+
+    def test_export_debtors_command(self):
+        """The export_debtors command writes the debtors archive"""
+        invoice = factories.InvoiceFactory.create(
+            invoiced_on=dt.date(2025, 3, 1), status=Invoice.SENT
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "debtors.zip")
+            call_command("export_debtors", "2025", path, "--workers=2")
+            with zipfile.ZipFile(path) as zf:
+                names = set(zf.namelist())
+
+        self.assertEqual(names, {f"2025.03/{invoice.code}.pdf", "debtors.xlsx"})
@@ -19,7 +19,10 @@ urlpatterns = [
     path(
         "",
         generic.ListView.as_view(
-            model=CreditEntry, search_form_class=CreditEntrySearchForm
+            model=CreditEntry,
+            search_form_class=CreditEntrySearchForm,
+            keyset_pagination=True,
+            estimated_count=True,
         ),
         name="credit_control_creditentry_list",
     ),
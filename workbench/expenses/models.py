@@ -1,4 +1,6 @@
 import datetime as dt
+from contextlib import suppress
+from functools import lru_cache
 
 from django.contrib import messages
 from django.db import models
@@ -8,7 +10,7 @@ from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from workbench.accounts.models import User
-from workbench.expenses.rates import exchange_rates
+from workbench.expenses.rates import exchange_rates, provider
 from workbench.logbook.models import LoggedCost
 from workbench.tools.formats import Z2, currency, local_date_format
 from workbench.tools.models import Model, MoneyField
@@ -98,21 +100,53 @@ class ExpenseReport(Model):
         )
 
 
+@lru_cache(maxsize=64)
+def _stored_rates(day):
+    # Stored rates do not change anymore. Missing days raise and are therefore
+    # not cached, they may be backfilled later.
+    return ExchangeRates.objects.values_list("rates", flat=True).get(day=day)
+
+
 class ExchangeRatesQuerySet(models.QuerySet):
     def for_day(self, day):
-        try:
-            return self.get(day=day)
-        except self.model.DoesNotExist:
-            instance, _created = self.update_or_create(
-                day=day, defaults={"rates": exchange_rates(day)}
-            )
-            return instance
+        """
+        Return the rates table of ``day``, falling back to the newest stored
+        rates before ``day``
+
+        Rates are stored by the daily ``backfill_exchange_rates`` fairy task,
+        requests never wait for the provider.
+        """
+        with suppress(self.model.DoesNotExist):
+            return _stored_rates(day)
+        if instance := self.filter(day__lt=day).order_by("-day").first():
+            return instance.rates
+        raise LookupError(f"No exchange rates for {day} available")
+
+    def backfill(self, days):
+        """
+        Fetch the rates of all days without stored rates at once
+        """
+        days = set(days)
+        missing = sorted(
+            days - set(self.filter(day__in=days).values_list("day", flat=True))
+        )
+        if not missing:
+            return []
+        rates = provider()(missing)
+        return self.bulk_create(
+            [self.model(day=day, rates=rates[day]) for day in missing],
+            ignore_conflicts=True,
+        )
 
     def newest(self):
         try:
             return self.latest()
         except self.model.DoesNotExist:
-            return self.for_day(dt.date.today())
+            today = dt.date.today()
+            instance, _created = self.update_or_create(
+                day=today, defaults={"rates": exchange_rates(today)}
+            )
+            return instance
 
 
 class ExchangeRates(models.Model):
@@ -1,18 +1,63 @@
 import datetime as dt
+import json
+from bisect import bisect_right
+from functools import cache
 
 import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
 
 
-def exchange_rates(day=None):
+# Providers receive a list of days and return a dict mapping each day to its
+# rates table. The provider is configured using EXCHANGE_RATES_PROVIDER.
+
+
+def remote_rates(days):
     today = dt.date.today()
-    day = day or today
-    url = f"https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@{'latest' if day == today else day.isoformat()}/v1/currencies/chf.json"
-    data = requests.get(url, timeout=2).json()
-    # Format from old api.exchangeratesapi.io endpoint
-    return {
-        "base": "CHF",
-        "date": day.isoformat(),
-        "rates": {curr.upper(): rate for curr, rate in data["chf"].items()}
-        if data
-        else {},
-    }
+    result = {}
+    for day in days:
+        url = f"https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@{'latest' if day == today else day.isoformat()}/v1/currencies/chf.json"
+        data = requests.get(url, timeout=2).json()
+        # Format from old api.exchangeratesapi.io endpoint
+        result[day] = {
+            "base": "CHF",
+            "date": day.isoformat(),
+            "rates": {curr.upper(): rate for curr, rate in data["chf"].items()}
+            if data
+            else {},
+        }
+    return result
+
+
+@cache
+def _rates_file(path):
+    # Same format as workbench/fixtures/exchangerates.json
+    with open(path, encoding="utf-8") as f:
+        return {
+            dt.date.fromisoformat(row["fields"]["day"]): row["fields"]["rates"]
+            for row in json.load(f)
+        }
+
+
+def file_rates(days):
+    """
+    Look up rates in EXCHANGE_RATES_FILE, falling back to the newest rates
+    before the requested day
+    """
+    rates = _rates_file(settings.EXCHANGE_RATES_FILE)
+    known = sorted(rates)
+    result = {}
+    for day in days:
+        if not (idx := bisect_right(known, day)):
+            raise LookupError(f"No exchange rates for {day} available")
+        result[day] = rates[known[idx - 1]]
+    return result
+
+
+def provider():
+    return import_string(settings.EXCHANGE_RATES_PROVIDER)
+
+
+def exchange_rates(day=None):
+    day = day or dt.date.today()
+    return provider()([day])[day]
@@ -0,0 +1,10 @@
+import datetime as dt
+
+from workbench.expenses.models import ExchangeRates
+
+
+def backfill_exchange_rates():
+    today = dt.date.today()
+    ExchangeRates.objects.backfill(
+        today - dt.timedelta(days=offset) for offset in range(7)
+    )
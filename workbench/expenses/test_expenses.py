@@ -1,15 +1,18 @@
 import datetime as dt
+import io
 import json
 import os
 from unittest import mock
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.utils import timezone
 
 from workbench import factories
-from workbench.expenses.models import ExchangeRates, ExpenseReport
+from workbench.expenses.models import ExchangeRates, ExpenseReport, _stored_rates
 from workbench.expenses.rates import exchange_rates
 from workbench.logbook.models import LoggedCost
 from workbench.tools.formats import local_date_format
@@ -20,6 +23,9 @@ from workbench.tools.validation import in_days
 class ExpensesTest(TestCase):
     fixtures = ["exchangerates.json"]
 
+    def setUp(self):
+        _stored_rates.cache_clear()
+
     def test_logged_cost_deletion(self):
         """Archived logged costs cannot be deleted, others can"""
         costs = factories.LoggedCostFactory.create(archived_at=timezone.now())
@@ -281,6 +287,9 @@ def mocked_get(*args, **kwargs):
 
 @mock.patch("workbench.expenses.rates.requests.get", side_effect=mocked_get)
 class ExchangeRatesTest(TestCase):
+    def setUp(self):
+        _stored_rates.cache_clear()
+
     def test_exchange_rates_today(self, mock_get):
         """exchange_rates() without arguments fetches today's exchange rates"""
         exchange_rates()
@@ -300,3 +309,41 @@ class ExchangeRatesTest(TestCase):
                 "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@2019-10-12/v1/currencies/chf.json",
             ),
         )
+
+    @override_settings(
+        EXCHANGE_RATES_PROVIDER="workbench.expenses.rates.file_rates",
+        EXCHANGE_RATES_FILE=os.path.join(
+            settings.BASE_DIR, "workbench", "fixtures", "exchangerates.json"
+        ),
+    )
+    def test_backfill_from_file(self, mock_get):
+        """Exchange rates can be loaded in bulk from a local file"""
+        call_command(
+            "backfill_exchange_rates", "--range=20191210-20191212", stdout=io.StringIO()
+        )
+        self.assertEqual(ExchangeRates.objects.count(), 3)
+        self.assertEqual(
+            ExchangeRates.objects.for_day(dt.date(2019, 12, 12))["date"],
+            "2019-12-10",
+        )
+        self.assertEqual(ExchangeRates.objects.backfill([dt.date(2019, 12, 11)]), [])
+
+        with self.assertRaises(LookupError):
+            exchange_rates(dt.date(2019, 1, 1))
+        self.assertEqual(mock_get.call_count, 0)
+
+    def test_for_day_falls_back(self, mock_get):
+        """Missing days fall back to the newest earlier rates without fetching"""
+        ExchangeRates.objects.create(day=dt.date(2019, 12, 10), rates={"date": "a"})
+        self.assertEqual(
+            ExchangeRates.objects.for_day(dt.date(2019, 12, 12)), {"date": "a"}
+        )
+
+        ExchangeRates.objects.create(day=dt.date(2019, 12, 12), rates={"date": "b"})
+        self.assertEqual(
+            ExchangeRates.objects.for_day(dt.date(2019, 12, 12)), {"date": "b"}
+        )
+
+        with self.assertRaises(LookupError):
+            ExchangeRates.objects.for_day(dt.date(2019, 12, 9))
+        self.assertEqual(mock_get.call_count, 0)
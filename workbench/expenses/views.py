@@ -129,8 +129,7 @@ def convert(request):
         return JsonResponse({"cost": "", "error": error})
     try:
         rates = ExchangeRates.objects.for_day(form.cleaned_data["day"])
-    except Exception as exc:  # noqa: BLE001
-        # Request timeout, response format not JSON, etc...
+    except LookupError as exc:
         return JsonResponse({
             "cost": "",
             "error": "%s: %s"
@@ -141,6 +140,6 @@ def convert(request):
         })
 
     cost = form.cleaned_data["cost"] / Decimal(
-        str(rates.rates["rates"][form.cleaned_data["currency"]])
+        str(rates["rates"][form.cleaned_data["currency"]])
     )
     return JsonResponse({"cost": cost.quantize(Z2)})
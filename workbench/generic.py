@@ -10,6 +10,7 @@ from django.utils.text import capfirst
 from django.utils.translation import gettext as _, gettext_lazy
 
 from workbench.services.models import ServiceType
+from workbench.tools.pagination import KeysetPaginator, keyset_ordering
 
 
 class ToolsMixin:
@@ -75,6 +76,10 @@ class ListView(ToolsMixin, vanilla.ListView):
     paginate_by = 100
     search_form_class = None
     show_create_button = True
+    # Seek using the queryset's ordering instead of OFFSET, see
+    # workbench.tools.pagination
+    keyset_pagination = False
+    estimated_count = False
 
     @classonlymethod
     def as_view(cls, **initkwargs):
@@ -93,7 +98,7 @@ class ListView(ToolsMixin, vanilla.ListView):
             set(request.GET)
             - set(self.search_form.fields)
             # Also see workbench.js
-            - {"disposition", "error", "export", "page"}
+            - {"after", "before", "disposition", "error", "export", "page"}
         ):
             messages.warning(request, _("Invalid parameters to form."))
             return HttpResponseRedirect("?error=1")
@@ -107,6 +112,21 @@ class ListView(ToolsMixin, vanilla.ListView):
     def get_queryset(self):
         return self.search_form.filter(super().get_queryset())
 
+    def paginate_queryset(self, queryset, page_size):
+        ordering = keyset_ordering(queryset) if self.keyset_pagination else None
+        if ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(
+            queryset,
+            page_size,
+            ordering=ordering,
+            estimated_count=self.estimated_count,
+        )
+        return paginator.page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+
 
 class DetailView(ToolsMixin, vanilla.DetailView):
     def dispatch(self, request, *args, **kwargs):
@@ -276,18 +296,31 @@ class DeleteView(ToolsMixin, vanilla.DeleteView):
 class AutocompleteView(ToolsMixin, vanilla.ListView):
     filter = None
     label_from_instance = str
+    typeahead = None
+    limit = 50
 
     def get(self, request, *args, **kwargs):
-        q = request.GET.get("q")
-        queryset = self.get_queryset().search(q)
-        queryset = (
-            self.filter(queryset=queryset, request=request) if self.filter else queryset
+        if not (q := request.GET.get("q")):
+            return JsonResponse({"results": []})
+
+        results, complete = (
+            self.typeahead.search(q, request=request, limit=self.limit)
+            if self.typeahead
+            else ([], False)
         )
-        return JsonResponse({
-            "results": [
+        # Fall back to the database for objects not contained in the
+        # in-memory index (e.g. closed projects) or when nothing matched
+        if not results or (not complete and len(results) < self.limit):
+            queryset = self.get_queryset().search(q)
+            queryset = (
+                self.filter(queryset=queryset, request=request)
+                if self.filter
+                else queryset
+            )
+            if results:
+                queryset = queryset.exclude(pk__in=[row["value"] for row in results])
+            results.extend(
                 {"label": self.label_from_instance(instance), "value": instance.pk}
-                for instance in queryset[:50]
-            ]
-            if q
-            else []
-        })
+                for instance in queryset[: self.limit - len(results)]
+            )
+        return JsonResponse({"results": results})
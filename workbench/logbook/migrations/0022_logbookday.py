@@ -0,0 +1,377 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Keep logbook_logbookday in sync with logged hours and costs. Writes to the
+# logbook recompute the affected (day, user, service) rows; changes to the
+# project of a service or to the customer or type of a project update the
+# denormalized columns.
+TRIGGERS_SQL = """\
+CREATE OR REPLACE FUNCTION logbook_logbookday_refresh(
+  _days date[], _users integer[], _services integer[]
+) RETURNS void AS $$
+BEGIN
+  WITH keys AS (
+    SELECT DISTINCT day, user_id, service_id
+    FROM unnest(_days, _users, _services) AS k(day, user_id, service_id)
+  ),
+  agg AS (
+    SELECT
+      keys.day,
+      keys.user_id,
+      keys.service_id,
+      ps.project_id,
+      p.customer_id,
+      p.type AS project_type,
+      p.internal_type_id,
+      COALESCE(lh.hours, 0) AS hours,
+      lh.hours_count,
+      COALESCE(lh.logging_delay, 0) AS logging_delay,
+      COALESCE(lc.cost, 0) AS cost,
+      COALESCE(lc.third_party_costs, 0) AS third_party_costs,
+      lc.cost_count
+    FROM keys
+    JOIN projects_service ps ON keys.service_id=ps.id
+    JOIN projects_project p ON ps.project_id=p.id
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(hours) AS hours,
+        COUNT(*) AS hours_count,
+        SUM(extract(epoch FROM created_at - (rendered_on + interval '12 hours')))
+          AS logging_delay
+      FROM logbook_loggedhours
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lh
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(cost) AS cost,
+        SUM(third_party_costs) AS third_party_costs,
+        COUNT(*) AS cost_count
+      FROM logbook_loggedcost
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lc
+  ),
+  deleted AS (
+    DELETE FROM logbook_logbookday d
+    USING agg
+    WHERE
+      d.day=agg.day
+      AND d.user_id=agg.user_id
+      AND d.service_id=agg.service_id
+      AND agg.hours_count=0
+      AND agg.cost_count=0
+  )
+  INSERT INTO logbook_logbookday (
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  )
+  SELECT
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  FROM agg
+  WHERE hours_count > 0 OR cost_count > 0
+  ON CONFLICT (day, user_id, service_id) DO UPDATE SET
+    project_id=EXCLUDED.project_id,
+    customer_id=EXCLUDED.customer_id,
+    project_type=EXCLUDED.project_type,
+    internal_type_id=EXCLUDED.internal_type_id,
+    hours=EXCLUDED.hours,
+    hours_count=EXCLUDED.hours_count,
+    logging_delay=EXCLUDED.logging_delay,
+    cost=EXCLUDED.cost,
+    third_party_costs=EXCLUDED.third_party_costs;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_logbookday_logbook() RETURNS trigger AS $$
+DECLARE
+  _days date[];
+  _users integer[];
+  _services integer[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(rendered_on), array_agg(rendered_by_id), array_agg(service_id)
+    INTO _days, _users, _services
+    FROM new_rows;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(rendered_on), array_agg(rendered_by_id), array_agg(service_id)
+    INTO _days, _users, _services
+    FROM old_rows;
+  ELSE
+    SELECT array_agg(rendered_on), array_agg(rendered_by_id), array_agg(service_id)
+    INTO _days, _users, _services
+    FROM (
+      SELECT rendered_on, rendered_by_id, service_id FROM old_rows
+      UNION
+      SELECT rendered_on, rendered_by_id, service_id FROM new_rows
+    ) rows;
+  END IF;
+  PERFORM logbook_logbookday_refresh(_days, _users, _services);
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_logbookday_service() RETURNS trigger AS $$
+BEGIN
+  UPDATE logbook_logbookday d SET
+    project_id=p.id,
+    customer_id=p.customer_id,
+    project_type=p.type,
+    internal_type_id=p.internal_type_id
+  FROM projects_project p
+  WHERE p.id=NEW.project_id AND d.service_id=NEW.id;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_logbookday_project() RETURNS trigger AS $$
+BEGIN
+  UPDATE logbook_logbookday SET
+    customer_id=NEW.customer_id,
+    project_type=NEW.type,
+    internal_type_id=NEW.internal_type_id
+  WHERE project_id=NEW.id;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_logbookday_rebuild() RETURNS void AS $$
+BEGIN
+  DELETE FROM logbook_logbookday;
+  INSERT INTO logbook_logbookday (
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  )
+  SELECT
+    day, user_id, service_id, ps.project_id, p.customer_id, p.type,
+    p.internal_type_id,
+    COALESCE(lh.hours, 0),
+    COALESCE(lh.hours_count, 0),
+    COALESCE(lh.logging_delay, 0),
+    COALESCE(lc.cost, 0),
+    COALESCE(lc.third_party_costs, 0)
+  FROM (
+    SELECT
+      rendered_on AS day,
+      rendered_by_id AS user_id,
+      service_id,
+      SUM(hours) AS hours,
+      COUNT(*) AS hours_count,
+      SUM(extract(epoch FROM created_at - (rendered_on + interval '12 hours')))
+        AS logging_delay
+    FROM logbook_loggedhours
+    GROUP BY rendered_on, rendered_by_id, service_id
+  ) lh
+  FULL OUTER JOIN (
+    SELECT
+      rendered_on AS day,
+      rendered_by_id AS user_id,
+      service_id,
+      SUM(cost) AS cost,
+      SUM(third_party_costs) AS third_party_costs
+    FROM logbook_loggedcost
+    GROUP BY rendered_on, rendered_by_id, service_id
+  ) lc USING (day, user_id, service_id)
+  JOIN projects_service ps ON service_id=ps.id
+  JOIN projects_project p ON ps.project_id=p.id;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_logbookday_insert ON logbook_loggedhours;
+CREATE TRIGGER logbook_logbookday_insert AFTER INSERT ON logbook_loggedhours
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_update ON logbook_loggedhours;
+CREATE TRIGGER logbook_logbookday_update AFTER UPDATE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_delete ON logbook_loggedhours;
+CREATE TRIGGER logbook_logbookday_delete AFTER DELETE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_insert ON logbook_loggedcost;
+CREATE TRIGGER logbook_logbookday_insert AFTER INSERT ON logbook_loggedcost
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_update ON logbook_loggedcost;
+CREATE TRIGGER logbook_logbookday_update AFTER UPDATE ON logbook_loggedcost
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_delete ON logbook_loggedcost;
+CREATE TRIGGER logbook_logbookday_delete AFTER DELETE ON logbook_loggedcost
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE logbook_logbookday_logbook();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_service ON projects_service;
+CREATE TRIGGER logbook_logbookday_service AFTER UPDATE ON projects_service
+  FOR EACH ROW WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id)
+  EXECUTE PROCEDURE logbook_logbookday_service();
+
+DROP TRIGGER IF EXISTS logbook_logbookday_project ON projects_project;
+CREATE TRIGGER logbook_logbookday_project AFTER UPDATE ON projects_project
+  FOR EACH ROW WHEN (
+    OLD.customer_id IS DISTINCT FROM NEW.customer_id
+    OR OLD.type IS DISTINCT FROM NEW.type
+    OR OLD.internal_type_id IS DISTINCT FROM NEW.internal_type_id
+  )
+  EXECUTE PROCEDURE logbook_logbookday_project();
+
+SELECT logbook_logbookday_rebuild();
+"""
+
+DROP_TRIGGERS_SQL = """\
+DROP TRIGGER IF EXISTS logbook_logbookday_insert ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS logbook_logbookday_update ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS logbook_logbookday_delete ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS logbook_logbookday_insert ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS logbook_logbookday_update ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS logbook_logbookday_delete ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS logbook_logbookday_service ON projects_service;
+DROP TRIGGER IF EXISTS logbook_logbookday_project ON projects_project;
+DROP FUNCTION IF EXISTS logbook_logbookday_rebuild();
+DROP FUNCTION IF EXISTS logbook_logbookday_project();
+DROP FUNCTION IF EXISTS logbook_logbookday_service();
+DROP FUNCTION IF EXISTS logbook_logbookday_logbook();
+DROP FUNCTION IF EXISTS logbook_logbookday_refresh(date[], integer[], integer[]);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contacts", "0013_organization_is_archived"),
+        (
+            "logbook",
+            "0021_remove_loggedhours_logbook_log_rendere_ea492e_idx_and_more_updated",
+        ),
+        ("projects", "0033_projectstatistics"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LogbookDay",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="day")),
+                (
+                    "project_type",
+                    models.CharField(max_length=20, verbose_name="project type"),
+                ),
+                (
+                    "hours",
+                    models.DecimalField(
+                        decimal_places=1, max_digits=14, verbose_name="hours"
+                    ),
+                ),
+                (
+                    "hours_count",
+                    models.IntegerField(verbose_name="logged hours entries"),
+                ),
+                (
+                    "logging_delay",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text=(
+                            "Sum of seconds between noon of the day and the"
+                            " logging time."
+                        ),
+                        max_digits=20,
+                        verbose_name="logging delay",
+                    ),
+                ),
+                (
+                    "cost",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=14, verbose_name="cost"
+                    ),
+                ),
+                (
+                    "third_party_costs",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=14,
+                        verbose_name="third party costs",
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="contacts.organization",
+                        verbose_name="customer",
+                    ),
+                ),
+                (
+                    "internal_type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="projects.internaltype",
+                        verbose_name="internal type",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.project",
+                        verbose_name="project",
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.service",
+                        verbose_name="service",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "logbook day",
+                "verbose_name_plural": "logbook days",
+                "ordering": ["-day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "user", "service"),
+                        name="logbook_logbookday_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
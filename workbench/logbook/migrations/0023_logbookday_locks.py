@@ -0,0 +1,195 @@
+from django.db import migrations
+
+
+# Concurrent transactions writing to the logbook recompute the same rows from
+# snapshots which do not include each other's uncommitted entries; the last
+# upsert would win and lose the hours of the other transaction. Take a
+# transaction level advisory lock per (day, user, service) key before
+# recomputing. The recomputation runs with a new snapshot after acquiring the
+# locks and therefore sees the entries committed in the meantime.
+FUNCTION_SQL = """\
+CREATE OR REPLACE FUNCTION logbook_logbookday_refresh(
+  _days date[], _users integer[], _services integer[]
+) RETURNS void AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(
+    'logbook_logbookday'::regclass::oid::integer, key
+  )
+  FROM (
+    SELECT DISTINCT hashtext(concat_ws('/', day, user_id, service_id)) AS key
+    FROM unnest(_days, _users, _services) AS k(day, user_id, service_id)
+    ORDER BY 1
+  ) AS keys;
+
+  WITH keys AS (
+    SELECT DISTINCT day, user_id, service_id
+    FROM unnest(_days, _users, _services) AS k(day, user_id, service_id)
+  ),
+  agg AS (
+    SELECT
+      keys.day,
+      keys.user_id,
+      keys.service_id,
+      ps.project_id,
+      p.customer_id,
+      p.type AS project_type,
+      p.internal_type_id,
+      COALESCE(lh.hours, 0) AS hours,
+      lh.hours_count,
+      COALESCE(lh.logging_delay, 0) AS logging_delay,
+      COALESCE(lc.cost, 0) AS cost,
+      COALESCE(lc.third_party_costs, 0) AS third_party_costs,
+      lc.cost_count
+    FROM keys
+    JOIN projects_service ps ON keys.service_id=ps.id
+    JOIN projects_project p ON ps.project_id=p.id
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(hours) AS hours,
+        COUNT(*) AS hours_count,
+        SUM(extract(epoch FROM created_at - (rendered_on + interval '12 hours')))
+          AS logging_delay
+      FROM logbook_loggedhours
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lh
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(cost) AS cost,
+        SUM(third_party_costs) AS third_party_costs,
+        COUNT(*) AS cost_count
+      FROM logbook_loggedcost
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lc
+  ),
+  deleted AS (
+    DELETE FROM logbook_logbookday d
+    USING agg
+    WHERE
+      d.day=agg.day
+      AND d.user_id=agg.user_id
+      AND d.service_id=agg.service_id
+      AND agg.hours_count=0
+      AND agg.cost_count=0
+  )
+  INSERT INTO logbook_logbookday (
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  )
+  SELECT
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  FROM agg
+  WHERE hours_count > 0 OR cost_count > 0
+  ON CONFLICT (day, user_id, service_id) DO UPDATE SET
+    project_id=EXCLUDED.project_id,
+    customer_id=EXCLUDED.customer_id,
+    project_type=EXCLUDED.project_type,
+    internal_type_id=EXCLUDED.internal_type_id,
+    hours=EXCLUDED.hours,
+    hours_count=EXCLUDED.hours_count,
+    logging_delay=EXCLUDED.logging_delay,
+    cost=EXCLUDED.cost,
+    third_party_costs=EXCLUDED.third_party_costs;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION logbook_logbookday_refresh(
+  _days date[], _users integer[], _services integer[]
+) RETURNS void AS $$
+BEGIN
+  WITH keys AS (
+    SELECT DISTINCT day, user_id, service_id
+    FROM unnest(_days, _users, _services) AS k(day, user_id, service_id)
+  ),
+  agg AS (
+    SELECT
+      keys.day,
+      keys.user_id,
+      keys.service_id,
+      ps.project_id,
+      p.customer_id,
+      p.type AS project_type,
+      p.internal_type_id,
+      COALESCE(lh.hours, 0) AS hours,
+      lh.hours_count,
+      COALESCE(lh.logging_delay, 0) AS logging_delay,
+      COALESCE(lc.cost, 0) AS cost,
+      COALESCE(lc.third_party_costs, 0) AS third_party_costs,
+      lc.cost_count
+    FROM keys
+    JOIN projects_service ps ON keys.service_id=ps.id
+    JOIN projects_project p ON ps.project_id=p.id
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(hours) AS hours,
+        COUNT(*) AS hours_count,
+        SUM(extract(epoch FROM created_at - (rendered_on + interval '12 hours')))
+          AS logging_delay
+      FROM logbook_loggedhours
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lh
+    CROSS JOIN LATERAL (
+      SELECT
+        SUM(cost) AS cost,
+        SUM(third_party_costs) AS third_party_costs,
+        COUNT(*) AS cost_count
+      FROM logbook_loggedcost
+      WHERE
+        rendered_on=keys.day
+        AND rendered_by_id=keys.user_id
+        AND service_id=keys.service_id
+    ) lc
+  ),
+  deleted AS (
+    DELETE FROM logbook_logbookday d
+    USING agg
+    WHERE
+      d.day=agg.day
+      AND d.user_id=agg.user_id
+      AND d.service_id=agg.service_id
+      AND agg.hours_count=0
+      AND agg.cost_count=0
+  )
+  INSERT INTO logbook_logbookday (
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  )
+  SELECT
+    day, user_id, service_id, project_id, customer_id, project_type,
+    internal_type_id, hours, hours_count, logging_delay, cost, third_party_costs
+  FROM agg
+  WHERE hours_count > 0 OR cost_count > 0
+  ON CONFLICT (day, user_id, service_id) DO UPDATE SET
+    project_id=EXCLUDED.project_id,
+    customer_id=EXCLUDED.customer_id,
+    project_type=EXCLUDED.project_type,
+    internal_type_id=EXCLUDED.internal_type_id,
+    hours=EXCLUDED.hours,
+    hours_count=EXCLUDED.hours_count,
+    logging_delay=EXCLUDED.logging_delay,
+    cost=EXCLUDED.cost,
+    third_party_costs=EXCLUDED.third_party_costs;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("logbook", "0022_logbookday"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTION_SQL, REVERSE_SQL),
+    ]
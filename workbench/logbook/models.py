@@ -246,3 +246,67 @@ class Break(Model):
         return False
 
     allow_delete = allow_update
+
+
+class LogbookDay(models.Model):
+    """
+    Logged hours and costs aggregated per day, user and service
+
+    The project, customer and project type columns are denormalized for
+    reporting. Rows are maintained by database triggers, see
+    ``logbook.0022_logbookday``; ``rebuild_logbook_days`` recreates all rows.
+    """
+
+    day = models.DateField(_("day"))
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="+", verbose_name=_("user")
+    )
+    service = models.ForeignKey(
+        Service, on_delete=models.CASCADE, related_name="+", verbose_name=_("service")
+    )
+    project = models.ForeignKey(
+        "projects.Project",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("project"),
+    )
+    customer = models.ForeignKey(
+        "contacts.Organization",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("customer"),
+    )
+    project_type = models.CharField(_("project type"), max_length=20)
+    internal_type = models.ForeignKey(
+        "projects.InternalType",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="+",
+        verbose_name=_("internal type"),
+    )
+    hours = models.DecimalField(_("hours"), max_digits=14, decimal_places=1)
+    hours_count = models.IntegerField(_("logged hours entries"))
+    logging_delay = models.DecimalField(
+        _("logging delay"),
+        max_digits=20,
+        decimal_places=2,
+        help_text=_("Sum of seconds between noon of the day and the logging time."),
+    )
+    cost = models.DecimalField(_("cost"), max_digits=14, decimal_places=2)
+    third_party_costs = models.DecimalField(
+        _("third party costs"), max_digits=14, decimal_places=2
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "user", "service"], name="logbook_logbookday_unique"
+            )
+        ]
+        ordering = ["-day"]
+        verbose_name = _("logbook day")
+        verbose_name_plural = _("logbook days")
+
+    def __str__(self):
+        return f"{local_date_format(self.day)} {self.user}: {self.service}"
@@ -6,6 +6,12 @@ from django.utils.translation import gettext_lazy as _
 from workbench.accounts.models import User
 from workbench.tools.formats import Z1, days, hours
 from workbench.tools.reporting import query
+from workbench.tools.routing import read_alias
+
+
+def rebuild_logbook_days():
+    with connections["default"].cursor() as cursor:
+        cursor.execute("SELECT logbook_logbookday_rebuild()")
 
 
 def classify_logging_delay(delay):
@@ -20,19 +26,15 @@ def classify_logging_delay(delay):
 
 
 def mean_logging_delay(date_range):
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(
             """
-WITH sq as (
-    SELECT
-        rendered_by_id AS user_id,
-        AVG(created_at - (rendered_on + interval '12 hours')) AS delay
-    FROM logbook_loggedhours
-    WHERE rendered_on BETWEEN %s AND %s
-    GROUP BY user_id
-)
-SELECT user_id, cast(extract(epoch from delay) as numeric) / 3600
-FROM sq
+SELECT
+    user_id,
+    SUM(logging_delay) / SUM(hours_count) / 3600
+FROM logbook_logbookday
+WHERE day BETWEEN %s AND %s AND hours_count > 0
+GROUP BY user_id
             """,
             date_range,
         )
@@ -44,13 +46,17 @@ FROM sq
 
 
 def logged_hours_stats(date_range):
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(
             """
-SELECT rendered_by_id, COUNT(hours), SUM(hours), AVG(hours)
-FROM logbook_loggedhours
-WHERE rendered_on BETWEEN %s AND %s
-GROUP BY rendered_by_id
+SELECT
+    user_id,
+    SUM(hours_count),
+    SUM(hours),
+    SUM(hours) / SUM(hours_count)
+FROM logbook_logbookday
+WHERE day BETWEEN %s AND %s AND hours_count > 0
+GROUP BY user_id
             """,
             date_range,
         )
@@ -75,11 +81,11 @@ with breaks as (
 ),
 logged_hours as (
     select
-        rendered_by_id as user_id,
-        rendered_on as day,
+        user_id,
+        day,
         sum(hours) as hours
-    from logbook_loggedhours
-    where rendered_on between %s and %s
+    from logbook_logbookday
+    where day between %s and %s and hours_count > 0
     group by user_id, day
 ),
 combined as (
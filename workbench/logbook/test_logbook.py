@@ -1,15 +1,26 @@
 import datetime as dt
+import io
+import threading
 
-from django.test import TestCase
+from django.db import connections, transaction
+from django.http import Http404
+from django.test import TestCase, TransactionTestCase
 from django.test.utils import override_settings
 from django.utils import timezone
+from openpyxl import load_workbook
 from time_machine import travel
 
 from workbench import factories
 from workbench.accounts.features import FEATURES, F
-from workbench.logbook.models import LoggedCost, LoggedHours
+from workbench.logbook.models import LogbookDay, LoggedCost, LoggedHours
+from workbench.logbook.reporting import rebuild_logbook_days
 from workbench.projects.models import Project
 from workbench.tools.forms import WarningsForm
+from workbench.tools.pagination import (
+    KeysetPaginator,
+    encode_cursor,
+    keyset_ordering,
+)
 from workbench.tools.testing import check_code, messages
 from workbench.tools.validation import in_days, logbook_lock
 
@@ -460,6 +471,106 @@ class LogbookTest(TestCase):
         code("not_archived=1")
         code("export=xlsx")
 
+    def test_logged_hours_export(self):
+        """The logged hours export contains entries and pivot tables"""
+        hours = factories.LoggedHoursFactory.create(hours=2)
+        factories.LoggedHoursFactory.create(service=hours.service, hours=3)
+        self.client.force_login(hours.rendered_by)
+
+        response = self.client.get("/logbook/hours/?export=xlsx")
+        workbook = load_workbook(io.BytesIO(response.content))
+        self.assertEqual(
+            workbook.sheetnames,
+            [
+                "logged-hours",
+                "by-service-and-user",
+                "by-service-and-month",
+                "by-user-and-month",
+            ],
+        )
+        self.assertEqual(workbook["logged-hours"].max_row, 3)
+        self.assertEqual(workbook["by-service-and-user"]["D2"].value, 5)
+
+    def test_keyset_pagination(self):
+        """The logbook is paginated by seeking instead of using OFFSET"""
+        for day in range(5):
+            factories.LoggedHoursFactory.create(rendered_on=in_days(-day))
+
+        queryset = LoggedHours.objects.all()
+        paginator = KeysetPaginator(queryset, 2, ordering=keyset_ordering(queryset))
+        first = paginator.page()
+        second = paginator.page(after=first.next_cursor)
+        third = paginator.page(after=second.next_cursor)
+
+        self.assertEqual([len(page) for page in [first, second, third]], [2, 2, 1])
+        self.assertEqual(
+            [*first.object_list, *second.object_list, *third.object_list],
+            list(queryset),
+        )
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+        self.assertEqual(
+            paginator.page(before=second.previous_cursor).object_list,
+            first.object_list,
+        )
+
+        self.client.force_login(factories.UserFactory.create())
+        code = check_code(self, "/logbook/hours/")
+        code(f"after={first.next_cursor}")
+        code(f"before={second.previous_cursor}")
+        code("after=garbage", 404)
+        cursor = encode_cursor(["2019-01-01", "2019-01-01T12:00:00+00:00", "x"])
+        code(f"after={cursor}", 404)
+
+        # Tampered cursors with values of the wrong type
+        paginator = KeysetPaginator(queryset, 2, ordering=["service", "pk"])
+        with self.assertRaises(Http404):
+            paginator.page(after=encode_cursor(["x", 1]))
+
+    def test_logbook_days(self):
+        """The daily logbook rollup follows changes to the logbook"""
+        hours = factories.LoggedHoursFactory.create(hours=2)
+        factories.LoggedHoursFactory.create(
+            service=hours.service, rendered_by=hours.rendered_by, hours=3
+        )
+        factories.LoggedCostFactory.create(
+            service=hours.service,
+            created_by=hours.rendered_by,
+            cost=50,
+            third_party_costs=40,
+        )
+
+        def days():
+            return list(
+                LogbookDay.objects.values_list(
+                    "project", "hours", "hours_count", "cost", "third_party_costs"
+                )
+            )
+
+        project = hours.service.project
+        self.assertEqual(days(), [(project.id, 5, 2, 50, 40)])
+
+        hours.rendered_on = in_days(-1)
+        hours.save()
+        self.assertEqual(
+            sorted(days(), key=lambda row: row[1]),
+            [(project.id, 2, 1, 0, 0), (project.id, 3, 1, 50, 40)],
+        )
+
+        other = factories.ProjectFactory.create()
+        hours.service.project = other
+        hours.service.save()
+        self.assertEqual({row[0] for row in days()}, {other.id})
+
+        LoggedHours.objects.all().delete()
+        LoggedCost.objects.all().delete()
+        self.assertEqual(days(), [])
+
+        factories.LoggedHoursFactory.create(hours=4)
+        LogbookDay.objects.all().delete()
+        rebuild_logbook_days()
+        self.assertEqual(LogbookDay.objects.get().hours, 4)
+
     def test_logged_cost_list(self):
         """Filter form smoke test"""
         cost = factories.LoggedCostFactory.create()
@@ -773,3 +884,42 @@ class LogbookTest(TestCase):
 
         hours.refresh_from_db()
         self.assertEqual(hours.service, service)
+
+
+class LogbookDayConcurrencyTest(TransactionTestCase):
+    # The second writer uses its own connection in a thread and only sees
+    # committed data
+
+    def test_concurrent_logbook_days(self):
+        """Concurrent writes to the same logbook day do not lose hours"""
+        hours = factories.LoggedHoursFactory.create(hours=2)
+
+        def log_hours():
+            try:
+                factories.LoggedHoursFactory.create(
+                    service=hours.service,
+                    created_by=hours.created_by,
+                    rendered_by=hours.rendered_by,
+                    rendered_on=hours.rendered_on,
+                    hours=3,
+                )
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            factories.LoggedHoursFactory.create(
+                service=hours.service,
+                created_by=hours.created_by,
+                rendered_by=hours.rendered_by,
+                rendered_on=hours.rendered_on,
+                hours=4,
+            )
+            thread = threading.Thread(target=log_hours)
+            thread.start()
+            # The second writer waits for this transaction to commit
+            thread.join(timeout=1)
+            self.assertTrue(thread.is_alive())
+        thread.join()
+
+        day = LogbookDay.objects.get()
+        self.assertEqual((day.hours, day.hours_count), (9, 3))
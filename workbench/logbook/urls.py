@@ -31,6 +31,8 @@ urlpatterns = [
             model=LoggedHours,
             search_form_class=LoggedHoursSearchForm,
             show_create_button=False,
+            keyset_pagination=True,
+            estimated_count=True,
         ),
         name="logbook_loggedhours_list",
     ),
@@ -73,6 +75,8 @@ urlpatterns = [
             model=LoggedCost,
             search_form_class=LoggedCostSearchForm,
             show_create_button=False,
+            keyset_pagination=True,
+            estimated_count=True,
         ),
         name="logbook_loggedcost_list",
     ),
@@ -109,6 +113,8 @@ urlpatterns = [
             model=Break,
             search_form_class=BreakSearchForm,
             # show_create_button=False,
+            keyset_pagination=True,
+            estimated_count=True,
         ),
         name="logbook_break_list",
     ),
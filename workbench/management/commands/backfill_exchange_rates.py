@@ -0,0 +1,29 @@
+import datetime as dt
+
+from django.core.management import BaseCommand
+
+from workbench.expenses.models import ExchangeRates
+from workbench.management.commands.squeeze import range_type
+
+
+class Command(BaseCommand):
+    help = "Load and store the exchange rates of all days in a range"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--range",
+            type=range_type,
+            help="Specify as YYYYMMDD-YYYYMMDD, defaults to the last 30 days",
+        )
+
+    def handle(self, **options):
+        date_from, date_until = options["range"] or [
+            dt.date.today() - dt.timedelta(days=30),
+            dt.date.today(),
+        ]
+        days = [
+            date_from + dt.timedelta(days=offset)
+            for offset in range((date_until - date_from).days + 1)
+        ]
+        created = ExchangeRates.objects.backfill(days)
+        self.stdout.write(f"Loaded exchange rates of {len(created)} days")
@@ -0,0 +1,116 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from workbench.benchmark import ENGINES, TODAY, compare, generate, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic dataset, time the reporting engines and"
+        " write a JSON report. The generated data is rolled back unless"
+        " --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--years", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--engine",
+            action="append",
+            choices=ENGINES,
+            help="Only run the given engine (may be given several times).",
+        )
+        parser.add_argument(
+            "--no-generate",
+            action="store_true",
+            help="Benchmark the data already present in the database.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the generated data instead of rolling it back.",
+        )
+        parser.add_argument("--output", type=str, metavar="FILE.json")
+        parser.add_argument(
+            "--compare",
+            type=str,
+            metavar="FILE.json",
+            help="Compare the results with a previous report.",
+        )
+
+    def handle(self, **options):
+        if settings.LIVE:
+            raise CommandError("Refusing to run benchmarks against a live database.")
+
+        previous = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous.get("today") != TODAY.isoformat():
+                raise CommandError(
+                    f"Cannot compare with {options['compare']}, its reference day"
+                    f" {previous.get('today')} differs from {TODAY.isoformat()}."
+                )
+
+        with transaction.atomic():
+            scale = None
+            if not options["no_generate"]:
+                self.stderr.write("Generating data…")
+                scale = generate(
+                    users=options["users"],
+                    years=options["years"],
+                    seed=options["seed"],
+                )
+                self.stderr.write(json.dumps(scale))
+            results = run(repeat=options["repeat"], only=options["engine"])
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                check=True,
+                cwd=settings.BASE_DIR,
+                text=True,
+            ).stdout.strip()
+        except OSError, subprocess.CalledProcessError:
+            commit = None
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "commit": commit,
+            "today": TODAY.isoformat(),
+            "scale": scale,
+            "engines": results,
+        }
+        for name, result in results.items():
+            self.stderr.write(
+                f"{name:<40} cold {result['cold']:>10.1f} ms"
+                f"  median {result['median']:>10.1f} ms"
+                f"  {result['queries']:>6} queries"
+            )
+
+        if previous:
+            for name, before, after, ratio, queries_before, queries_after in compare(
+                previous, report
+            ):
+                self.stderr.write(
+                    f"{name:<40} {before:>10.1f} → {after:>10.1f} ms"
+                    f" ({ratio:.2f}×), {queries_before} → {queries_after} queries"
+                    if ratio is not None
+                    else f"{name:<40} {queries_before} → {queries_after} queries"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, default=str)
+        else:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
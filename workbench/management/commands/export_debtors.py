@@ -0,0 +1,29 @@
+import datetime as dt
+import os
+
+from django.core.management import BaseCommand
+
+from workbench.credit_control.reporting import paid_debtors_zip
+
+
+class Command(BaseCommand):
+    help = "Export the debtors archive of a year, rendering PDFs in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("year", type=int)
+        parser.add_argument("output", type=str, metavar="FILE.zip")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes rendering invoice PDFs.",
+        )
+
+    def handle(self, **options):
+        year = options["year"]
+        with open(options["output"], "wb") as file:
+            paid_debtors_zip(
+                [dt.date(year, 1, 1), dt.date(year, 12, 31)],
+                file=file,
+                workers=options["workers"],
+            )
@@ -1,32 +1,112 @@
+import json
+
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 from django.utils.translation import activate
 
 from workbench.accounts.middleware import set_user_name
 from workbench.accounts.tasks import coffee_invites, work_anniversaries_notice
-from workbench.audit.tasks import prune_audit
+from workbench.audit.models import TaskRun
+from workbench.audit.tasks import prune_audit, prune_request_samples
 from workbench.awt.tasks import annual_working_time_warnings_mails
+from workbench.expenses.tasks import backfill_exchange_rates
 from workbench.invoices.tasks import (
     create_recurring_invoices_and_notify,
     send_unsent_projected_invoices_reminders,
     tuesday_autodunning,
 )
 from workbench.planning.updates import changes_mails
-from workbench.reporting.tasks import create_accruals_for_last_month
+from workbench.reporting.tasks import (
+    create_accruals_for_last_month,
+    refresh_key_data_snapshot,
+)
+from workbench.tools import scheduler
+from workbench.tools.scheduler import Task
+
+
+TASKS = [
+    Task("accruals", create_accruals_for_last_month),
+    Task("recurring_invoices", create_recurring_invoices_and_notify),
+    Task(
+        "key_data_snapshot",
+        refresh_key_data_snapshot,
+        depends_on=["accruals", "recurring_invoices"],
+    ),
+    Task("coffee_invites", coffee_invites),
+    Task("planning_changes", changes_mails),
+    Task("awt_warnings", annual_working_time_warnings_mails),
+    Task(
+        "projected_invoices_reminders",
+        send_unsent_projected_invoices_reminders,
+        depends_on=["recurring_invoices"],
+    ),
+    Task("autodunning", tuesday_autodunning),
+    Task("prune_audit", prune_audit),
+    Task("prune_request_samples", prune_request_samples),
+    Task("work_anniversaries", work_anniversaries_notice),
+    Task("exchange_rates", backfill_exchange_rates),
+]
+
+
+def setup():
+    activate(settings.WORKBENCH.PDF_LANGUAGE)
+    set_user_name("Fairy tasks")
 
 
 class Command(BaseCommand):
     help = "Fairy tasks"
 
+    def add_arguments(self, parser):
+        names = [task.name for task in TASKS]
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=names,
+            help="Only run the given task (may be given several times).",
+        )
+        parser.add_argument(
+            "--skip",
+            action="append",
+            choices=names,
+            help="Skip the given task (may be given several times).",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--report",
+            type=str,
+            metavar="FILE.json",
+            help="Write a JSON report of the run, use - for stdout.",
+        )
+
     def handle(self, **options):
-        activate(settings.WORKBENCH.PDF_LANGUAGE)
-        set_user_name("Fairy tasks")
-        create_accruals_for_last_month()
-        create_recurring_invoices_and_notify()
-        coffee_invites()
-        changes_mails()
-        annual_working_time_warnings_mails()
-        send_unsent_projected_invoices_reminders()
-        tuesday_autodunning()
-        prune_audit()
-        work_anniversaries_notice()
+        results = scheduler.run(
+            scheduler.select(TASKS, only=options["only"], skip=options["skip"]),
+            workers=options["workers"],
+            setup=setup,
+        )
+
+        TaskRun.objects.bulk_create([
+            TaskRun(
+                name=name,
+                status=result["status"],
+                started_at=result["started_at"],
+                duration=result["duration"],
+                error=result["error"],
+            )
+            for name, result in results.items()
+        ])
+
+        if options["report"]:
+            report = json.dumps(results, indent=2, default=str)
+            if options["report"] == "-":
+                self.stdout.write(report)
+            else:
+                with open(options["report"], "w", encoding="utf-8") as f:
+                    f.write(report)
+
+        if failed := [
+            name
+            for name, result in results.items()
+            if result["status"] != scheduler.SUCCESS
+        ]:
+            raise CommandError(f"Tasks did not succeed: {', '.join(failed)}")
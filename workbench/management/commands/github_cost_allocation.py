@@ -32,6 +32,7 @@ from workbench.projects.github_cost_allocation import (
     join_with_workbench,
 )
 from workbench.tools.formats import Z1
+from workbench.tools.routing import reporting
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
 
@@ -60,6 +61,7 @@ class Command(BaseCommand):
             help="Send the XLSX report by email to these addresses (comma-separated).",
         )
 
+    @reporting()
     def handle(self, *, project_url, output, mailto, **options):
         activate("de")
 
@@ -75,11 +77,12 @@ class Command(BaseCommand):
             return
 
         self.stdout.write(f"Fetching issues from {url} …")
-        issues = fetch_project_items(url)
+        # Responses may be cached, the report does not change anything
+        issues = fetch_project_items(url, cache=True)
         self.stdout.write(f"  {len(issues)} issues fetched.")
 
         self.stdout.write("Joining with workbench data …")
-        unmatched = join_with_workbench(issues)
+        unmatched = join_with_workbench(issues, cache=True)
 
         app_repos = getattr(settings, "GITHUB_APP_REPOS", {})
         groups = build_tree(issues, app_repos)
@@ -18,11 +18,11 @@ from __future__ import annotations
 import logging
 import re
 
-import requests
 from django.conf import settings
 from django.core.management import BaseCommand
 from django.utils.translation import activate
 
+from workbench.projects.github_client import github_client
 from workbench.projects.github_cost_allocation import (
     IssueNode,
     build_tree,
@@ -184,7 +184,8 @@ class Command(BaseCommand):
 
 
 def _add_label(owner, repo, number, label, headers):
-    resp = requests.post(
+    resp = github_client().request(
+        "POST",
         f"https://api.github.com/repos/{owner}/{repo}/issues/{number}/labels",
         json={"labels": [label]},
         headers=headers,
@@ -201,7 +202,8 @@ def _add_label(owner, repo, number, label, headers):
 
 
 def _remove_label(owner, repo, number, label, headers):
-    resp = requests.delete(
+    resp = github_client().request(
+        "DELETE",
         f"https://api.github.com/repos/{owner}/{repo}/issues/{number}/labels/{label}",
         headers=headers,
     )
@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+
+from workbench.logbook.reporting import rebuild_logbook_days
+
+
+class Command(BaseCommand):
+    help = "Recreate the daily logbook rollup from logged hours and costs"
+
+    def handle(self, **options):
+        rebuild_logbook_days()
@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+
+from workbench.reporting.green_hours import refresh_green_hours_by_month
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly green hours rollup"
+
+    def handle(self, **options):
+        refresh_green_hours_by_month()
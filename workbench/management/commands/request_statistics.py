@@ -0,0 +1,48 @@
+import datetime as dt
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from workbench.audit.reporting import BUCKETS, repeated_queries, request_statistics
+
+
+class Command(BaseCommand):
+    help = "Show request timings recorded by the request instrumentation middleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="Only consider requests of the last DAYS days (default: 1).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of URL names and repeated statements to show.",
+        )
+
+    def handle(self, *, days, limit, **options):
+        since = timezone.now() - dt.timedelta(days=days)
+
+        self.stdout.write(
+            f"{'URL name':<45} {'requests':>8} {'p50':>8} {'p95':>8}"
+            f" {'max':>8} {'queries':>8} {'SQL ms':>8}  histogram"
+            f" ({' '.join(f'<{bucket}' for bucket in BUCKETS)} more)"
+        )
+        for row in request_statistics(since)[:limit]:
+            self.stdout.write(
+                f"{row['url_name'] or '-':<45.45} {row['requests']:>8}"
+                f" {row['p50']:>8.0f} {row['p95']:>8.0f} {row['max']:>8.0f}"
+                f" {row['queries']:>8.1f} {row['query_time']:>8.0f}  "
+                + " ".join(str(count) for count in row["histogram"])
+            )
+
+        self.stdout.write("\nRepeated statements (N+1 candidates)")
+        for row in repeated_queries(since, limit=limit):
+            self.stdout.write(
+                f"\n{row['url_name'] or '-'}: {row['executions']} executions in"
+                f" {row['requests']} requests (max {row['max_per_request']}),"
+                f" {row['time']:.0f} ms\n  {row['sql']}"
+            )
@@ -2,13 +2,20 @@ import argparse
 import datetime as dt
 import io
 import re
+from itertools import pairwise
 
 from django.core.mail import EmailMultiAlternatives
 from django.core.management import BaseCommand
 from django.utils.translation import activate
 
-from workbench.reporting.squeeze import build_xlsx, squeeze_data
+from workbench.invoices.utils import recurring
+from workbench.reporting.squeeze import (
+    build_merged_xlsx,
+    build_xlsx,
+    squeeze_data_for_ranges,
+)
 from workbench.tools.formats import local_date_format
+from workbench.tools.routing import reporting
 
 
 def range_type(arg_value):
@@ -18,6 +25,20 @@ def range_type(arg_value):
     raise argparse.ArgumentTypeError("invalid value")
 
 
+def monthly_ranges(date_range):
+    ranges = []
+    for month, next_month in pairwise(
+        recurring(date_range[0].replace(day=1), "monthly")
+    ):
+        if month > date_range[1]:
+            break
+        ranges.append([
+            max(month, date_range[0]),
+            min(next_month - dt.timedelta(days=1), date_range[1]),
+        ])
+    return ranges
+
+
 class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
@@ -34,11 +55,17 @@ class Command(BaseCommand):
             type=range_type,
             help="Specify as YYYYMMDD-YYYYMMDD",
         )
+        parser.add_argument(
+            "--monthly",
+            action="store_true",
+            help="Compute each month of the range separately and merge the results",
+        )
         parser.add_argument(
             "--mailto",
             type=str,
         )
 
+    @reporting()
     def handle(self, **options):
         activate("de")
 
@@ -65,18 +92,32 @@ class Command(BaseCommand):
             self.stderr.write("Date range empty.")
             return
 
-        data = squeeze_data(date_range)
-        xlsx = build_xlsx(data)
+        if options["monthly"]:
+            date_ranges = monthly_ranges(date_range)
+            data_list = squeeze_data_for_ranges(date_ranges)
+            if not options["mailto"]:
+                for data in data_list:
+                    self.send_or_save(build_xlsx(data), data["date_range"])
+            self.send_or_save(
+                build_merged_xlsx(data_list),
+                date_range,
+                prefix="squeeze-merged",
+                mailto=options["mailto"],
+            )
+        else:
+            data = squeeze_data_for_ranges([date_range])[0]
+            self.send_or_save(build_xlsx(data), date_range, mailto=options["mailto"])
 
-        filename = f"squeeze-{date_range[0]}-{date_range[1]}.xlsx"
+    def send_or_save(self, xlsx, date_range, *, prefix="squeeze", mailto=None):
+        filename = f"{prefix}-{date_range[0]}-{date_range[1]}.xlsx"
         body = f"Squeeze {local_date_format(date_range[0])} - {local_date_format(date_range[1])}"
 
-        if options["mailto"]:
+        if mailto:
             mail = EmailMultiAlternatives(
                 "Squeeze",
                 body,
-                to=options["mailto"].split(","),
-                reply_to=options["mailto"].split(","),
+                to=mailto.split(","),
+                reply_to=mailto.split(","),
             )
             with io.BytesIO() as f:
                 xlsx.workbook.save(f)
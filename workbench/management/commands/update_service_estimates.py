@@ -47,39 +47,43 @@ class Command(BaseCommand):
 def update_service_estimates():
     set_user_name("GitHub estimates integration")
 
-    offers = set()
-    up_to_date_issues = {}
-    updated_issues = {}
     estimates = {}
-
     for project_url in settings.GITHUB_PROJECT_URLS:
         estimates |= issue_estimates_from_github_project(project_url)
+    by_url = {issue_url.lower(): issue_url for issue_url in estimates}
 
-        editable = (
-            Service.objects
-            .filter(
-                project__in=Project.objects.open(),
-            )
-            .editable()
-            .filter(description__icontains="github.com")
-            .select_related("offer", "project__owned_by")
+    up_to_date_issues = {}
+    updated_issues = {}
+    updated = {}
+
+    for service in (
+        Service.objects
+        .filter(
+            project__in=Project.objects.open(),
+            github_issue_urls__overlap=list(by_url),
         )
+        .editable()
+        .select_related("offer", "project__owned_by")
+    ):
+        for url in service.github_issue_urls:
+            if (issue_url := by_url.get(url)) is None:
+                continue
 
-        for service in editable:
-            for issue_url, estimate in estimates.items():
-                if issue_url.lower() not in service.description.lower():
-                    continue
+            estimate = estimates[issue_url]
+            if service.effort_hours == estimate:
+                up_to_date_issues[issue_url] = service
+            else:
+                service.effort_hours = estimate
+                updated[service.id] = service
+                updated_issues[issue_url] = service
 
-                if service.effort_hours == estimate:
-                    up_to_date_issues[issue_url] = service
-                else:
-                    service.effort_hours = estimate
-                    service.save(skip_related_model=True)
-                    offers.add(service.offer)
-                    updated_issues[issue_url] = service
+    for service in updated.values():
+        service.update_totals()
+    Service.objects.bulk_update(
+        updated.values(), ["effort_hours", "service_hours", "service_cost"]
+    )
 
-    offers.discard(None)
-    for offer in offers:
+    for offer in {service.offer for service in updated.values()} - {None}:
         offer.save()
 
     return up_to_date_issues, updated_issues, estimates
@@ -13,6 +13,7 @@ from workbench.awt.reporting import employment_percentages
 from workbench.invoices.utils import recurring
 from workbench.planning.models import PlannedWork
 from workbench.tools.formats import Z1
+from workbench.tools.routing import reporting
 from workbench.tools.validation import monday
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
@@ -49,6 +50,7 @@ class Command(BaseCommand):
             type=str,
         )
 
+    @reporting()
     def handle(self, **options):  # noqa: C901
         users = (
             User.objects
@@ -1,10 +1,21 @@
+import heapq
+import logging
+import random
 import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
 
+from django.conf import settings
+from django.db import DatabaseError, connections
 from django.http import HttpRequest
 from django.shortcuts import render
 from django.urls import reverse
 
 
+logger = logging.getLogger(__name__)
+
+
 FALLBACKS = None
 
 
@@ -62,3 +73,87 @@ def history_fallback(get_response):
         return response
 
     return middleware
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper collecting the number and duration of queries,
+    the slowest statements and statements which are executed repeatedly
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.slowest = []
+        self.statements = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.time += elapsed
+            heapq.heappush(self.slowest, (elapsed, self.count, sql))
+            if len(self.slowest) > 5:
+                heapq.heappop(self.slowest)
+            # Parameter lists of varying length are the same statement
+            statement = self.statements[re.sub(r"%s(?:, %s)+", "%s, ...", sql)]
+            statement[0] += 1
+            statement[1] += elapsed
+
+    def slowest_queries(self):
+        return [
+            {"sql": sql, "time": round(elapsed, 3)}
+            for elapsed, _idx, sql in sorted(self.slowest, reverse=True)
+        ]
+
+    def repeated_queries(self, *, threshold=5, limit=5):
+        return [
+            {"sql": sql, "count": count, "time": round(elapsed, 3)}
+            for sql, (count, elapsed) in sorted(
+                self.statements.items(), key=lambda row: -row[1][0]
+            )[:limit]
+            if count >= threshold
+        ]
+
+
+def request_instrumentation(get_response):
+    """
+    Record wall time and SQL statistics of a sample of requests as
+    ``RequestSample`` rows, see ``./manage.py request_statistics``
+    """
+
+    def middleware(request):
+        if random.random() >= settings.REQUEST_INSTRUMENTATION_SAMPLE_RATE:
+            return get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = get_response(request)
+        duration = (time.perf_counter() - start) * 1000
+
+        from workbench.audit.models import RequestSample
+
+        try:
+            RequestSample.objects.create(
+                url_name=request.resolver_match.view_name
+                if request.resolver_match
+                else "",
+                method=request.method,
+                status_code=response.status_code,
+                duration=duration,
+                query_count=recorder.count,
+                query_time=recorder.time,
+                slowest_queries=recorder.slowest_queries(),
+                repeated_queries=recorder.repeated_queries(),
+            )
+        except DatabaseError:
+            logger.exception("Unable to record the request sample")
+        return response
+
+    return middleware
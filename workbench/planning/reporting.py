@@ -1,4 +1,5 @@
 import datetime as dt
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from decimal import Decimal
 from itertools import islice, starmap, takewhile
@@ -18,6 +19,7 @@ from workbench.projects.models import Project
 from workbench.services.models import ServiceType
 from workbench.tools.formats import Z0, Z1, Z2, hours, local_date_format
 from workbench.tools.reporting import query
+from workbench.tools.routing import read_alias
 from workbench.tools.validation import in_days, monday
 
 
@@ -36,15 +38,25 @@ def _period(weeks, min, max):
 
 
 class Planning:
+    """
+    Planning report engine
+
+    All per-week data is stored in lists with one entry per week in
+    ``self.weeks``; ``self._week_index`` maps a week's monday to its position.
+    Weeks outside the reported range are ignored.
+    """
+
     def __init__(self, *, external_view=False, weeks, users=None, projects=None):
         self.weeks = weeks
         self.users = users
 
         self.external = external_view
 
-        self._by_week = defaultdict(lambda: Z1)
-        self._by_week_provisional = defaultdict(lambda: Z1)
-        self._by_project_and_week = defaultdict(lambda: defaultdict(lambda: Z1))
+        self._week_index = {week: idx for idx, week in enumerate(weeks)}
+
+        self._by_week = self._zeros()
+        self._by_week_provisional = self._zeros()
+        self._by_project_and_week = defaultdict(self._zeros)
         self._projects_offers = defaultdict(lambda: defaultdict(list))
 
         self._projects_external_work = defaultdict(list)
@@ -52,7 +64,7 @@ class Planning:
         self._project_ids = {project.id for project in projects} if projects else set()
         self._user_ids = {user.id for user in users} if users else set()
 
-        self._worked_hours = defaultdict(lambda: defaultdict(lambda: Z1))
+        self._worked_hours = defaultdict(self._zeros)
 
         self._absences = defaultdict(lambda: [[] for i in weeks])
         self._milestones = defaultdict(lambda: defaultdict(defaultdict))
@@ -60,6 +72,15 @@ class Planning:
         self._work_ids_users = defaultdict(set)
         self._planned_users_by_week = defaultdict(lambda: [set() for i in weeks])
 
+    def _zeros(self):
+        return [Z1] * len(self.weeks)
+
+    def _indices(self, weeks):
+        """Positions of those ``weeks`` which are part of the report"""
+        return [
+            idx for week in weeks if (idx := self._week_index.get(week)) is not None
+        ]
+
     def add_planned_work_and_milestones(
         self,
         planned_work_qs,
@@ -76,18 +97,14 @@ class Planning:
             "milestone",
         ):
             per_week = (pw.planned_hours / len(pw.weeks)).quantize(Z2)
-            for week in pw.weeks:
-                self._by_week[week] += per_week
-                self._by_project_and_week[pw.project][week] += per_week
+            by_project_and_week = self._by_project_and_week[pw.project]
+            hours_per_week = self._zeros()
+            for idx in self._indices(pw.weeks):
+                self._by_week[idx] += per_week
+                by_project_and_week[idx] += per_week
                 if pw.is_provisional:
-                    self._by_week_provisional[week] += per_week
-
-            hours_per_week = []
-            for week in self.weeks:
-                if week in pw.weeks:
-                    hours_per_week.append(per_week)
-                else:
-                    hours_per_week.append(Z1)
+                    self._by_week_provisional[idx] += per_week
+                hours_per_week[idx] = per_week
 
             date_from = min(pw.weeks)
             date_until = max(pw.weeks) + dt.timedelta(days=6)
@@ -151,7 +168,7 @@ class Planning:
                     ),
                     "service_type_id": ew.service_type_id,
                     "tooltip": str(ew.service_type) if ew.service_type else None,
-                    "by_week": [1 if w in ew.weeks else 0 for w in self.weeks],
+                    "by_week": self._flags(ew.weeks),
                 })
 
                 self.add_project_milestone(ew.project, ew.milestone)
@@ -166,6 +183,12 @@ class Planning:
                 self._projects_offers[ms.project].update()
                 self._project_ids.add(ms.project.pk)
 
+    def _flags(self, weeks):
+        flags = [0] * len(self.weeks)
+        for idx in self._indices(weeks):
+            flags[idx] = 1
+        return flags
+
     def add_project_milestone(self, project, milestone):
         if milestone and (not self._milestones[project][milestone]):
             start = (
@@ -203,13 +226,19 @@ class Planning:
     def add_worked_hours(self, queryset):
         for row in (
             queryset
-            .filter(service__project__in=self._project_ids)
-            .values("service__project", "service__offer", "rendered_on")
+            .filter(
+                service__project__in=self._project_ids,
+                rendered_on__range=[
+                    min(self.weeks),
+                    max(self.weeks) + dt.timedelta(days=6),
+                ],
+            )
+            .order_by()
+            .values("service__project", "rendered_on")
             .annotate(Sum("hours"))
         ):
-            self._worked_hours[row["service__project"]][monday(row["rendered_on"])] += (
-                row["hours__sum"]
-            )
+            idx = self._week_index[monday(row["rendered_on"])]
+            self._worked_hours[row["service__project"]][idx] += row["hours__sum"]
 
     def add_absences(self, queryset):
         for absence in queryset.filter(
@@ -224,19 +253,18 @@ class Planning:
                 date_from += dt.timedelta(days=7)
             date_until = monday(absence.ends_on or date_from)
             hours = absence.days * absence.user.planning_hours_per_day
-            weeks = [
-                (idx, week)
-                for idx, week in enumerate(self.weeks)
-                if date_from <= week <= date_until
-            ]
+            indices = range(
+                bisect_left(self.weeks, date_from),
+                bisect_right(self.weeks, date_until),
+            )
 
-            for idx, week in weeks:
+            for idx in indices:
                 self._absences[absence.user][idx].append((
-                    hours / len(weeks),
+                    hours / len(indices),
                     f"{absence.get_reason_display()} - {absence.description}",
                     absence.urls["detail"],
                 ))
-                self._by_week[week] += hours / len(weeks)
+                self._by_week[idx] += hours / len(indices)
 
     def add_public_holidays(self):
         ud = {user.id: user for user in User.objects.filter(id__in=self._user_ids)}
@@ -283,8 +311,7 @@ order by ph.date
             if date.weekday() >= 5:
                 continue
 
-            week = monday(date)
-            idx = self.weeks.index(week)
+            idx = self._week_index[monday(date)]
 
             user = ud[user_id]
             ph_hours = (
@@ -303,7 +330,7 @@ order by ph.date
                 f"{name} ({detail} = {hours(ph_hours)})",
                 reverse("awt_holiday_detail", kwargs={"pk": id}),
             ))
-            self._by_week[week] += ph_hours
+            self._by_week[idx] += ph_hours
 
     def add_milestones(self, queryset):
         for milestone in queryset.filter(
@@ -325,8 +352,8 @@ order by ph.date
         for wl in work_list:
             wl.update({
                 "absences": [  # noqa: B035
-                    [a for a in self._absences[user][idx] if h > 0]
-                    for idx, h in enumerate(wl["hours_per_week"])
+                    absences if h > 0 else []
+                    for absences, h in zip(self._absences[user], wl["hours_per_week"])
                 ]
                 for user in self._work_ids_users[wl["work"]["id"]]
             })
@@ -415,21 +442,17 @@ order by ph.date
                 if date_from and date_until
                 else None,
                 "planned_hours": hours,
-                "worked_hours": [
-                    self._worked_hours[project.id][week] for week in self.weeks
-                ],
+                "worked_hours": self._worked_hours[project.id],
                 "milestones": milestones if any(milestones) else None,
             },
-            "by_week": [
-                self._by_project_and_week[project][week] for week in self.weeks
-            ],
+            "by_week": self._by_project_and_week[project],
             "external_work": external_work if any(external_work) else None,
             "offers": offers,
         }
 
     def capacity(self):
-        by_user = defaultdict(dict)
-        total = defaultdict(int)
+        by_user = defaultdict(lambda: [0] * len(self.weeks))
+        total = [0] * len(self.weeks)
 
         user_ids = (
             [user.id for user in self.users] if self.users else list(self._user_ids)
@@ -538,31 +561,29 @@ on week=ph_week
             """,
             [min(self.weeks), max(self.weeks), user_ids, user_ids, user_ids],
         ):
-            by_user[user][week.date()] = capacity
-            total[week.date()] += capacity
+            if (idx := self._week_index.get(week.date())) is None:
+                continue
+            by_user[user][idx] = capacity
+            total[idx] += capacity
 
         users = self.users or list(User.objects.filter(id__in=by_user))
         return {
-            "total": [total.get(week, 0) for week in self.weeks],
+            "total": total,
             "by_user": [
                 {
                     "user": {
                         "name": user.get_full_name(),
                         "url": user.urls["planning"],
                     },
-                    "capacity": [by_user[user.id].get(week, 0) for week in self.weeks],
+                    "capacity": by_user[user.id],
                 }
                 for user in sorted(users)
             ],
         }
 
     def report(self):
-        try:
-            this_week_index = self.weeks.index(monday())
-        except ValueError:
-            this_week_index = None
         return {
-            "this_week_index": this_week_index,
+            "this_week_index": self._week_index.get(monday()),
             "weeks": [
                 {
                     "monday": week,
@@ -590,10 +611,8 @@ on week=ph_week
                     else ()
                 ),
             ),
-            "by_week": [self._by_week[week] for week in self.weeks],
-            "by_week_provisional": [
-                self._by_week_provisional[week] for week in self.weeks
-            ],
+            "by_week": self._by_week,
+            "by_week_provisional": self._by_week_provisional,
             "absences": [
                 (str(user), lst) for user, lst in sorted(self._absences.items())
             ],
@@ -643,7 +662,7 @@ def team_planning(team, date_range):
 
 
 def project_planning(project, *, external_view=False):
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(
             """\
 WITH sq AS (
@@ -859,7 +878,7 @@ def campaign_planning(campaign, *, external_view=False):
     projects = Project.objects.filter(campaign=campaign)
     projects_ids = ([project.id for project in projects],)
 
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(
             """\
 WITH sq AS (
@@ -9,9 +9,11 @@ from workbench.planning.forms import PlannedWorkBatchForm
 from workbench.planning.models import PlannedWork
 from workbench.planning.xlsx import PlanningXLSXDocument
 from workbench.projects.models import Campaign, Project
+from workbench.tools import routing
 from workbench.tools.validation import in_days
 
 
+@routing.reporting()
 def project_planning(request, pk):
     instance = get_object_or_404(Project.objects.all(), pk=pk)
     return render(
@@ -25,6 +27,7 @@ def project_planning(request, pk):
     )
 
 
+@routing.reporting()
 def project_planning_external(request, pk):
     instance = get_object_or_404(Project.objects.all(), pk=pk)
     if not instance.milestones.exists():
@@ -40,6 +43,7 @@ def project_planning_external(request, pk):
     )
 
 
+@routing.reporting()
 def user_planning(request, pk, *, retro=False):
     instance = get_object_or_404(User, pk=pk)
     date_range = [in_days(-180), in_days(14)] if retro else [in_days(-14), in_days(400)]
@@ -55,6 +59,7 @@ def user_planning(request, pk, *, retro=False):
     )
 
 
+@routing.reporting()
 def team_planning(request, pk, *, retro=False):
     instance = get_object_or_404(Team.objects.all(), pk=pk)
     date_range = [in_days(-180), in_days(14)] if retro else [in_days(-14), in_days(400)]
@@ -70,6 +75,7 @@ def team_planning(request, pk, *, retro=False):
     )
 
 
+@routing.reporting()
 def campaign_planning(request, pk):
     instance = get_object_or_404(Campaign.objects.all(), pk=pk)
     return render(
@@ -83,6 +89,7 @@ def campaign_planning(request, pk):
     )
 
 
+@routing.reporting()
 def campaign_planning_external(request, pk):
     instance = get_object_or_404(Campaign.objects.all(), pk=pk)
     return render(
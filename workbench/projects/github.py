@@ -3,12 +3,30 @@ import re
 from decimal import Decimal
 from typing import Any
 
-import requests
 from django.conf import settings
 
+from workbench.projects.github_client import GRAPHQL_URL, github_client
+
 
 logger = logging.getLogger(__name__)
 
+ISSUE_URL_RE = re.compile(
+    r"https?://(?:www\.)?github\.com/([\w.-]+)/([\w.-]+)/issues/(\d+)",
+    re.IGNORECASE,
+)
+
+
+def canonical_issue_urls(*texts: str) -> list[str]:
+    """
+    Return the lowercased GitHub issue URLs mentioned in the texts, without
+    duplicates and in order of their appearance.
+    """
+    urls = {}
+    for text in texts:
+        for owner, repo, number in ISSUE_URL_RE.findall(text or ""):
+            urls[f"https://github.com/{owner}/{repo}/issues/{number}".lower()] = None
+    return list(urls)
+
 
 def extract_project_info(project_url: str) -> tuple[str | None, str | None, str | None]:
     """
@@ -99,7 +117,7 @@ def _get_classic_project_cards(  # noqa: C901
         # For organization projects
         if repo is None:
             org_url = f"https://api.github.com/orgs/{owner}/projects"
-            response = requests.get(org_url, headers=preview_headers)
+            response = github_client().request("GET", org_url, headers=preview_headers)
 
             if response.status_code == 200:
                 projects = response.json()
@@ -110,7 +128,7 @@ def _get_classic_project_cards(  # noqa: C901
         else:
             # For repository projects
             repo_url = f"https://api.github.com/repos/{owner}/{repo}/projects"
-            response = requests.get(repo_url, headers=preview_headers)
+            response = github_client().request("GET", repo_url, headers=preview_headers)
 
             if response.status_code == 200:
                 projects = response.json()
@@ -133,7 +151,7 @@ def _get_classic_project_cards(  # noqa: C901
     # Get columns in the project
     columns_url = f"https://api.github.com/projects/{project_id}/columns"
 
-    response = requests.get(columns_url, headers=preview_headers)
+    response = github_client().request("GET", columns_url, headers=preview_headers)
     if response.status_code != 200:
         logger.error(
             f"Failed to fetch columns for project {project_id}: Status {response.status_code}"
@@ -149,7 +167,9 @@ def _get_classic_project_cards(  # noqa: C901
         column_id = column.get("id")
 
         cards_url = f"https://api.github.com/projects/columns/{column_id}/cards"
-        cards_response = requests.get(cards_url, headers=preview_headers)
+        cards_response = github_client().request(
+            "GET", cards_url, headers=preview_headers
+        )
 
         if cards_response.status_code != 200:
             logger.warning(
@@ -171,7 +191,9 @@ def _get_classic_project_cards(  # noqa: C901
 
             # If card is linked to an issue, fetch issue details
             if card.get("content_url") and "issues" in card.get("content_url", ""):
-                issue_response = requests.get(card["content_url"], headers=headers)
+                issue_response = github_client().request(
+                    "GET", card["content_url"], headers=headers
+                )
 
                 if issue_response.status_code == 200:
                     issue = issue_response.json()
@@ -222,9 +244,6 @@ def _get_project_v2_cards(  # noqa: C901
     owner: str, project_number: str, headers: dict[str, str]
 ) -> list[dict[str, Any]]:
     """Get cards from a GitHub Projects v2."""
-    # Use GraphQL API for Projects v2
-    graphql_url = "https://api.github.com/graphql"
-
     # First, try to get the project by number as an organization project
     project_query = {
         "query": """
@@ -248,7 +267,9 @@ def _get_project_v2_cards(  # noqa: C901
         "variables": {"owner": owner, "number": int(project_number)},
     }
 
-    response = requests.post(graphql_url, json=project_query, headers=headers)
+    response = github_client().request(
+        "POST", GRAPHQL_URL, json=project_query, headers=headers
+    )
 
     # Check if we got a valid response for an organization project
     org_project = False
@@ -287,7 +308,9 @@ def _get_project_v2_cards(  # noqa: C901
             "variables": {"owner": owner, "number": int(project_number)},
         }
 
-        response = requests.post(graphql_url, json=user_query, headers=headers)
+        response = github_client().request(
+            "POST", GRAPHQL_URL, json=user_query, headers=headers
+        )
 
     if response.status_code != 200:
         logger.error(
@@ -413,7 +436,9 @@ def _get_project_v2_cards(  # noqa: C901
         "variables": {"projectId": project_id},
     }
 
-    items_response = requests.post(graphql_url, json=items_query, headers=headers)
+    items_response = github_client().request(
+        "POST", GRAPHQL_URL, json=items_query, headers=headers
+    )
 
     if items_response.status_code != 200:
         logger.error(
@@ -0,0 +1,144 @@
+"""
+Shared client for the GitHub REST and GraphQL APIs.
+
+All requests go through one pooled ``requests.Session``, back off when GitHub
+signals rate limiting and may cache GraphQL query responses on disk (enabled
+by setting ``GITHUB_CACHE_DIR``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from email.utils import parsedate_to_datetime
+from functools import cache
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+RETRY_STATUSES = {429, 502, 503, 504}
+MAX_DELAY = 900
+
+
+def _retry_delay(response, attempt):
+    """
+    Return the number of seconds to wait before retrying the request, or
+    ``None`` if the response should not be retried
+    """
+    if retry_after := response.headers.get("Retry-After"):
+        # Either a number of seconds or an HTTP date
+        try:
+            seconds = int(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except TypeError, ValueError:
+                seconds = 2**attempt
+        return min(MAX_DELAY, max(1, int(seconds)))
+    if response.headers.get("X-RateLimit-Remaining") == "0" and (
+        reset := response.headers.get("X-RateLimit-Reset")
+    ):
+        return min(MAX_DELAY, max(1, int(reset) - int(time.time()) + 1))
+    if response.status_code in RETRY_STATUSES:
+        return min(MAX_DELAY, 2**attempt)
+    return None
+
+
+class GitHubClient:
+    def __init__(self, *, cache_dir=None, cache_timeout=3600, max_retries=5):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=16))
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_timeout = cache_timeout
+        self.max_retries = max_retries
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", 30)
+        for attempt in range(self.max_retries + 1):
+            response = self.session.request(method, url, **kwargs)
+            if response.status_code not in {403, *RETRY_STATUSES}:
+                return response
+            delay = _retry_delay(response, attempt)
+            if delay is None or attempt == self.max_retries:
+                return response
+            logger.warning(
+                "GitHub responded with %s, retrying in %ss",
+                response.status_code,
+                delay,
+            )
+            time.sleep(delay)
+        return response
+
+    def graphql(self, query, variables=None, *, headers=None, cache=False):
+        """
+        Run a GraphQL query and return its ``data``
+
+        Responses of cached queries are keyed by the query and its variables,
+        which includes the pagination cursor.
+        """
+        payload = {"query": query, "variables": variables or {}}
+        path = self._cache_path(payload) if cache else None
+        if path and (data := self._cache_get(path)) is not None:
+            return data
+
+        for attempt in range(self.max_retries + 1):
+            response = self.request("POST", GRAPHQL_URL, json=payload, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            errors = result.get("errors") or []
+            if attempt < self.max_retries and any(
+                error.get("type") == "RATE_LIMITED" for error in errors
+            ):
+                time.sleep(_retry_delay(response, attempt) or 2**attempt)
+                continue
+            break
+
+        for error in errors:
+            logger.warning("GraphQL error: %s", error.get("message"))
+        data = result.get("data") or {}
+        if path and not errors:
+            self._cache_set(path, data)
+        return data
+
+    def _cache_path(self, payload):
+        if not self.cache_dir:
+            return None
+        key = hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _cache_get(self, path):
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_timeout:
+                return None
+            with path.open(encoding="utf-8") as f:
+                return json.load(f)
+        except OSError, ValueError:
+            return None
+
+    def _cache_set(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+@cache
+def github_client():
+    return GitHubClient(
+        cache_dir=settings.GITHUB_CACHE_DIR,
+        cache_timeout=settings.GITHUB_CACHE_TIMEOUT,
+    )
@@ -13,16 +13,17 @@ import re
 from dataclasses import dataclass, field
 from decimal import Decimal
 
-import requests
 from django.conf import settings
 from django.db.models import Sum
 
+from workbench.projects.github_client import github_client
 from workbench.tools.formats import Z1
 
 
 logger = logging.getLogger(__name__)
 
 BILLING_LABELS = {"angeboten", "zusätzlich"}
+TIMELINE_BATCH_SIZE = 50
 
 
 @dataclass
@@ -60,18 +61,8 @@ class RepoGroup:
     cross_app_children: list[IssueNode] = field(default_factory=list)
 
 
-def _gql(query, variables, headers):
-    resp = requests.post(
-        "https://api.github.com/graphql",
-        json={"query": query, "variables": variables},
-        headers=headers,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    if errors := data.get("errors"):
-        for err in errors:
-            logger.warning("GraphQL error: %s", err.get("message"))
-    return data.get("data", {})
+def _gql(query, variables, headers, *, cache=False):
+    return github_client().graphql(query, variables, headers=headers, cache=cache)
 
 
 def _get_project_id(org, number, headers):
@@ -85,6 +76,7 @@ def _get_project_id(org, number, headers):
         """,
         {"org": org, "number": number},
         headers,
+        cache=True,
     )
     return data["organization"]["projectV2"]["id"]
 
@@ -259,10 +251,7 @@ query($projectId: ID!, $after: String) {
 }
 """
 
-_TIMELINE_QUERY = """
-query($owner: String!, $repo: String!, $number: Int!) {
-  repository(owner: $owner, name: $repo) {
-    issue(number: $number) {
+_TIMELINE_FRAGMENT = """
       timelineItems(first: 50, itemTypes: [LABELED_EVENT, UNLABELED_EVENT]) {
         nodes {
           __typename
@@ -278,16 +267,16 @@ query($owner: String!, $repo: String!, $number: Int!) {
           }
         }
       }
-    }
-  }
-}
 """
 
 
-def fetch_project_items(project_url: str) -> list[IssueNode]:
+def fetch_project_items(project_url: str, *, cache: bool = False) -> list[IssueNode]:
     """
     Fetch all issues from a GitHub Projects v2 board, with estimates,
     labels, and parent relationships.
+
+    ``cache=True`` may return responses up to ``GITHUB_CACHE_TIMEOUT`` seconds
+    old; only use it for reports, not when acting on the state of issues.
     """
     from workbench.projects.github import extract_project_info
 
@@ -306,7 +295,12 @@ def fetch_project_items(project_url: str) -> list[IssueNode]:
     after = None
 
     while True:
-        data = _gql(_ITEMS_QUERY, {"projectId": project_id, "after": after}, headers)
+        data = _gql(
+            _ITEMS_QUERY,
+            {"projectId": project_id, "after": after},
+            headers,
+            cache=cache,
+        )
         items_data = data["node"]["items"]
         nodes.extend(items_data["nodes"])
         if not items_data["pageInfo"]["hasNextPage"]:
@@ -354,45 +348,61 @@ def fetch_project_items(project_url: str) -> list[IssueNode]:
 
     # Fetch attribution for issues that have a billing label
     _fetch_billing_label_attribution(
-        [i for i in issues if i.billing_label],
-        org,
-        headers,
+        [i for i in issues if i.billing_label], headers, cache=cache
     )
 
     return issues
 
 
 def _fetch_billing_label_attribution(
-    issues: list[IssueNode], org: str, headers: dict
+    issues: list[IssueNode], headers: dict, *, cache: bool = False
 ) -> None:
-    """Fill in billing_label_set_by / billing_label_set_at for issues with billing labels."""
-    for issue in issues:
+    """
+    Fill in billing_label_set_by / billing_label_set_at for issues with billing
+    labels, fetching the timelines of TIMELINE_BATCH_SIZE issues per request.
+    """
+    for start in range(0, len(issues), TIMELINE_BATCH_SIZE):
+        batch = issues[start : start + TIMELINE_BATCH_SIZE]
+        params, selections, variables = [], [], {}
+        for idx, issue in enumerate(batch):
+            params.append(f"$o{idx}: String!, $r{idx}: String!, $n{idx}: Int!")
+            selections.append(
+                f"  i{idx}: repository(owner: $o{idx}, name: $r{idx}) {{\n"
+                f"    issue(number: $n{idx}) {{{_TIMELINE_FRAGMENT}    }}\n"
+                "  }"
+            )
+            variables.update({
+                f"o{idx}": _ISSUE_URL_RE.search(issue.url).group("owner"),
+                f"r{idx}": issue.repo,
+                f"n{idx}": issue.number,
+            })
         data = _gql(
-            _TIMELINE_QUERY,
-            {"owner": org, "repo": issue.repo, "number": issue.number},
+            "query({}) {{\n{}\n}}".format(", ".join(params), "\n".join(selections)),
+            variables,
             headers,
-        )
-        events = (
-            data
-            .get("repository", {})
-            .get("issue", {})
-            .get("timelineItems", {})
-            .get("nodes", [])
+            cache=cache,
         )
 
-        # Find the most recent LabeledEvent for the billing label (it may have been
-        # removed and re-added; last add wins).
-        last_add = None
-        for ev in events:
-            if (
-                ev.get("__typename") == "LabeledEvent"
-                and ev.get("label", {}).get("name") == issue.billing_label
-            ):
-                last_add = ev
+        for idx, issue in enumerate(batch):
+            events = (
+                ((data.get(f"i{idx}") or {}).get("issue") or {})
+                .get("timelineItems", {})
+                .get("nodes", [])
+            )
+
+            # Find the most recent LabeledEvent for the billing label (it may have
+            # been removed and re-added; last add wins).
+            last_add = None
+            for ev in events:
+                if (
+                    ev.get("__typename") == "LabeledEvent"
+                    and ev.get("label", {}).get("name") == issue.billing_label
+                ):
+                    last_add = ev
 
-        if last_add:
-            issue.billing_label_set_by = (last_add.get("actor") or {}).get("login")
-            issue.billing_label_set_at = last_add.get("createdAt")
+            if last_add:
+                issue.billing_label_set_by = (last_add.get("actor") or {}).get("login")
+                issue.billing_label_set_at = last_add.get("createdAt")
 
 
 _ISSUE_URL_RE = re.compile(
@@ -416,6 +426,8 @@ _ISSUE_FRAGMENT = """
 def _fetch_issues_batch(
     refs: list[tuple[str, str, int]],  # (owner, repo, number)
     headers: dict,
+    *,
+    cache: bool = False,
 ) -> list[IssueNode]:
     """
     Fetch multiple issues in a single GraphQL request using aliases.
@@ -445,11 +457,10 @@ def _fetch_issues_batch(
     lines.append("}")
     query = "\n".join(lines)
 
-    data = _gql(query, {}, headers)
+    data = _gql(query, {}, headers, cache=cache)
 
     nodes = []
-    needs_attribution = []
-    for repo_idx, ((owner, _repo), numbers) in enumerate(by_repo.items()):
+    for repo_idx, ((_owner, _repo), numbers) in enumerate(by_repo.items()):
         repo_alias = f"r{repo_idx}"
         repo_data = data.get(repo_alias) or {}
         for number in numbers:
@@ -473,12 +484,10 @@ def _fetch_issues_batch(
                 parent_repo=parent["repository"]["name"] if parent else None,
             )
             nodes.append(node)
-            if billing_label:
-                needs_attribution.append((node, owner))
-
-    for node, owner in needs_attribution:
-        _fetch_billing_label_attribution([node], owner, headers)
 
+    _fetch_billing_label_attribution(
+        [n for n in nodes if n.billing_label], headers, cache=cache
+    )
     return nodes
 
 
@@ -546,7 +555,7 @@ def build_tree(
 
 
 def _fetch_archived(
-    issues, github_services, matched_ids, logged, monthly_by_service, headers
+    issues, github_services, matched_ids, logged, monthly_by_service, headers, *, cache
 ):
     """Batch-fetch issues not on the project board (e.g. archived) and append to issues."""
     known_urls = {issue.url.lower() for issue in issues}
@@ -566,7 +575,7 @@ def _fetch_archived(
         if key not in ref_to_service:  # first service wins; deduplicates refs
             ref_to_service[key] = service
 
-    for node in _fetch_issues_batch(list(ref_to_service), headers):
+    for node in _fetch_issues_batch(list(ref_to_service), headers, cache=cache):
         key = (
             _ISSUE_URL_RE.search(node.url).group("owner"),
             node.repo,
@@ -586,6 +595,8 @@ def _fetch_archived(
 
 def join_with_workbench(
     issues: list[IssueNode],
+    *,
+    cache: bool = False,
 ) -> list:
     """
     Match each IssueNode to a workbench Service (by issue URL in description),
@@ -674,7 +685,13 @@ def join_with_workbench(
     # For services not yet matched, batch-fetch their issues directly (handles archived).
     if token:
         _fetch_archived(
-            issues, github_services, matched_ids, logged, monthly_by_service, headers
+            issues,
+            github_services,
+            matched_ids,
+            logged,
+            monthly_by_service,
+            headers,
+            cache=cache,
         )
 
     # Find projects that had at least one matched service, then collect
@@ -0,0 +1,145 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Bump the statistics version of all projects whose logbook aggregates may
+# have changed. Rows are created lazily by ProjectStatistics.objects.logbook,
+# projects without a row have nothing to invalidate.
+TRIGGERS_SQL = """\
+CREATE OR REPLACE FUNCTION projects_statistics_bump(project_ids integer[])
+RETURNS void AS $$
+BEGIN
+  UPDATE projects_projectstatistics SET version=version + 1
+  WHERE project_id=ANY(project_ids);
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION projects_statistics_logbook() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM projects_statistics_bump(ARRAY(
+      SELECT DISTINCT ps.project_id
+      FROM old_rows
+      JOIN projects_service ps ON old_rows.service_id=ps.id
+    ));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM projects_statistics_bump(ARRAY(
+      SELECT DISTINCT ps.project_id
+      FROM new_rows
+      JOIN projects_service ps ON new_rows.service_id=ps.id
+    ));
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION projects_statistics_service() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    PERFORM projects_statistics_bump(ARRAY[OLD.project_id]);
+  ELSIF TG_OP = 'INSERT' THEN
+    PERFORM projects_statistics_bump(ARRAY[NEW.project_id]);
+  ELSE
+    PERFORM projects_statistics_bump(ARRAY[OLD.project_id, NEW.project_id]);
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_statistics_insert ON logbook_loggedhours;
+CREATE TRIGGER projects_statistics_insert AFTER INSERT ON logbook_loggedhours
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_update ON logbook_loggedhours;
+CREATE TRIGGER projects_statistics_update AFTER UPDATE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_delete ON logbook_loggedhours;
+CREATE TRIGGER projects_statistics_delete AFTER DELETE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_insert ON logbook_loggedcost;
+CREATE TRIGGER projects_statistics_insert AFTER INSERT ON logbook_loggedcost
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_update ON logbook_loggedcost;
+CREATE TRIGGER projects_statistics_update AFTER UPDATE ON logbook_loggedcost
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_delete ON logbook_loggedcost;
+CREATE TRIGGER projects_statistics_delete AFTER DELETE ON logbook_loggedcost
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE projects_statistics_logbook();
+
+DROP TRIGGER IF EXISTS projects_statistics_service ON projects_service;
+CREATE TRIGGER projects_statistics_service AFTER INSERT OR DELETE ON projects_service
+  FOR EACH ROW EXECUTE PROCEDURE projects_statistics_service();
+
+DROP TRIGGER IF EXISTS projects_statistics_service_update ON projects_service;
+CREATE TRIGGER projects_statistics_service_update AFTER UPDATE ON projects_service
+  FOR EACH ROW WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id)
+  EXECUTE PROCEDURE projects_statistics_service();
+"""
+
+DROP_TRIGGERS_SQL = """\
+DROP TRIGGER IF EXISTS projects_statistics_insert ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS projects_statistics_update ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS projects_statistics_delete ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS projects_statistics_insert ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS projects_statistics_update ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS projects_statistics_delete ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS projects_statistics_service ON projects_service;
+DROP TRIGGER IF EXISTS projects_statistics_service_update ON projects_service;
+DROP FUNCTION IF EXISTS projects_statistics_service();
+DROP FUNCTION IF EXISTS projects_statistics_logbook();
+DROP FUNCTION IF EXISTS projects_statistics_bump(integer[]);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "logbook",
+            "0021_remove_loggedhours_logbook_log_rendere_ea492e_idx_and_more_updated",
+        ),
+        ("projects", "0032_auto_20260519_0936"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectStatistics",
+            fields=[
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="projects.project",
+                        verbose_name="project",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=1, verbose_name="version"),
+                ),
+                (
+                    "data_version",
+                    models.PositiveIntegerField(default=0, verbose_name="data version"),
+                ),
+                ("data", models.JSONField(default=dict, verbose_name="data")),
+            ],
+            options={
+                "verbose_name": "project statistics",
+                "verbose_name_plural": "project statistics",
+            },
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+from workbench.tools import search
+
+
+INDEXED = [
+    ("projects_project", ["title", "description", "_fts"], None),
+    ("projects_campaign", ["title", "description", "_fts"], None),
+    ("contacts_organization", ["name"], None),
+    (
+        "contacts_person",
+        ["given_name", "family_name", "address", "notes", "_fts"],
+        ["given_name", "family_name"],
+    ),
+    ("invoices_invoice", ["title", "description", "postal_address", "_fts"], None),
+    (
+        "invoices_recurringinvoice",
+        ["title", "description", "postal_address"],
+        None,
+    ),
+    ("offers_offer", ["title", "description", "postal_address", "_fts"], None),
+    ("deals_deal", ["title", "description", "closing_notice", "_fts"], None),
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contacts", "0013_organization_is_archived"),
+        ("deals", "0007_attributegroup_show_on_overview"),
+        ("invoices", "0027_invoice_archived_at"),
+        ("offers", "0014_alter_offer_tax_rate"),
+        ("projects", "0033_projectstatistics"),
+    ]
+
+    operations = [
+        migrations.RunSQL(search.create_index()),
+        *(
+            migrations.RunSQL(search.fts(table, fields, index=True, title=title))
+            for table, fields, title in INDEXED
+        ),
+        *(
+            migrations.RunSQL(f"UPDATE {table} SET id=id")
+            for table, _fields, _title in INDEXED
+        ),
+    ]
@@ -0,0 +1,47 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from workbench.projects.github import canonical_issue_urls
+
+
+def forwards(apps, schema_editor):
+    Service = apps.get_model("projects", "Service")
+    services = list(
+        Service.objects.filter(
+            models.Q(external_reference__icontains="github.com")
+            | models.Q(description__icontains="github.com")
+        ).only("external_reference", "description")
+    )
+    for service in services:
+        service.github_issue_urls = canonical_issue_urls(
+            service.external_reference, service.description
+        )
+    Service.objects.bulk_update(services, ["github_issue_urls"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0034_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="github_issue_urls",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=500),
+                default=list,
+                editable=False,
+                size=None,
+                verbose_name="GitHub issue URLs",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="service",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["github_issue_urls"], name="projects_service_gh_urls"
+            ),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from workbench.tools import typeahead
+
+
+TRACKED = [
+    "accounts_user",
+    "contacts_organization",
+    "contacts_person",
+    "projects_project",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0026_specialistfield_expected_hourly_rate"),
+        ("contacts", "0013_organization_is_archived"),
+        ("projects", "0035_service_github_issue_urls"),
+    ]
+
+    operations = [
+        migrations.RunSQL(typeahead.create_structure()),
+        *(migrations.RunSQL(typeahead.track(table)) for table in TRACKED),
+    ]
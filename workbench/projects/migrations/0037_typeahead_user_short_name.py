@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from workbench.tools import typeahead
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0036_typeahead"),
+    ]
+
+    operations = [
+        # Logins update last_login; only short names appear in project labels
+        migrations.RunSQL(typeahead.track("accounts_user", columns=["_short_name"])),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from workbench.tools import typeahead
+
+
+# Only updates of columns which appear in labels, in the searchable text or
+# in the querysets' filters change the version of the tracked tables
+TRACKED = {
+    "accounts_user": ["_short_name", "email"],
+    "contacts_organization": ["name", "is_archived", "is_private_person"],
+    "contacts_person": ["given_name", "family_name", "organization_id", "is_archived"],
+    "projects_project": [
+        "_code",
+        "created_at",
+        "title",
+        "owned_by_id",
+        "customer_id",
+        "closed_on",
+    ],
+}
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0037_typeahead_user_short_name"),
+    ]
+
+    operations = [
+        migrations.RunSQL(typeahead.track(table, columns=columns))
+        for table, columns in TRACKED.items()
+    ]
@@ -5,6 +5,8 @@ from functools import total_ordering
 
 from admin_ordering.models import OrderableModel
 from django.contrib import messages
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.db.models import F, Prefetch, Q, Sum
 from django.db.models.expressions import RawSQL
@@ -15,9 +17,11 @@ from django.utils.translation import gettext, gettext_lazy as _
 
 from workbench.accounts.models import User
 from workbench.contacts.models import Organization, Person
+from workbench.projects.github import canonical_issue_urls
 from workbench.services.models import ServiceBase
 from workbench.tools.formats import Z1, Z2, local_date_format
 from workbench.tools.models import Model, MoneyField, SearchQuerySet
+from workbench.tools.routing import primary
 from workbench.tools.urls import model_urls
 from workbench.tools.validation import in_days, raise_if_errors
 
@@ -429,7 +433,6 @@ class Project(Model):
     def grouped_services(self):
         # Avoid circular imports
         from workbench.deals.models import Deal
-        from workbench.logbook.models import LoggedCost, LoggedHours
 
         # Logged vs. service hours
         service_hours = defaultdict(lambda: Z1)
@@ -452,51 +455,17 @@ class Project(Model):
             lambda: {"services": []}, ((offer, {"services": []}) for offer in offers)
         )
 
-        logged_hours_per_service_and_user = defaultdict(dict)
+        logbook = ProjectStatistics.objects.logbook(self)
+        logged_hours_per_service_and_user = logbook["hours"]
+        logged_cost_per_service = logbook["cost"]
+        not_archived_logged_hours_per_service = logbook["not_archived_hours"]
+        not_archived_logged_cost_per_service = logbook["not_archived_cost"]
+
         logged_hours_per_user = defaultdict(lambda: Z1)
         logged_hours_per_effort_rate = defaultdict(lambda: Z1)
-
-        for row in (
-            LoggedHours.objects
-            .order_by()
-            .filter(service__project=self)
-            .values("service", "rendered_by")
-            .annotate(Sum("hours"))
-        ):
-            logged_hours_per_user[row["rendered_by"]] += row["hours__sum"]
-            logged_hours_per_service_and_user[row["service"]][row["rendered_by"]] = row[
-                "hours__sum"
-            ]
-
-        logged_cost_per_service = {
-            row["service"]: row["cost__sum"]
-            for row in LoggedCost.objects
-            .order_by()
-            .filter(service__project=self)
-            .values("service")
-            .annotate(Sum("cost"))
-        }
-
-        not_archived_logged_hours_per_service = {
-            row["service"]: row["hours__sum"]
-            for row in LoggedHours.objects
-            .order_by()
-            .filter(
-                service__project=self,
-                archived_at__isnull=True,
-                service__effort_rate__isnull=False,
-            )
-            .values("service")
-            .annotate(Sum("hours"))
-        }
-        not_archived_logged_cost_per_service = {
-            row["service"]: row["cost__sum"]
-            for row in LoggedCost.objects
-            .order_by()
-            .filter(service__project=self, archived_at__isnull=True)
-            .values("service")
-            .annotate(Sum("cost"))
-        }
+        for per_user in logged_hours_per_service_and_user.values():
+            for user, hours in per_user.items():
+                logged_hours_per_user[user] += hours
 
         users = {
             user.id: user
@@ -517,7 +486,9 @@ class Project(Model):
                 "logged_cost": logged_cost_per_service.get(service.id, Z2),
                 "not_archived_logged_hours": not_archived_logged_hours_per_service.get(
                     service.id, Z1
-                ),
+                )
+                if service.effort_rate is not None
+                else Z1,
                 "not_archived_logged_cost": not_archived_logged_cost_per_service.get(
                     service.id, Z1
                 ),
@@ -816,9 +787,30 @@ class Service(ServiceBase):
         default=False,
         help_text=_("Optional services do not count towards the offer total."),
     )
+    github_issue_urls = ArrayField(
+        models.CharField(max_length=500),
+        default=list,
+        editable=False,
+        verbose_name=_("GitHub issue URLs"),
+    )
 
     objects = ServiceQuerySet.as_manager()
 
+    class Meta(ServiceBase.Meta):
+        indexes = [
+            GinIndex(fields=["github_issue_urls"], name="projects_service_gh_urls")
+        ]
+
+    def save(self, *args, **kwargs):
+        self.github_issue_urls = canonical_issue_urls(
+            self.external_reference, self.description
+        )
+        if (update_fields := kwargs.get("update_fields")) is not None:
+            kwargs["update_fields"] = {*update_fields, "github_issue_urls"}
+        super().save(*args, **kwargs)
+
+    save.alters_data = True
+
     def get_absolute_url(self):
         return f"{self.project.get_absolute_url()}#service{self.pk}"
 
@@ -873,3 +865,85 @@ class Service(ServiceBase):
             and not self.is_work_completed
             and not self.is_budget_retainer
         )
+
+
+def _logbook_aggregates(project):
+    # Avoid circular imports
+    from workbench.logbook.models import LoggedCost, LoggedHours
+
+    def rows(queryset, fields, field):
+        return [
+            [*(row[f] for f in fields), str(row[f"{field}__sum"])]
+            for row in queryset.order_by().values(*fields).annotate(Sum(field))
+        ]
+
+    hours = LoggedHours.objects.filter(service__project=project)
+    cost = LoggedCost.objects.filter(service__project=project)
+    return {
+        "hours": rows(hours, ["service", "rendered_by"], "hours"),
+        "cost": rows(cost, ["service"], "cost"),
+        "not_archived_hours": rows(
+            hours.filter(archived_at__isnull=True), ["service"], "hours"
+        ),
+        "not_archived_cost": rows(
+            cost.filter(archived_at__isnull=True), ["service"], "cost"
+        ),
+    }
+
+
+class ProjectStatisticsQuerySet(models.QuerySet):
+    def logbook(self, project):
+        """
+        Return the logged hours and cost of the project grouped by service
+
+        The aggregates are only recomputed when the project's version has
+        been bumped since they were last stored.
+        """
+        stats, _created = self.get_or_create(project=project)
+        if stats.data_version != stats.version:
+            # Do not store aggregates computed from a lagging replica
+            with primary():
+                stats.data = _logbook_aggregates(project)
+            self.filter(pk=stats.pk).update(data=stats.data, data_version=stats.version)
+
+        hours = defaultdict(dict)
+        for service, user, value in stats.data["hours"]:
+            hours[service][user] = Decimal(value)
+        return {
+            "hours": hours,
+            **{
+                key: {service: Decimal(value) for service, value in stats.data[key]}
+                for key in ["cost", "not_archived_hours", "not_archived_cost"]
+            },
+        }
+
+
+class ProjectStatistics(models.Model):
+    """
+    Cached logbook aggregates for ``Project.grouped_services``
+
+    ``version`` is bumped by database triggers whenever logged hours, logged
+    cost or services of the project change; see
+    ``projects.0033_projectstatistics``. ``data`` is only valid as long as
+    ``data_version`` matches ``version``.
+    """
+
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+        verbose_name=_("project"),
+    )
+    version = models.PositiveIntegerField(_("version"), default=1)
+    data_version = models.PositiveIntegerField(_("data version"), default=0)
+    data = models.JSONField(_("data"), default=dict)
+
+    objects = ProjectStatisticsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("project statistics")
+        verbose_name_plural = _("project statistics")
+
+    def __str__(self):
+        return str(self.project)
@@ -9,7 +9,7 @@ from django.utils.translation import gettext as _
 from workbench.accounts.models import User
 from workbench.awt.reporting import employment_percentages
 from workbench.contacts.models import Organization
-from workbench.logbook.models import LoggedHours
+from workbench.logbook.models import LogbookDay, LoggedHours
 from workbench.projects.models import InternalType, InternalTypeUser, Project
 from workbench.tools.formats import Z1, Z2
 from workbench.tools.forms import querystring
@@ -21,17 +21,17 @@ def hours_per_customer(date_range, *, users=None):
     seen_organizations = set()
     seen_users = set()
 
-    queryset = LoggedHours.objects.order_by().filter(rendered_on__range=date_range)
+    queryset = LogbookDay.objects.order_by().filter(
+        day__range=date_range, hours_count__gt=0
+    )
     if users:
-        queryset = queryset.filter(rendered_by__in=users)
+        queryset = queryset.filter(user__in=users)
 
-    for row in queryset.values("rendered_by", "service__project__customer").annotate(
-        Sum("hours")
-    ):
-        hours[row["service__project__customer"]][row["rendered_by"]] = row["hours__sum"]
-        user_hours[row["rendered_by"]] += row["hours__sum"]
-        seen_organizations.add(row["service__project__customer"])
-        seen_users.add(row["rendered_by"])
+    for row in queryset.values("user", "customer").annotate(Sum("hours")):
+        hours[row["customer"]][row["user"]] = row["hours__sum"]
+        user_hours[row["user"]] += row["hours__sum"]
+        seen_organizations.add(row["customer"])
+        seen_users.add(row["user"])
 
     user_list = User.objects.filter(id__in=seen_users)
 
@@ -79,7 +79,9 @@ def highlight_internal(row, *, is_last):
 def hours_per_type(date_range, *, users=None):
     hours = defaultdict(lambda: defaultdict(lambda: Z1))
 
-    queryset = LoggedHours.objects.order_by().filter(rendered_on__range=date_range)
+    queryset = LogbookDay.objects.order_by().filter(
+        day__range=date_range, hours_count__gt=0
+    )
 
     user_dict = {u.id: u for u in User.objects.all()}
 
@@ -88,13 +90,13 @@ def hours_per_type(date_range, *, users=None):
         user_internal_types[user_dict[m2m.user_id]][m2m.internal_type] = m2m
 
     if users:
-        queryset = queryset.filter(rendered_by__in=users)
-    for row in queryset.values(
-        "rendered_by", "service__project__type", "service__project__internal_type"
-    ).annotate(Sum("hours")):
-        u = user_dict[row["rendered_by"]]
-        if row["service__project__type"] == Project.INTERNAL:
-            hours[u][row["service__project__internal_type"]] += row["hours__sum"]
+        queryset = queryset.filter(user__in=users)
+    for row in queryset.values("user", "project_type", "internal_type").annotate(
+        Sum("hours")
+    ):
+        u = user_dict[row["user"]]
+        if row["project_type"] == Project.INTERNAL:
+            hours[u][row["internal_type"]] += row["hours__sum"]
         else:
             hours[u][0] += row["hours__sum"]
 
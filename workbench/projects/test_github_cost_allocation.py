@@ -0,0 +1,110 @@
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils.http import http_date
+
+from workbench.projects.github_client import GitHubClient, _retry_delay
+from workbench.projects.github_cost_allocation import (
+    IssueNode,
+    _fetch_billing_label_attribution,
+)
+
+
+def _response(data, *, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = data
+    return response
+
+
+def _issue(number):
+    return IssueNode(
+        url=f"https://github.com/acme/app/issues/{number}",
+        repo="app",
+        number=number,
+        title=f"Issue {number}",
+        state="OPEN",
+        estimate=None,
+        labels=["angeboten"],
+        billing_label="angeboten",
+    )
+
+
+class GitHubCostAllocationTest(TestCase):
+    def test_batched_attribution(self):
+        """Timelines of many issues are fetched with a few aliased queries"""
+        issues = [_issue(number) for number in range(1, 121)]
+        client = GitHubClient()
+
+        def post(method, url, *, json, **kwargs):
+            aliases = {f"i{key[1:]}" for key in json["variables"]}
+            return _response({
+                "data": {
+                    alias: {
+                        "issue": {
+                            "timelineItems": {
+                                "nodes": [
+                                    {
+                                        "__typename": "LabeledEvent",
+                                        "createdAt": "2026-01-01T00:00:00Z",
+                                        "actor": {"login": "mk"},
+                                        "label": {"name": "angeboten"},
+                                    }
+                                ]
+                            }
+                        }
+                    }
+                    for alias in aliases
+                }
+            })
+
+        with (
+            patch(
+                "workbench.projects.github_cost_allocation.github_client",
+                return_value=client,
+            ),
+            patch.object(client.session, "request", side_effect=post) as request,
+        ):
+            _fetch_billing_label_attribution(issues, {})
+
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual({issue.billing_label_set_by for issue in issues}, {"mk"})
+
+    def test_rate_limit_backoff_and_cache(self):
+        """Rate limited requests are retried and responses cached on disk"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = GitHubClient(cache_dir=cache_dir)
+            responses = [
+                _response({}, status_code=429, headers={"Retry-After": "1"}),
+                _response({"data": {"viewer": {"login": "mk"}}}),
+            ]
+            with (
+                patch.object(
+                    client.session, "request", side_effect=responses
+                ) as request,
+                patch("workbench.projects.github_client.time.sleep") as sleep,
+            ):
+                data = client.graphql("{ viewer { login } }", cache=True)
+                self.assertEqual(data, {"viewer": {"login": "mk"}})
+                self.assertEqual(
+                    client.graphql("{ viewer { login } }", cache=True), data
+                )
+
+            self.assertEqual(request.call_count, 2)
+            sleep.assert_called_once_with(1)
+
+    def test_retry_after_http_date(self):
+        """Retry-After may be a number of seconds or an HTTP date"""
+        self.assertEqual(
+            _retry_delay(_response({}, headers={"Retry-After": "5"}), 0), 5
+        )
+        delay = _retry_delay(
+            _response({}, headers={"Retry-After": http_date(time.time() + 30)}), 0
+        )
+        self.assertTrue(28 <= delay <= 30)
+        self.assertEqual(
+            _retry_delay(_response({}, headers={"Retry-After": "soon"}), 3), 8
+        )
@@ -34,7 +34,7 @@ class GitHubFieldExtractionTestCase(TestCase):
         }
         return response
 
-    @patch("workbench.projects.github.requests.post")
+    @patch("workbench.projects.github_client.GitHubClient.request")
     def test_extract_hours_from_number_field(self, mock_post):
         """Test extracting hours from number fields with different naming patterns."""
         # Create field data with different naming patterns
@@ -142,7 +142,7 @@ class GitHubFieldExtractionTestCase(TestCase):
         self.assertIsNone(cards[3]["estimate"])
         self.assertNotIn("estimate_field", cards[3])
 
-    @patch("workbench.projects.github.requests.post")
+    @patch("workbench.projects.github_client.GitHubClient.request")
     def test_fallback_to_issue_content(self, mock_post):
         """Test fallback to parsing hour estimates from issue title/body."""
         # Create field data with no hour-related fields
@@ -218,7 +218,7 @@ class GitHubFieldExtractionTestCase(TestCase):
         self.assertEqual(cards[1]["estimate"], 5.0)
         self.assertEqual(cards[2]["estimate"], 8.0)
 
-    @patch("workbench.projects.github.requests.post")
+    @patch("workbench.projects.github_client.GitHubClient.request")
     def test_multiple_number_fields(self, mock_post):
         """Test extraction when an item has multiple number fields."""
         # Create field data with multiple hour-related fields
@@ -265,7 +265,7 @@ class GitHubFieldExtractionTestCase(TestCase):
         self.assertEqual(cards[0]["estimate"], 10.0)
         self.assertEqual(cards[0]["estimate_field"], "hours")
 
-    @patch("workbench.projects.github.requests.post")
+    @patch("workbench.projects.github_client.GitHubClient.request")
     def test_empty_field_values(self, mock_post):
         """Test handling of empty or null field values."""
         # Create field data with hour-related fields
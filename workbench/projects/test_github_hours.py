@@ -1,6 +1,13 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest.mock import patch
 
-from workbench.projects.github import extract_project_info
+from django.test import TestCase, override_settings
+
+from workbench import factories
+from workbench.management.commands.update_service_estimates import (
+    update_service_estimates,
+)
+from workbench.projects.github import canonical_issue_urls, extract_project_info
 
 
 class GitHubHoursTestCase(TestCase):
@@ -41,3 +48,61 @@ class GitHubHoursTestCase(TestCase):
         self.assertIsNone(owner)
         self.assertIsNone(repo)
         self.assertIsNone(number)
+
+    def test_canonical_issue_urls(self):
+        """Issue URLs are extracted once, lowercased and deduplicated"""
+        self.assertEqual(
+            canonical_issue_urls(
+                "https://github.com/Acme/Repo/issues/12",
+                "See https://github.com/acme/repo/issues/12#issuecomment-1 and"
+                " https://github.com/acme/repo/issues/1, not"
+                " https://github.com/acme/repo/pull/3",
+            ),
+            [
+                "https://github.com/acme/repo/issues/12",
+                "https://github.com/acme/repo/issues/1",
+            ],
+        )
+
+    @override_settings(GITHUB_PROJECT_URLS=["https://github.com/orgs/acme/projects/1"])
+    def test_update_service_estimates(self):
+        """Estimates are applied to services by their indexed issue URLs"""
+        offer = factories.OfferFactory.create()
+        service = factories.ServiceFactory.create(
+            project=offer.project,
+            offer=offer,
+            description="https://github.com/acme/repo/issues/12",
+            effort_rate=100,
+        )
+        other = factories.ServiceFactory.create(
+            project=offer.project,
+            description="https://github.com/acme/repo/issues/1",
+            effort_hours=3,
+        )
+        self.assertEqual(
+            service.github_issue_urls, ["https://github.com/acme/repo/issues/12"]
+        )
+
+        with patch(
+            "workbench.management.commands.update_service_estimates"
+            ".issue_estimates_from_github_project",
+            return_value={
+                "https://github.com/Acme/repo/issues/12": Decimal(5),
+                "https://github.com/acme/repo/issues/1": Decimal(3),
+                "https://github.com/acme/repo/issues/2": Decimal(7),
+            },
+        ):
+            up_to_date, updated, estimates = update_service_estimates()
+
+        self.assertEqual(set(up_to_date), {"https://github.com/acme/repo/issues/1"})
+        self.assertEqual(set(updated), {"https://github.com/Acme/repo/issues/12"})
+        self.assertEqual(len(estimates), 3)
+
+        service.refresh_from_db()
+        self.assertEqual(service.effort_hours, 5)
+        self.assertEqual(service.service_hours, 5)
+        self.assertEqual(service.service_cost, 500)
+        offer.refresh_from_db()
+        self.assertEqual(offer.subtotal, 500)
+        other.refresh_from_db()
+        self.assertEqual(other.effort_hours, 3)
@@ -5,7 +5,7 @@ from django.test import TestCase
 
 from workbench import factories
 from workbench.invoices.models import Invoice
-from workbench.projects.models import Project
+from workbench.projects.models import Project, ProjectStatistics
 from workbench.projects.reporting import hours_per_customer
 from workbench.reporting import green_hours, project_budget_statistics
 from workbench.reporting.models import Accruals
@@ -186,6 +186,35 @@ class StatisticsTest(TestCase):
             service=s_order, hours=10, rendered_on=dt.date(2019, 4, 1)
         )
 
+    def test_grouped_services_cache(self):
+        """Logbook aggregates are cached until the project's version is bumped"""
+        service = factories.ServiceFactory.create(effort_rate=180)
+        factories.LoggedHoursFactory.create(service=service, hours=10)
+
+        project = Project.objects.get()
+        self.assertEqual(project.grouped_services["logged_hours"], Decimal(10))
+
+        stats = ProjectStatistics.objects.get()
+        self.assertEqual(stats.version, stats.data_version)
+
+        with self.assertNumQueries(1):
+            ProjectStatistics.objects.logbook(project)
+
+        factories.LoggedHoursFactory.create(service=service, hours=5)
+        factories.LoggedCostFactory.create(service=service, cost=100)
+        stats.refresh_from_db()
+        self.assertNotEqual(stats.version, stats.data_version)
+
+        project = Project.objects.get()
+        self.assertEqual(project.grouped_services["logged_hours"], Decimal(15))
+        self.assertEqual(project.grouped_services["logged_cost"], Decimal(100))
+
+        service.project = factories.ProjectFactory.create()
+        service.save()
+
+        project = Project.objects.get(pk=project.pk)
+        self.assertEqual(project.grouped_services["logged_hours"], Z1)
+
     def test_green_hours(self):
         """Green hours report incl. filtering and overall stats"""
         self.create_projects()
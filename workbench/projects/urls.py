@@ -44,6 +44,8 @@ from workbench.projects.views import (
     services,
     set_order,
 )
+from workbench.tools.routing import reporting
+from workbench.tools.typeahead import Typeahead
 
 
 def autocomplete_filter(*, request, queryset):
@@ -54,6 +56,14 @@ def autocomplete_filter(*, request, queryset):
     )
 
 
+project_typeahead = Typeahead(
+    lambda: Project.objects.open().select_related("customer", "owned_by"),
+    tables=["accounts_user", "contacts_organization", "projects_project"],
+    text_from_instance=lambda project: project.customer.name,
+    filter=lambda request: frozenset() if request.GET.get("only_open") else None,
+)
+
+
 def service_autocomplete_filter(*, request, queryset):
     if request.GET.get("logging"):
         queryset = queryset.logging()
@@ -98,7 +108,11 @@ urlpatterns = [
     ),
     path(
         "campaigns/<int:pk>/statistics/",
-        generic.DetailView.as_view(model=Campaign, template_name_suffix="_statistics"),
+        reporting()(
+            generic.DetailView.as_view(
+                model=Campaign, template_name_suffix="_statistics"
+            )
+        ),
         name="projects_campaign_statistics",
     ),
     path(
@@ -140,6 +154,7 @@ urlpatterns = [
             model=Project,
             queryset=Project.objects.select_related("owned_by"),
             filter=autocomplete_filter,
+            typeahead=project_typeahead,
         ),
         name="projects_project_autocomplete",
     ),
@@ -157,7 +172,11 @@ urlpatterns = [
     ),
     path(
         "<int:pk>/statistics/",
-        generic.DetailView.as_view(model=Project, template_name_suffix="_statistics"),
+        reporting()(
+            generic.DetailView.as_view(
+                model=Project, template_name_suffix="_statistics"
+            )
+        ),
         name="projects_project_statistics",
     ),
     path(
@@ -13,7 +13,7 @@ from workbench.logbook.forms import LogbookBatchForm
 from workbench.logbook.models import LoggedCost, LoggedHours
 from workbench.projects.forms import OffersRenumberForm, ProjectAutocompleteForm
 from workbench.projects.models import Project, Service
-from workbench.reporting.squeeze import project_gross_margin
+from workbench.reporting.squeeze import project_gross_margins
 from workbench.services.models import ServiceType
 from workbench.templatetags.workbench import h
 from workbench.tools.formats import Z2, local_date_format
@@ -34,7 +34,7 @@ class ProjectDetailView(generic.DetailView):
         )
         grouped_services = self.object.grouped_services
 
-        squeeze = project_gross_margin(self.object)
+        squeeze = project_gross_margins([self.object])[self.object.pk]
 
         projected_warning = None
         has_accepted_offers = bool(grouped_services["accepted_offers_total_excl_tax"])
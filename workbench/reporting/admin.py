@@ -20,3 +20,21 @@ class CostCenterAdmin(OrderableAdmin, admin.ReadWriteModelAdmin):
 class FreezeDateAdmin(admin.ModelAdmin):
     list_display = ["up_to", "created_at"]
     ordering = ["-up_to"]
+
+
+@admin.register(models.GreenHoursMonth)
+class GreenHoursMonthAdmin(admin.ModelAdmin):
+    list_display = [
+        "month",
+        "profitable",
+        "maintenance",
+        "internal",
+        "total",
+        "is_stale",
+    ]
+    list_filter = ["is_stale"]
+
+
+@admin.register(models.KeyDataSnapshot)
+class KeyDataSnapshotAdmin(admin.ModelAdmin):
+    list_display = ["day", "created_at", "accruals", "is_stale"]
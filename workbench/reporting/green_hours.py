@@ -1,17 +1,19 @@
 from collections import defaultdict
 
-from django.db import connections
+from django.db import connections, transaction
 from django.db.models import Sum
 
 from workbench.accounts.models import User
 from workbench.logbook.models import LoggedHours
 from workbench.offers.models import Offer
 from workbench.projects.models import Project
+from workbench.reporting.models import GreenHoursMonth
 from workbench.tools.formats import Z0, Z1
+from workbench.tools.routing import read_alias
 
 
 def green_hours(date_range, *, users=None):
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(
             """\
 WITH
@@ -106,21 +108,60 @@ WHERE service.hours / logged.hours < 1
     return sorted((user, rec) for user, rec in ret.items() if rec["total"])
 
 
-def green_hours_by_month():
-    with connections["default"].cursor() as cursor:
-        cursor.execute("""\
-DROP TABLE IF EXISTS green_hours_factor;
-CREATE TEMPORARY TABLE green_hours_factor AS
+def refresh_green_hours_by_month(months=None):
+    """
+    Recompute the monthly green hours rollup
+
+    Recomputes the passed months or all months if ``months`` is ``None``.
+    The invalidation triggers take a shared lock on the same key, see
+    ``reporting.0007_greenhoursmonth_lock``. Holding the exclusive lock until
+    the end of the transaction ensures that no invalidation committing while
+    the rollup is computed is overwritten with ``is_stale=false``.
+    """
+    if months is None:
+        months_sql = """\
+SELECT DISTINCT date_trunc('month', rendered_on)::date AS month
+  FROM logbook_loggedhours"""
+        delete_filter = ""
+    else:
+        months_sql = "SELECT DISTINCT unnest(%(months)s::date[]) AS month"
+        delete_filter = "AND month=ANY(%(months)s::date[])"
+
+    with transaction.atomic(using="default"), connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock("
+            "'reporting_greenhoursmonth'::regclass::oid::integer, 0)"
+        )
+        cursor.execute(
+            f"""\
 WITH
+months AS (
+  {months_sql}
+),
+hours AS (
+  SELECT
+    m.month,
+    ps.project_id,
+    p.type,
+    SUM(lh.hours) AS hours
+  FROM months m
+  JOIN logbook_loggedhours lh
+    ON lh.rendered_on >= m.month
+    AND lh.rendered_on < m.month + interval '1 month'
+  JOIN projects_service ps ON lh.service_id=ps.id
+  JOIN projects_project p ON ps.project_id=p.id
+  GROUP BY m.month, ps.project_id, p.type
+),
 service AS (
   SELECT ps.project_id, SUM(service_hours) AS hours
   FROM projects_service ps
   LEFT OUTER JOIN offers_offer o ON ps.offer_id=o.id
   WHERE
-    (
+    ps.project_id IN (SELECT project_id FROM hours WHERE type=%(order)s)
+    AND (
       ps.offer_id IS NULL
       OR (
-        o.status!=40 -- DECLINED
+        o.status!=%(declined)s
         AND NOT o.is_budget_retainer
       )
     )
@@ -128,101 +169,81 @@ service AS (
   GROUP BY ps.project_id
 ),
 logged AS (
-  SELECT project_id, SUM(hours) AS hours FROM logbook_loggedhours lh
-  LEFT JOIN projects_service ps ON lh.service_id=ps.id
-  GROUP BY project_id
-)
-SELECT
-  logged.project_id,
-  service.hours / logged.hours AS factor
-FROM logged
-LEFT JOIN service ON logged.project_id=service.project_id
-WHERE service.hours / logged.hours < 1;
-
-DROP TABLE IF EXISTS total_hours;
-CREATE TEMPORARY TABLE total_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS total_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-GROUP BY month;
-
-DROP TABLE IF EXISTS green_hours;
-CREATE TEMPORARY TABLE green_hours AS
-SELECT
-  month,
-  SUM(hours) AS green_hours
-FROM (
-  SELECT
-    ps.project_id,
-    date_trunc('month', rendered_on) AS month,
-    hours * COALESCE(ghf.factor, 1) AS hours
+  SELECT ps.project_id, SUM(hours) AS hours
   FROM logbook_loggedhours lh
-  LEFT JOIN projects_service ps ON lh.service_id=ps.id
-  LEFT JOIN projects_project p ON ps.project_id=p.id
-  LEFT OUTER JOIN green_hours_factor ghf ON ghf.project_id=p.id
-  WHERE
-    p.type='order'
-) subquery
-GROUP BY month;
-
-DROP TABLE IF EXISTS maintenance_hours;
-CREATE TEMPORARY TABLE maintenance_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS maintenance_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-LEFT JOIN projects_project p ON ps.project_id=p.id
-WHERE
-  p.type='maintenance'
-GROUP BY month;
-
-DROP TABLE IF EXISTS internal_hours;
-CREATE TEMPORARY TABLE internal_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS internal_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-LEFT JOIN projects_project p ON ps.project_id=p.id
+  JOIN projects_service ps ON lh.service_id=ps.id
+  WHERE ps.project_id IN (SELECT project_id FROM hours WHERE type=%(order)s)
+  GROUP BY ps.project_id
+),
+green_hours_factor AS (
+  SELECT
+    logged.project_id,
+    service.hours / logged.hours AS factor
+  FROM logged
+  LEFT JOIN service ON logged.project_id=service.project_id
+  WHERE service.hours / logged.hours < 1
+),
+refreshed AS (
+  INSERT INTO reporting_greenhoursmonth
+    (month, profitable, maintenance, internal, total, is_stale)
+  SELECT
+    h.month,
+    SUM(
+      CASE WHEN h.type=%(order)s THEN h.hours * COALESCE(ghf.factor, 1) ELSE 0 END
+    ),
+    SUM(CASE WHEN h.type=%(maintenance)s THEN h.hours ELSE 0 END),
+    SUM(CASE WHEN h.type=%(internal)s THEN h.hours ELSE 0 END),
+    SUM(h.hours),
+    false
+  FROM hours h
+  LEFT OUTER JOIN green_hours_factor ghf ON ghf.project_id=h.project_id
+  GROUP BY h.month
+  ON CONFLICT (month) DO UPDATE SET
+    profitable=EXCLUDED.profitable,
+    maintenance=EXCLUDED.maintenance,
+    internal=EXCLUDED.internal,
+    total=EXCLUDED.total,
+    is_stale=false
+  RETURNING month
+)
+DELETE FROM reporting_greenhoursmonth
 WHERE
-  p.type='internal'
-GROUP BY month;
-
-SELECT
-  th.month,
-  COALESCE(green_hours, 0),
-  COALESCE(maintenance_hours, 0),
-  COALESCE(internal_hours, 0),
-  COALESCE(total_hours, 0)
-FROM total_hours th
-LEFT OUTER JOIN green_hours gh ON th.month=gh.month
-LEFT OUTER JOIN maintenance_hours mh ON th.month=mh.month
-LEFT OUTER JOIN internal_hours ih ON th.month=ih.month
-ORDER BY th.month
-        """)
-
-        # psycopg 3 supports returning all results, not just the last.
-        # Advance through resultsets until we get to the one returning tuples.
-        import psycopg.pq
-
-        while cursor.pgresult.status != psycopg.pq.ExecStatus.TUPLES_OK:
-            cursor.nextset()
-
-        return [
+  month NOT IN (SELECT month FROM refreshed)
+  {delete_filter}
+            """,
             {
-                "month": row[0].date(),
-                "profitable": row[1],
-                "maintenance": row[2],
-                "internal": row[3],
-                "total": row[4],
-                "overdrawn": row[4] - row[1] - row[2] - row[3],
-                "percentage": (100 * (row[1] + row[2]) / row[4]).quantize(Z0),
-            }
-            for row in cursor
-        ]
+                "months": months,
+                "order": Project.ORDER,
+                "maintenance": Project.MAINTENANCE,
+                "internal": Project.INTERNAL,
+                "declined": Offer.DECLINED,
+            },
+        )
+
+
+def green_hours_by_month(date_range=None):
+    queryset = GreenHoursMonth.objects.all()
+    if date_range:
+        queryset = queryset.filter(month__range=date_range)
+
+    if stale := list(queryset.stale().values_list("month", flat=True)):
+        refresh_green_hours_by_month(stale)
+
+    return [
+        {
+            "month": row.month,
+            "profitable": row.profitable,
+            "maintenance": row.maintenance,
+            "internal": row.internal,
+            "total": row.total,
+            "overdrawn": row.total - row.profitable - row.maintenance - row.internal,
+            "percentage": (
+                100 * (row.profitable + row.maintenance) / row.total
+            ).quantize(Z0),
+        }
+        for row in queryset
+        if row.total
+    ]
 
 
 def test():  # pragma: no cover
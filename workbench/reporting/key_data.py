@@ -11,7 +11,7 @@ from workbench.invoices.utils import recurring
 from workbench.logbook.models import LoggedCost, LoggedHours
 from workbench.offers.models import Offer
 from workbench.projects.models import Project, Service
-from workbench.reporting.models import Accruals
+from workbench.reporting.models import Accruals, KeyDataSnapshot
 from workbench.tools.formats import Z1, Z2
 
 
@@ -62,7 +62,7 @@ def third_party_costs_by_month(date_range):
     return costs
 
 
-def accruals_by_month(date_range):
+def accruals_by_month(date_range, *, current=None):
     accruals = {(0, 0): {"accrual": Z2, "delta": None}}
     for accrual in Accruals.objects.order_by("cutoff_date"):
         accruals[(accrual.cutoff_date.year, accrual.cutoff_date.month)] = {
@@ -72,7 +72,9 @@ def accruals_by_month(date_range):
 
     today = dt.date.today()
     accruals[(today.year, today.month)] = {
-        "accrual": Accruals.objects.accruals(cutoff_date=today),
+        "accrual": Accruals.objects.accruals(cutoff_date=today)
+        if current is None
+        else current,
         "delta": None,
     }
 
@@ -88,13 +90,16 @@ def accruals_by_month(date_range):
     }
 
 
-def gross_margin_by_month(date_range):
+def gross_margin_by_month(date_range, *, snapshot=None):
+    if snapshot is None:
+        snapshot = KeyDataSnapshot.objects.for_day(dt.date.today())
+
     gross = gross_profit_by_month(date_range)
     third = third_party_costs_by_month(date_range)
-    accruals = accruals_by_month(date_range)
+    accruals = accruals_by_month(date_range, current=snapshot.accruals)
     fte = full_time_equivalents_by_month()
 
-    pgm = projected_gross_margin()
+    pgm = snapshot.monthly_projected_gross_margin
 
     first_of_months = list(
         takewhile(
@@ -114,7 +119,7 @@ def gross_margin_by_month(date_range):
             "third_party_costs": third[month],
             "accruals": accruals.get(month) or {"accrual": None, "delta": Z2},
             "fte": fte.get(day, Z2),
-            "projected_gross_margin": pgm["monthly_overall"].get(month),
+            "projected_gross_margin": pgm.get(month),
         }
         if not any((
             row["gross_profit"],
@@ -5,9 +5,10 @@ from django.db import connections
 from django.db.models import Sum
 
 from workbench.accounts.models import User
-from workbench.logbook.models import LoggedCost
+from workbench.logbook.models import LogbookDay
 from workbench.projects.models import Project
 from workbench.tools.formats import Z1, Z2
+from workbench.tools.routing import read_alias
 
 
 LABOR_COSTS_SQL = """
@@ -15,17 +16,16 @@ select
     p.id,
     hourly_labor_costs,
     green_hours_target,
-    lh.rendered_by_id,
-    sum(lh.hours) as hours
-from logbook_loggedhours lh
-left join projects_service ps on lh.service_id=ps.id
-left join projects_project p on ps.project_id=p.id
+    d.user_id,
+    sum(d.hours) as hours
+from logbook_logbookday d
+left join projects_project p on d.project_id=p.id
 left outer join lateral (select * from awt_employment) as costs on
-lh.rendered_by_id=costs.user_id
-and lh.rendered_on >= costs.date_from
-and lh.rendered_on <= costs.date_until
+d.user_id=costs.user_id
+and d.day >= costs.date_from
+and d.day <= costs.date_until
 where %s
-group by p.id, hourly_labor_costs, green_hours_target, lh.rendered_by_id
+group by p.id, hourly_labor_costs, green_hours_target, d.user_id
 """
 
 REVENUE_SQL = """
@@ -36,14 +36,14 @@ with sq as (
             coalesce(hourly_labor_costs, 0),
             coalesce(ps.effort_rate, 0)
         ) as min_effort_rate,
-        sum(lh.hours) as hours
-    from logbook_loggedhours lh
-    left join projects_service ps on lh.service_id=ps.id
-    left join projects_project p on ps.project_id=p.id
+        sum(d.hours) as hours
+    from logbook_logbookday d
+    left join projects_service ps on d.service_id=ps.id
+    left join projects_project p on d.project_id=p.id
     left outer join lateral (select * from awt_employment) as costs on
-    lh.rendered_by_id=costs.user_id
-    and lh.rendered_on >= costs.date_from
-    and lh.rendered_on <= costs.date_until
+    d.user_id=costs.user_id
+    and d.day >= costs.date_from
+    and d.day <= costs.date_until
     where %s
     group by p.id, min_effort_rate
 )
@@ -79,21 +79,21 @@ def _labor_costs_by_project_id(date_range, *, project=None, cost_center=None):
         }
     )
 
-    logged_costs = LoggedCost.objects.order_by().filter(rendered_on__range=date_range)
+    logged_costs = LogbookDay.objects.order_by().filter(day__range=date_range)
 
-    where = ["lh.rendered_on >= %s and lh.rendered_on <= %s"]
+    where = ["d.day >= %s and d.day <= %s and d.hours_count > 0"]
     params = date_range[:]
 
     if project is not None:
         where.append("p.id=%s")
         params.append(project)
-        logged_costs = logged_costs.filter(service__project=project)
+        logged_costs = logged_costs.filter(project=project)
     if cost_center is not None:
         where.append("p.cost_center_id=%s")
         params.append(cost_center)
-        logged_costs = logged_costs.filter(service__project__cost_center=cost_center)
+        logged_costs = logged_costs.filter(project__cost_center=cost_center)
 
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(LABOR_COSTS_SQL % " and ".join(where), params)
 
         for project_id, hlc, ght, rendered_by_id, hours in cursor:
@@ -117,22 +117,17 @@ def _labor_costs_by_project_id(date_range, *, project=None, cost_center=None):
                 by_user["costs"] += costs
                 by_user["costs_with_green_hours_target"] += costs_with_ght
 
-    with connections["default"].cursor() as cursor:
+    with connections[read_alias()].cursor() as cursor:
         cursor.execute(REVENUE_SQL % " and ".join(where), params)
 
         for project_id, revenue in cursor:
             projects[project_id]["revenue"] += revenue
 
-    for row in (
-        logged_costs
-        .filter(third_party_costs__isnull=False)
-        .values("service__project")
-        .annotate(cost=Sum("third_party_costs"))
+    for row in logged_costs.values("project").annotate(
+        cost=Sum("cost"), third_party_costs=Sum("third_party_costs")
     ):
-        projects[row["service__project"]]["third_party_costs"] += row["cost"]
-
-    for row in logged_costs.values("service__project").annotate(cost=Sum("cost")):
-        projects[row["service__project"]]["revenue"] += row["cost"]
+        projects[row["project"]]["third_party_costs"] += row["third_party_costs"]
+        projects[row["project"]]["revenue"] += row["cost"]
 
     return projects
 
@@ -0,0 +1,218 @@
+from django.db import migrations, models
+
+
+# Mark months as stale when something changes which influences the green
+# hours rollup. Logged hours invalidate the months they touch; since the green
+# hours factor of an order depends on all its logged hours and on its services
+# changing those invalidates every month of the affected projects.
+TRIGGERS_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_months(months date[])
+RETURNS void AS $$
+BEGIN
+  INSERT INTO reporting_greenhoursmonth
+    (month, profitable, maintenance, internal, total, is_stale)
+  SELECT DISTINCT date_trunc('month', m)::date, 0, 0, 0, 0, true
+  FROM unnest(months) m
+  WHERE m IS NOT NULL
+  ON CONFLICT (month) DO UPDATE SET is_stale=true;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_projects(project_ids integer[])
+RETURNS void AS $$
+BEGIN
+  UPDATE reporting_greenhoursmonth SET is_stale=true
+  WHERE NOT is_stale AND month IN (
+    SELECT date_trunc('month', lh.rendered_on)::date
+    FROM logbook_loggedhours lh
+    JOIN projects_service ps ON lh.service_id=ps.id
+    WHERE ps.project_id=ANY(project_ids)
+  );
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_green_hours_loggedhours() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_green_hours_invalidate_months(
+      ARRAY(SELECT rendered_on FROM old_rows)
+    );
+    PERFORM reporting_green_hours_invalidate_projects(ARRAY(
+      SELECT DISTINCT ps.project_id
+      FROM old_rows
+      JOIN projects_service ps ON old_rows.service_id=ps.id
+      JOIN projects_project p ON ps.project_id=p.id
+      WHERE p.type='order'
+    ));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_green_hours_invalidate_months(
+      ARRAY(SELECT rendered_on FROM new_rows)
+    );
+    PERFORM reporting_green_hours_invalidate_projects(ARRAY(
+      SELECT DISTINCT ps.project_id
+      FROM new_rows
+      JOIN projects_service ps ON new_rows.service_id=ps.id
+      JOIN projects_project p ON ps.project_id=p.id
+      WHERE p.type='order'
+    ));
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS reporting_green_hours_insert ON logbook_loggedhours;
+CREATE TRIGGER reporting_green_hours_insert AFTER INSERT ON logbook_loggedhours
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE reporting_green_hours_loggedhours();
+
+DROP TRIGGER IF EXISTS reporting_green_hours_update ON logbook_loggedhours;
+CREATE TRIGGER reporting_green_hours_update AFTER UPDATE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE reporting_green_hours_loggedhours();
+
+DROP TRIGGER IF EXISTS reporting_green_hours_delete ON logbook_loggedhours;
+CREATE TRIGGER reporting_green_hours_delete AFTER DELETE ON logbook_loggedhours
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE reporting_green_hours_loggedhours();
+
+CREATE OR REPLACE FUNCTION reporting_green_hours_project_row() RETURNS trigger AS $$
+BEGIN
+  IF TG_TABLE_NAME = 'projects_project' THEN
+    PERFORM reporting_green_hours_invalidate_projects(ARRAY[NEW.id]);
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM reporting_green_hours_invalidate_projects(ARRAY[OLD.project_id]);
+  ELSIF TG_OP = 'INSERT' THEN
+    PERFORM reporting_green_hours_invalidate_projects(ARRAY[NEW.project_id]);
+  ELSE
+    PERFORM reporting_green_hours_invalidate_projects(
+      ARRAY[OLD.project_id, NEW.project_id]
+    );
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS reporting_green_hours_service ON projects_service;
+CREATE TRIGGER reporting_green_hours_service AFTER INSERT OR DELETE ON projects_service
+  FOR EACH ROW EXECUTE PROCEDURE reporting_green_hours_project_row();
+
+DROP TRIGGER IF EXISTS reporting_green_hours_service_update ON projects_service;
+CREATE TRIGGER reporting_green_hours_service_update AFTER UPDATE ON projects_service
+  FOR EACH ROW WHEN (
+    OLD.project_id IS DISTINCT FROM NEW.project_id
+    OR OLD.offer_id IS DISTINCT FROM NEW.offer_id
+    OR OLD.service_hours IS DISTINCT FROM NEW.service_hours
+    OR OLD.is_optional IS DISTINCT FROM NEW.is_optional
+  )
+  EXECUTE PROCEDURE reporting_green_hours_project_row();
+
+DROP TRIGGER IF EXISTS reporting_green_hours_offer ON offers_offer;
+CREATE TRIGGER reporting_green_hours_offer AFTER UPDATE ON offers_offer
+  FOR EACH ROW WHEN (
+    OLD.status IS DISTINCT FROM NEW.status
+    OR OLD.is_budget_retainer IS DISTINCT FROM NEW.is_budget_retainer
+  )
+  EXECUTE PROCEDURE reporting_green_hours_project_row();
+
+DROP TRIGGER IF EXISTS reporting_green_hours_project ON projects_project;
+CREATE TRIGGER reporting_green_hours_project AFTER UPDATE ON projects_project
+  FOR EACH ROW WHEN (OLD.type IS DISTINCT FROM NEW.type)
+  EXECUTE PROCEDURE reporting_green_hours_project_row();
+
+INSERT INTO reporting_greenhoursmonth
+  (month, profitable, maintenance, internal, total, is_stale)
+SELECT DISTINCT date_trunc('month', rendered_on)::date, 0, 0, 0, 0, true
+FROM logbook_loggedhours
+ON CONFLICT (month) DO NOTHING;
+"""
+
+DROP_TRIGGERS_SQL = """\
+DROP TRIGGER IF EXISTS reporting_green_hours_insert ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS reporting_green_hours_update ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS reporting_green_hours_delete ON logbook_loggedhours;
+DROP TRIGGER IF EXISTS reporting_green_hours_service ON projects_service;
+DROP TRIGGER IF EXISTS reporting_green_hours_service_update ON projects_service;
+DROP TRIGGER IF EXISTS reporting_green_hours_offer ON offers_offer;
+DROP TRIGGER IF EXISTS reporting_green_hours_project ON projects_project;
+DROP FUNCTION IF EXISTS reporting_green_hours_project_row();
+DROP FUNCTION IF EXISTS reporting_green_hours_loggedhours();
+DROP FUNCTION IF EXISTS reporting_green_hours_invalidate_projects(integer[]);
+DROP FUNCTION IF EXISTS reporting_green_hours_invalidate_months(date[]);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "logbook",
+            "0021_remove_loggedhours_logbook_log_rendere_ea492e_idx_and_more_updated",
+        ),
+        ("offers", "0014_alter_offer_tax_rate"),
+        ("projects", "0032_auto_20260519_0936"),
+        ("reporting", "0003_freezedate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GreenHoursMonth",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(unique=True, verbose_name="month")),
+                (
+                    "profitable",
+                    models.DecimalField(
+                        decimal_places=10,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="profitable",
+                    ),
+                ),
+                (
+                    "maintenance",
+                    models.DecimalField(
+                        decimal_places=10,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="maintenance",
+                    ),
+                ),
+                (
+                    "internal",
+                    models.DecimalField(
+                        decimal_places=10,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="internal",
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=10,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="total",
+                    ),
+                ),
+                (
+                    "is_stale",
+                    models.BooleanField(default=True, verbose_name="is stale"),
+                ),
+            ],
+            options={
+                "verbose_name": "green hours month",
+                "verbose_name_plural": "green hours months",
+                "ordering": ["month"],
+            },
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,93 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+# Mark the key data snapshot as stale when invoices, projected invoices,
+# offers, services or projects change. Statement level triggers keep bulk
+# writes cheap; the UPDATE is a no-op when the snapshot is already stale.
+TABLES = [
+    "invoices_invoice",
+    "invoices_projectedinvoice",
+    "offers_offer",
+    "projects_project",
+    "projects_service",
+]
+
+TRIGGERS_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_key_data_invalidate() RETURNS trigger AS $$
+BEGIN
+  UPDATE reporting_keydatasnapshot SET is_stale=true WHERE NOT is_stale;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS reporting_key_data ON {table};
+CREATE TRIGGER reporting_key_data AFTER INSERT OR UPDATE OR DELETE ON {table}
+  FOR EACH STATEMENT EXECUTE PROCEDURE reporting_key_data_invalidate();
+"""
+    for table in TABLES
+)
+
+DROP_TRIGGERS_SQL = (
+    "".join(
+        f"DROP TRIGGER IF EXISTS reporting_key_data ON {table};\n" for table in TABLES
+    )
+    + "DROP FUNCTION IF EXISTS reporting_key_data_invalidate();\n"
+)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("invoices", "0027_invoice_archived_at"),
+        ("offers", "0014_alter_offer_tax_rate"),
+        ("projects", "0035_service_github_issue_urls"),
+        ("reporting", "0004_greenhoursmonth"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KeyDataSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True, verbose_name="day")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now=True, verbose_name="created at"),
+                ),
+                (
+                    "accruals",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="accruals",
+                    ),
+                ),
+                (
+                    "projected_gross_margin",
+                    models.JSONField(
+                        default=list, verbose_name="projected gross margin"
+                    ),
+                ),
+                (
+                    "is_stale",
+                    models.BooleanField(default=True, verbose_name="is stale"),
+                ),
+            ],
+            options={
+                "verbose_name": "key data snapshot",
+                "verbose_name_plural": "key data snapshots",
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
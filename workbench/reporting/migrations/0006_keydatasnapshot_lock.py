@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# The invalidation takes a shared advisory lock. KeyDataSnapshot.objects.for_day
+# takes an exclusive lock on the same key before computing the snapshot, so
+# invalidations wait for the computation to commit and the computation waits
+# for in-flight invalidations.
+FUNCTION_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_key_data_invalidate() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'reporting_keydatasnapshot'::regclass::oid::integer, 0
+  );
+  UPDATE reporting_keydatasnapshot SET is_stale=true WHERE NOT is_stale;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_key_data_invalidate() RETURNS trigger AS $$
+BEGIN
+  UPDATE reporting_keydatasnapshot SET is_stale=true WHERE NOT is_stale;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reporting", "0005_keydatasnapshot"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTION_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+
+# The invalidations take a shared advisory lock. refresh_green_hours_by_month
+# takes an exclusive lock on the same key before recomputing, so invalidations
+# wait for the refresh to commit and the refresh waits for in-flight
+# invalidations.
+FUNCTIONS_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_months(months date[])
+RETURNS void AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'reporting_greenhoursmonth'::regclass::oid::integer, 0
+  );
+  INSERT INTO reporting_greenhoursmonth
+    (month, profitable, maintenance, internal, total, is_stale)
+  SELECT DISTINCT date_trunc('month', m)::date, 0, 0, 0, 0, true
+  FROM unnest(months) m
+  WHERE m IS NOT NULL
+  ON CONFLICT (month) DO UPDATE SET is_stale=true;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_projects(project_ids integer[])
+RETURNS void AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'reporting_greenhoursmonth'::regclass::oid::integer, 0
+  );
+  UPDATE reporting_greenhoursmonth SET is_stale=true
+  WHERE NOT is_stale AND month IN (
+    SELECT date_trunc('month', lh.rendered_on)::date
+    FROM logbook_loggedhours lh
+    JOIN projects_service ps ON lh.service_id=ps.id
+    WHERE ps.project_id=ANY(project_ids)
+  );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_months(months date[])
+RETURNS void AS $$
+BEGIN
+  INSERT INTO reporting_greenhoursmonth
+    (month, profitable, maintenance, internal, total, is_stale)
+  SELECT DISTINCT date_trunc('month', m)::date, 0, 0, 0, 0, true
+  FROM unnest(months) m
+  WHERE m IS NOT NULL
+  ON CONFLICT (month) DO UPDATE SET is_stale=true;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_green_hours_invalidate_projects(project_ids integer[])
+RETURNS void AS $$
+BEGIN
+  UPDATE reporting_greenhoursmonth SET is_stale=true
+  WHERE NOT is_stale AND month IN (
+    SELECT date_trunc('month', lh.rendered_on)::date
+    FROM logbook_loggedhours lh
+    JOIN projects_service ps ON lh.service_id=ps.id
+    WHERE ps.project_id=ANY(project_ids)
+  );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reporting", "0006_keydatasnapshot_lock"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTIONS_SQL, REVERSE_SQL),
+    ]
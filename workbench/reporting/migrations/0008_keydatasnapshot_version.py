@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+# Invalidations bump a version sequence after taking the shared advisory lock.
+# KeyDataSnapshot.objects.for_day only takes the exclusive lock briefly to read
+# the version before computing and to compare it again before storing the
+# snapshot; the computation itself runs without holding any lock. Unlike a
+# version column on the snapshot row, the sequence does not serialize
+# concurrent writers.
+FUNCTION_SQL = """\
+CREATE SEQUENCE IF NOT EXISTS reporting_keydatasnapshot_version;
+
+CREATE OR REPLACE FUNCTION reporting_key_data_invalidate() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'reporting_keydatasnapshot'::regclass::oid::integer, 0
+  );
+  PERFORM nextval('reporting_keydatasnapshot_version');
+  UPDATE reporting_keydatasnapshot SET is_stale=true WHERE NOT is_stale;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_key_data_invalidate() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock_shared(
+    'reporting_keydatasnapshot'::regclass::oid::integer, 0
+  );
+  UPDATE reporting_keydatasnapshot SET is_stale=true WHERE NOT is_stale;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP SEQUENCE IF EXISTS reporting_keydatasnapshot_version;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reporting", "0007_greenhoursmonth_lock"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FUNCTION_SQL, REVERSE_SQL),
+    ]
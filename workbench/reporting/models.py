@@ -1,12 +1,15 @@
 import datetime as dt
+from decimal import Decimal
 
-from django.db import models
+from django.db import connection, models, transaction
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from workbench.projects.models import Project
 from workbench.tools.formats import local_date_format
 from workbench.tools.models import MoneyField
+from workbench.tools.routing import primary
 
 
 class AccrualsQuerySet(models.QuerySet):
@@ -75,3 +78,139 @@ class FreezeDate(models.Model):
 
     def __str__(self):
         return local_date_format(self.up_to)
+
+
+class GreenHoursMonthQuerySet(models.QuerySet):
+    def stale(self):
+        return self.filter(is_stale=True)
+
+
+class GreenHoursMonth(models.Model):
+    """
+    Monthly rollup of green hours
+
+    Rows are marked as stale by database triggers when logged hours, services,
+    offers or projects change; see ``reporting.0004_greenhoursmonth``. Stale
+    rows are recomputed by ``green_hours.refresh_green_hours_by_month``.
+    """
+
+    month = models.DateField(_("month"), unique=True)
+    profitable = models.DecimalField(
+        _("profitable"), max_digits=20, decimal_places=10, default=0
+    )
+    maintenance = models.DecimalField(
+        _("maintenance"), max_digits=20, decimal_places=10, default=0
+    )
+    internal = models.DecimalField(
+        _("internal"), max_digits=20, decimal_places=10, default=0
+    )
+    total = models.DecimalField(_("total"), max_digits=20, decimal_places=10, default=0)
+    is_stale = models.BooleanField(_("is stale"), default=True)
+
+    objects = GreenHoursMonthQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["month"]
+        verbose_name = _("green hours month")
+        verbose_name_plural = _("green hours months")
+
+    def __str__(self):
+        return local_date_format(self.month, fmt="F Y")
+
+
+class KeyDataSnapshotQuerySet(models.QuerySet):
+    def _version(self):
+        # The invalidation trigger takes a shared lock on the same key before
+        # bumping the version, see reporting.0008_keydatasnapshot_version.
+        # Waiting for the exclusive lock ensures that all invalidations counted
+        # in the returned version have been committed. Callers only hold the
+        # lock for the rest of a short transaction, not while computing.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock("
+                "'reporting_keydatasnapshot'::regclass::oid::integer, 0)"
+            )
+            cursor.execute("SELECT last_value FROM reporting_keydatasnapshot_version")
+            return cursor.fetchone()[0]
+
+    def for_day(self, day):
+        """
+        Return the snapshot for ``day``, computing it if it is missing or stale
+        """
+        if instance := self.filter(day=day, is_stale=False).first():
+            return instance
+        # Compute the snapshot from current data, not from a lagging replica
+        with primary():
+            with transaction.atomic():
+                version = self._version()
+            instance = self._compute(day)
+            with transaction.atomic():
+                # Data which has been invalidated while computing is stored
+                # as stale and recomputed on the next access
+                instance.is_stale = self._version() != version
+                return self._store(instance)
+
+    def _compute(self, day):
+        from workbench.reporting.key_data import projected_gross_margin
+
+        pgm = projected_gross_margin()
+        return self.model(
+            day=day,
+            accruals=Accruals.objects.accruals(cutoff_date=day),
+            projected_gross_margin=[
+                [year, month, str(value)]
+                for (year, month), value in sorted(pgm["monthly_overall"].items())
+            ],
+        )
+
+    def _store(self, instance):
+        [instance] = self.bulk_create(
+            [instance],
+            update_conflicts=True,
+            unique_fields=["day"],
+            update_fields=[
+                "created_at",
+                "accruals",
+                "projected_gross_margin",
+                "is_stale",
+            ],
+        )
+        self.filter(day__lt=instance.day).delete()
+        return instance
+
+
+class KeyDataSnapshot(models.Model):
+    """
+    Daily snapshot of the live aggregates shown on the key data dashboard
+
+    The snapshot is marked as stale by database triggers when invoices,
+    projected invoices, offers, services or projects change; see
+    ``reporting.0005_keydatasnapshot``. Logged hours and costs do not
+    invalidate the snapshot, their influence on the accruals is picked up
+    the next day. Invalidations also bump a version sequence so that
+    snapshots computed concurrently with an invalidation are not stored as
+    fresh; see ``reporting.0008_keydatasnapshot_version``.
+    """
+
+    day = models.DateField(_("day"), unique=True)
+    created_at = models.DateTimeField(_("created at"), auto_now=True)
+    accruals = MoneyField(_("accruals"))
+    projected_gross_margin = models.JSONField(_("projected gross margin"), default=list)
+    is_stale = models.BooleanField(_("is stale"), default=True)
+
+    objects = KeyDataSnapshotQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-day"]
+        verbose_name = _("key data snapshot")
+        verbose_name_plural = _("key data snapshots")
+
+    def __str__(self):
+        return local_date_format(self.day)
+
+    @cached_property
+    def monthly_projected_gross_margin(self):
+        return {
+            (year, month): Decimal(value)
+            for year, month, value in self.projected_gross_margin
+        }
@@ -43,96 +43,117 @@ def working_days_estimation(date_range):
 def project_gross_margin(project):
     """Compute the gross margin estimate and rate for a single project,
     using the same logic as the squeeze report."""
-    invoiced_agg = (
+    return project_gross_margins([project])[project.id]
+
+
+def project_gross_margins(projects):
+    """Bulk variant of ``project_gross_margin``
+
+    Accepts a queryset or a list of projects and returns a dict mapping
+    project IDs to the same data as ``project_gross_margin``. Runs a fixed
+    number of grouped queries independent of the number of projects.
+    """
+    projects = list(projects)
+    project_ids = [project.id for project in projects]
+
+    invoiced = defaultdict(lambda: Z2)
+    for row in (
         Invoice.objects
         .invoiced()
-        .filter(project=project)
-        .aggregate(Sum("total_excl_tax"), Sum("third_party_costs"))
-    )
-    invoiced = (invoiced_agg["total_excl_tax__sum"] or Z2) - (
-        invoiced_agg["third_party_costs__sum"] or Z2
-    )
-    invoiced -= (
-        LoggedCost.objects.filter(
-            service__project=project,
+        .filter(project__in=project_ids)
+        .order_by()
+        .values("project")
+        .annotate(Sum("total_excl_tax"), Sum("third_party_costs"))
+    ):
+        invoiced[row["project"]] += (row["total_excl_tax__sum"] or Z2) - (
+            row["third_party_costs__sum"] or Z2
+        )
+    for row in (
+        LoggedCost.objects
+        .filter(
+            service__project__in=project_ids,
             third_party_costs__isnull=False,
             invoice_service__isnull=True,
-        ).aggregate(s=Sum("third_party_costs"))["s"]
-        or Z2
-    )
+        )
+        .order_by()
+        .values("service__project")
+        .annotate(Sum("third_party_costs"))
+    ):
+        invoiced[row["service__project"]] -= row["third_party_costs__sum"] or Z2
 
     # Always compute offered/hours_offered — needed for offered_rate even on closed projects.
-    accepted_offers = list(Offer.objects.accepted().filter(project=project))
-    offered = sum((o.total_excl_tax for o in accepted_offers), Z2)
-    offered -= (
-        Service.objects.filter(
-            offer__in=accepted_offers, third_party_costs__isnull=False
-        ).aggregate(s=Sum("third_party_costs"))["s"]
-        or Z2
-    )
-    hours_offered = (
+    accepted_offers = Offer.objects.accepted().filter(project__in=project_ids)
+    offered = defaultdict(lambda: Z2)
+    for row in (
+        accepted_offers.order_by().values("project").annotate(Sum("total_excl_tax"))
+    ):
+        offered[row["project"]] += row["total_excl_tax__sum"] or Z2
+    for row in (
+        Service.objects
+        .filter(offer__in=accepted_offers, third_party_costs__isnull=False)
+        .order_by()
+        .values("offer__project")
+        .annotate(Sum("third_party_costs"))
+    ):
+        offered[row["offer__project"]] -= row["third_party_costs__sum"] or Z2
+
+    hours_offered = defaultdict(
+        lambda: Z1,
         Service.objects
         .budgeted()
-        .filter(project=project)
-        .aggregate(s=Sum("service_hours"))["s"]
-        or Z1
+        .filter(project__in=project_ids)
+        .order_by()
+        .values("project")
+        .annotate(s=Sum("service_hours"))
+        .values_list("project", "s"),
     )
 
     # Projected invoices and including offered in gross_margin only makes sense
     # for open projects; for closed projects the invoiced amount is ground truth.
-    projected = Z2
-    offered_for_margin = Z2
-    if project.closed_on is None:
-        projected = sum(
-            (
-                pi.gross_margin
-                for pi in ProjectedInvoice.objects.filter(project=project)
-            ),
-            Z2,
-        )
-        offered_for_margin = offered
-
-    hours_logged = (
-        LoggedHours.objects.filter(service__project=project).aggregate(s=Sum("hours"))[
-            "s"
-        ]
-        or Z1
+    projected = defaultdict(
+        lambda: Z2,
+        ProjectedInvoice.objects
+        .filter(project__in=project_ids, project__closed_on__isnull=True)
+        .order_by()
+        .values("project")
+        .annotate(s=Sum("gross_margin"))
+        .values_list("project", "s"),
     )
-    gross_margin = max(offered_for_margin, projected, invoiced)
-    hours = max(hours_offered, hours_logged)
-    return {
-        "gross_margin": gross_margin,
-        "hours": hours,
-        "hours_offered": hours_offered,
-        "hours_logged": hours_logged,
-        "rate": gross_margin / hours if hours else Z2,
-        "offered_rate": offered / hours_offered if hours_offered else Z2,
-        "offered": offered,
-        "projected": projected,
-        "invoiced": invoiced,
-    }
-
 
-def squeeze_data(date_range):  # noqa: C901
-    projects = defaultdict(
-        lambda: {
-            "invoiced": Z2,
-            "projected": Z2,
-            "offered": Z2,
-            "hours_logged": Z1,
-            "hours_offered": Z1,
-            "hours_in_range_by_user": {},
-        }
+    hours_logged = defaultdict(
+        lambda: Z1,
+        LoggedHours.objects
+        .filter(service__project__in=project_ids)
+        .order_by()
+        .values("service__project")
+        .annotate(s=Sum("hours"))
+        .values_list("service__project", "s"),
     )
-    users = defaultdict(
-        lambda: {
-            "gross_margin": Z2,
-            "hours_in_range": Z1,
-            "by_project": {},
+
+    result = {}
+    for project in projects:
+        offered_for_margin = offered[project.id] if project.closed_on is None else Z2
+        gross_margin = max(
+            offered_for_margin, projected[project.id], invoiced[project.id]
+        )
+        hours = max(hours_offered[project.id], hours_logged[project.id])
+        result[project.id] = {
+            "gross_margin": gross_margin,
+            "hours": hours,
+            "hours_offered": hours_offered[project.id],
+            "hours_logged": hours_logged[project.id],
+            "rate": gross_margin / hours if hours else Z2,
+            "offered_rate": offered[project.id] / hours_offered[project.id]
+            if hours_offered[project.id]
+            else Z2,
+            "offered": offered[project.id],
+            "projected": projected[project.id],
+            "invoiced": invoiced[project.id],
         }
-    )
-    user_dict = {u.id: u for u in User.objects.all()}
+    return result
+
 
+def _logged_hours_in_range(date_range):
     # hours × COALESCE(effort_rate, default) gives a rate-weighted hours value
     _weighted_hours_expr = ExpressionWrapper(
         F("hours")
@@ -148,7 +169,7 @@ def squeeze_data(date_range):  # noqa: C901
         )
     )
 
-    logged = (
+    return list(
         LoggedHours.objects
         .filter(rendered_on__range=date_range)
         .order_by()
@@ -159,88 +180,112 @@ def squeeze_data(date_range):  # noqa: C901
             hours_rate_unknown=_hours_rate_unknown_expr,
         )
     )
-    for row in logged:
-        p = projects[row["service__project"]]
-        u = user_dict[row["rendered_by"]]
-        p["hours_in_range_by_user"][u] = {
-            "hours": row["hours_sum"],
-            "weighted_hours": row["weighted_hours"],
-            "hours_rate_unknown": row["hours_rate_unknown"] or Decimal(0),
-        }
-        users[u]["hours_in_range"] += row["hours_sum"]
 
-    # Total all-time logged hours per project (used as attribution denominator)
-    total_hours = (
-        LoggedHours.objects
-        .order_by()
-        .filter(service__project__in=projects.keys())
-        .values("service__project")
-        .annotate(hours__sum=Sum("hours"))
-    )
-    for row in total_hours:
-        projects[row["service__project"]]["hours_logged"] = row["hours__sum"]
 
-    offered_hours = (
-        Service.objects
-        .order_by()
-        .budgeted()
-        .filter(project__in=projects.keys(), project__closed_on__isnull=True)
-        .values("project")
-        .annotate(Sum("service_hours"))
-    )
-    for row in offered_hours:
-        projects[row["project"]]["hours_offered"] = row["service_hours__sum"]
+def _project_aggregates(project_ids):
+    """Date range independent aggregates of all projects with hours in any of
+    the date ranges
 
-    invoiced_per_project = (
-        Invoice.objects
-        .invoiced()
-        .filter(project__in=projects.keys())
-        .order_by()
-        .values("project")
-        .annotate(Sum("total_excl_tax"), Sum("third_party_costs"))
+    Uses ``project_gross_margins``, except that offers do not count towards
+    the margin and hours of closed projects."""
+    projects = list(
+        Project.objects.select_related("customer").filter(id__in=project_ids)
     )
-    for row in invoiced_per_project:
-        projects[row["project"]]["invoiced"] = (
-            row["total_excl_tax__sum"] - row["third_party_costs__sum"]
+    margins = project_gross_margins(projects)
+    aggregates = defaultdict(dict)
+    for project in projects:
+        aggregates[project.id] = margins[project.id] | {"project": project}
+        if project.closed_on is not None:
+            aggregates[project.id] |= {"offered": Z2, "hours_offered": Z1}
+    return aggregates
+
+
+def _absences(date_ranges):
+    """Absences relevant for the squeeze report overlapping any date range,
+    with their days already distributed over months"""
+    date_from = min(date_range[0] for date_range in date_ranges)
+    date_until = max(date_range[1] for date_range in date_ranges)
+    absences = []
+    for absence in Absence.objects.filter(
+        Q(ends_on__isnull=True, starts_on__range=[date_from, date_until])
+        | (
+            Q(ends_on__isnull=False)
+            & Q(starts_on__lte=date_until, ends_on__gte=date_from)
+        ),
+        Q(
+            reason__in=[
+                Absence.VACATION,
+                Absence.PAID,
+                Absence.SCHOOL,
+            ]
         )
-
-    # Subtract third party costs from logged costs which have not been
-    # invoiced yet. Maybe we're double counting here but I'd rather have a
-    # pessimistic outlook here.
-    for row in (
-        LoggedCost.objects
-        .filter(
-            service__project__in=projects.keys(),
-            third_party_costs__isnull=False,
-            invoice_service__isnull=True,
+        | Q(
+            reason=Absence.CORRECTION,
+            days__gt=0,
+        ),
+    ).select_related("user"):
+        months = list(
+            monthly_days(absence.starts_on, absence.ends_on or absence.starts_on)
         )
-        .order_by()
-        .values("service__project")
-        .annotate(Sum("third_party_costs"))
-    ):
-        projects[row["service__project"]]["invoiced"] -= row["third_party_costs__sum"]
+        absence_day_per_period_day = absence.days / sum(m[1] for m in months)
+        absences.append((absence, months, absence_day_per_period_day))
+    return absences
+
+
+def squeeze_data(date_range):
+    return squeeze_data_for_ranges([date_range])[0]
+
+
+def squeeze_data_for_ranges(date_ranges):
+    """Compute the squeeze report for several date ranges in one pass
+
+    The date range independent data (project margins, employment percentages,
+    internal types and absences) is only loaded once and shared between all
+    date ranges. Returns a list of results in the order of ``date_ranges``.
+    """
+    logged = [_logged_hours_in_range(date_range) for date_range in date_ranges]
+    shared = {
+        "user_dict": {u.id: u for u in User.objects.select_related("specialist_field")},
+        "projects": _project_aggregates({
+            row["service__project"] for rows in logged for row in rows
+        }),
+        "ep": employment_percentages(),
+        "user_internal_types": defaultdict(dict),
+        "types": list(InternalType.objects.all()),
+        "absences": _absences(date_ranges) if date_ranges else [],
+    }
+    for m2m in InternalTypeUser.objects.select_related("internal_type"):
+        shared["user_internal_types"][m2m.user_id][m2m.internal_type] = m2m
+
+    return [
+        _squeeze_range(date_range, rows, shared)
+        for date_range, rows in zip(date_ranges, logged)
+    ]
 
-    for pi in ProjectedInvoice.objects.filter(
-        project__in=projects.keys(), project__closed_on__isnull=True
-    ):
-        projects[pi.project_id]["projected"] += pi.gross_margin
 
-    offers = Offer.objects.accepted().filter(
-        project__in=projects.keys(), project__closed_on__isnull=True
+def _squeeze_range(date_range, logged, shared):  # noqa: C901
+    projects = defaultdict(lambda: {"hours_in_range_by_user": {}})
+    users = defaultdict(
+        lambda: {
+            "gross_margin": Z2,
+            "hours_in_range": Z1,
+            "by_project": {},
+        }
     )
-    for offer in offers:
-        projects[offer.project_id]["offered"] += offer.total_excl_tax
-    for row in (
-        Service.objects
-        .filter(offer__in=offers, third_party_costs__isnull=False)
-        .order_by()
-        .values("project")
-        .annotate(Sum("third_party_costs"))
-    ):
-        projects[row["project"]]["offered"] -= row["third_party_costs__sum"]
+    user_dict = shared["user_dict"]
+
+    for row in logged:
+        p = projects[row["service__project"]]
+        u = user_dict[row["rendered_by"]]
+        p["hours_in_range_by_user"][u] = {
+            "hours": row["hours_sum"],
+            "weighted_hours": row["weighted_hours"],
+            "hours_rate_unknown": row["hours_rate_unknown"] or Decimal(0),
+        }
+        users[u]["hours_in_range"] += row["hours_sum"]
 
-    for project_id, project in Project.objects.in_bulk(projects.keys()).items():
-        projects[project_id]["project"] = project
+    for project_id, p in projects.items():
+        p.update(shared["projects"][project_id])
 
     # Compute per-project margin, hours, rate, and per-user attribution
     project_list = []
@@ -310,7 +355,7 @@ def squeeze_data(date_range):  # noqa: C901
     project_list.sort(key=lambda r: r["gross_margin_in_range"], reverse=True)
 
     all_users = sorted(users.keys())
-    ep = employment_percentages()
+    ep = shared["ep"]
 
     def average_percentage(user):
         percentages = []
@@ -323,34 +368,15 @@ def squeeze_data(date_range):  # noqa: C901
     hpt = hours_per_type(date_range, users=users.keys())
     hptu = {row["user"]: row for row in hpt["users"]}
 
-    user_internal_types = defaultdict(dict)
-    for m2m in InternalTypeUser.objects.select_related("internal_type"):
-        user_internal_types[m2m.user_id][m2m.internal_type] = m2m
-    types = list(InternalType.objects.all())
+    user_internal_types = shared["user_internal_types"]
+    types = shared["types"]
 
     absence_days_per_user = defaultdict(lambda: Decimal(1))
-    for absence in Absence.objects.filter(
-        Q(ends_on__isnull=True, starts_on__range=date_range)
-        | (
-            Q(ends_on__isnull=False)
-            & Q(starts_on__lte=date_range[1], ends_on__gte=date_range[0])
-        ),
-        Q(
-            reason__in=[
-                Absence.VACATION,
-                Absence.PAID,
-                Absence.SCHOOL,
-            ]
-        )
-        | Q(
-            reason=Absence.CORRECTION,
-            days__gt=0,
-        ),
-    ).select_related("user"):
-        months = list(
-            monthly_days(absence.starts_on, absence.ends_on or absence.starts_on)
-        )
-        absence_day_per_period_day = absence.days / sum(m[1] for m in months)
+    for absence, months, absence_day_per_period_day in shared["absences"]:
+        if absence.starts_on > date_range[1] or (
+            (absence.ends_on or absence.starts_on) < date_range[0]
+        ):
+            continue
         for month, days in months:
             if date_range[0] <= month <= date_range[1]:
                 absence_days_per_user[absence.user] += days * absence_day_per_period_day
@@ -740,6 +766,50 @@ def build_xlsx(data):
     return xlsx
 
 
+def build_merged_xlsx(data_list):
+    """Gross margin per user for several date ranges side by side"""
+    users = defaultdict(
+        lambda: {
+            "gross_margin": [None for _data in data_list],
+            "employment_percentage": Z0,
+            "expected_gross_margin": Z2,
+        }
+    )
+    for idx, data in enumerate(data_list):
+        for ud in data["users"]:
+            row = users[ud["user"]]
+            row["gross_margin"][idx] = ud["gross_margin"]
+            row["employment_percentage"] = ud["employment_percentage"]
+            row["expected_gross_margin"] = ud["expected_gross_margin"]
+
+    xlsx = WorkbenchXLSXDocument()
+    xlsx.add_sheet(_("users").replace(":", "_"))
+    xlsx.table(
+        [
+            _("user"),
+            *(
+                "{} - {}".format(
+                    local_date_format(data["date_range"][0]),
+                    local_date_format(data["date_range"][1]),
+                )
+                for data in data_list
+            ),
+            _("employment percentage YTD"),
+            _("Target value: gross margin"),
+        ],
+        [
+            [
+                user,
+                *row["gross_margin"],
+                row["employment_percentage"],
+                row["expected_gross_margin"],
+            ]
+            for user, row in sorted(users.items())
+        ],
+    )
+    return xlsx
+
+
 def _project_xlsx_row(p, all_users):
     hours = p["hours"]
     hours_in_range = p["hours_in_range"]
@@ -1,7 +1,7 @@
 import datetime as dt
 
 from workbench.invoices.utils import recurring
-from workbench.reporting.models import Accruals
+from workbench.reporting.models import Accruals, KeyDataSnapshot
 
 
 def create_accruals_for_last_month():
@@ -12,3 +12,7 @@ def create_accruals_for_last_month():
         if day > today:
             break
         Accruals.objects.for_cutoff_date(day - dt.timedelta(days=1))
+
+
+def refresh_key_data_snapshot():
+    KeyDataSnapshot.objects.for_day(dt.date.today())
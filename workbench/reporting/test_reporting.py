@@ -4,8 +4,20 @@ from decimal import Decimal
 from django.test import RequestFactory, TestCase
 
 from workbench import factories
+from workbench.projects.models import Project
+from workbench.reporting.green_hours import (
+    green_hours_by_month,
+    refresh_green_hours_by_month,
+)
 from workbench.reporting.labor_costs import labor_costs_by_cost_center
-from workbench.reporting.models import Accruals
+from workbench.reporting.models import Accruals, GreenHoursMonth, KeyDataSnapshot
+from workbench.reporting.squeeze import (
+    build_merged_xlsx,
+    project_gross_margin,
+    project_gross_margins,
+    squeeze_data,
+    squeeze_data_for_ranges,
+)
 from workbench.reporting.views import DateRangeAndTeamFilterForm
 
 
@@ -16,6 +28,37 @@ class ReportingTest(TestCase):
         self.assertEqual(obj.accruals, Decimal("0.00"))
         self.assertEqual(str(obj), obj.cutoff_date.strftime("%d.%m.%Y"))
 
+    def test_key_data_snapshot(self):
+        """The key data snapshot is computed once per day and invalidated by writes"""
+        today = dt.date.today()
+        pi = factories.ProjectedInvoiceFactory.create(
+            gross_margin=Decimal(1000), invoiced_on=today
+        )
+
+        KeyDataSnapshot.objects.for_day(today - dt.timedelta(days=1))
+
+        snapshot = KeyDataSnapshot.objects.for_day(today)
+        self.assertFalse(snapshot.is_stale)
+        self.assertEqual(
+            snapshot.monthly_projected_gross_margin,
+            {(today.year, today.month): Decimal("1000.00")},
+        )
+        # Snapshots of earlier days are removed
+        self.assertEqual(KeyDataSnapshot.objects.count(), 1)
+
+        with self.assertNumQueries(1):
+            KeyDataSnapshot.objects.for_day(today)
+
+        pi.gross_margin = 1500
+        pi.save()
+        self.assertTrue(KeyDataSnapshot.objects.get().is_stale)
+
+        snapshot = KeyDataSnapshot.objects.for_day(today)
+        self.assertEqual(
+            snapshot.monthly_projected_gross_margin,
+            {(today.year, today.month): Decimal("1500.00")},
+        )
+
     def test_labor_costs(self):
         """The labor costs report does a few things"""
         user1 = factories.EmploymentFactory.create().user
@@ -78,3 +121,108 @@ class ReportingTest(TestCase):
         form = DateRangeAndTeamFilterForm({"team": -user2.id}, request=req)
         self.assertTrue(form.is_valid())
         self.assertEqual(set(form.users()), {user2})
+
+    def test_green_hours_by_month_invalidation(self):
+        """The monthly green hours rollup is invalidated by writes"""
+        service = factories.ServiceFactory.create(effort_hours=20)
+        factories.LoggedHoursFactory.create(
+            service=service, hours=10, rendered_on=dt.date(2019, 1, 15)
+        )
+
+        january = green_hours_by_month()[0]
+        self.assertEqual(january["month"], dt.date(2019, 1, 1))
+        self.assertEqual(january["profitable"], 10)
+        self.assertFalse(GreenHoursMonth.objects.stale().exists())
+
+        # Overdrawing the order in February also affects January
+        factories.LoggedHoursFactory.create(
+            service=service, hours=30, rendered_on=dt.date(2019, 2, 15)
+        )
+        self.assertEqual(GreenHoursMonth.objects.stale().count(), 2)
+
+        january, february = green_hours_by_month()
+        self.assertEqual(january["profitable"], 5)
+        self.assertEqual(february["profitable"], 15)
+        self.assertEqual(february["overdrawn"], 15)
+
+        # Changing the budget invalidates all months of the project
+        service.effort_hours = 40
+        service.save()
+        self.assertEqual(GreenHoursMonth.objects.stale().count(), 2)
+
+        january, february = green_hours_by_month([
+            dt.date(2019, 1, 1),
+            dt.date(2019, 1, 31),
+        ]) + green_hours_by_month([dt.date(2019, 2, 1), dt.date(2019, 2, 28)])
+        self.assertEqual(january["profitable"], 10)
+        self.assertEqual(february["profitable"], 30)
+
+        service.loggedhours.filter(rendered_on__month=2).delete()
+        refresh_green_hours_by_month()
+        self.assertEqual(
+            list(GreenHoursMonth.objects.values_list("month", flat=True)),
+            [dt.date(2019, 1, 1)],
+        )
+
+    def test_squeeze_data_for_ranges(self):
+        """Batched squeeze results match separately computed results"""
+        service = factories.ServiceFactory.create(effort_hours=20, effort_rate=100)
+        user = factories.EmploymentFactory.create(date_from=dt.date(2019, 1, 1)).user
+        factories.LoggedHoursFactory.create(
+            service=service,
+            rendered_by=user,
+            hours=10,
+            rendered_on=dt.date(2019, 1, 15),
+        )
+        factories.LoggedHoursFactory.create(
+            service=service, rendered_by=user, hours=5, rendered_on=dt.date(2019, 2, 15)
+        )
+        factories.AbsenceFactory.create(user=user, starts_on=dt.date(2019, 2, 4))
+
+        date_ranges = [
+            [dt.date(2019, 1, 1), dt.date(2019, 1, 31)],
+            [dt.date(2019, 2, 1), dt.date(2019, 2, 28)],
+        ]
+        batched = squeeze_data_for_ranges(date_ranges)
+        self.assertEqual(len(batched), 2)
+
+        for data, date_range in zip(batched, date_ranges):
+            single = squeeze_data(date_range)
+            self.assertEqual(data["date_range"], date_range)
+            self.assertEqual(data["totals"], single["totals"])
+            self.assertEqual(
+                [ud["absence_days"] for ud in data["users"]],
+                [ud["absence_days"] for ud in single["users"]],
+            )
+
+        self.assertEqual(batched[0]["users"][0]["hours_in_range"], 10)
+        self.assertEqual(batched[1]["users"][0]["hours_in_range"], 5)
+        self.assertEqual(batched[1]["users"][0]["absence_days"], 2)
+
+        xlsx = build_merged_xlsx(batched)
+        self.assertEqual(len(xlsx.workbook.worksheets), 1)
+
+    def test_project_gross_margins(self):
+        """The bulk project gross margin runs a fixed number of queries"""
+        for i in range(5):
+            service = factories.ServiceFactory.create(effort_hours=10, effort_rate=150)
+            factories.LoggedHoursFactory.create(service=service, hours=5 + i)
+            factories.LoggedCostFactory.create(
+                service=service, cost=10, third_party_costs=10
+            )
+            factories.InvoiceFactory.create(
+                project=service.project,
+                customer=service.project.customer,
+                subtotal=1000,
+                third_party_costs=100,
+                status=factories.Invoice.SENT,
+            )
+
+        with self.assertNumQueries(8):
+            margins = project_gross_margins(Project.objects.all())
+        self.assertEqual(len(margins), 5)
+
+        for project in Project.objects.all():
+            self.assertEqual(margins[project.id], project_gross_margin(project))
+            self.assertEqual(margins[project.id]["invoiced"], Decimal(890))
+            self.assertEqual(margins[project.id]["hours_offered"], 10)
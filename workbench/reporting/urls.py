@@ -27,6 +27,7 @@ from workbench.reporting.views import (
     squeeze_view,
     work_anniversaries_view,
 )
+from workbench.tools.routing import reporting
 
 
 urlpatterns = [
@@ -131,3 +132,7 @@ urlpatterns = [
         name="report_birthdays",
     ),
 ]
+
+# All reports are read-only and may read from the reporting replica
+for pattern in urlpatterns:
+    pattern.callback = reporting()(pattern.callback)
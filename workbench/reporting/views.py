@@ -32,6 +32,7 @@ from workbench.reporting import (
     squeeze,
     third_party_costs,
 )
+from workbench.reporting.models import KeyDataSnapshot
 from workbench.reporting.utils import date_ranges
 from workbench.tools.formats import Z0, Z2, local_date_format
 from workbench.tools.forms import DateInput, Form
@@ -177,13 +178,16 @@ def key_data_view(request):
     today = dt.date.today()
     date_range = [dt.date(today.year - 3, 1, 1), dt.date(today.year, 12, 31)]
 
-    gross_margin_by_month = key_data.gross_margin_by_month(date_range)
+    # The snapshot is loaded once and shared so that neither the accruals nor
+    # the projected gross margin are computed more than once per request.
+    snapshot = KeyDataSnapshot.objects.for_day(today)
+    gross_margin_by_month = key_data.gross_margin_by_month(
+        date_range, snapshot=snapshot
+    )
     gross_margin_months = {
         row["month"]: row["gross_margin"] for row in gross_margin_by_month
     }
 
-    projected_gross_margin = key_data.projected_gross_margin()
-
     gross_margin_by_years = defaultdict(
         lambda: {
             "year": month["date"].year,
@@ -231,11 +235,7 @@ def key_data_view(request):
         else None,
     }
 
-    gh = [
-        row
-        for row in green_hours.green_hours_by_month()
-        if date_range[0] <= row["month"] <= date_range[1]
-    ]
+    gh = green_hours.green_hours_by_month(date_range)
 
     def yearly_headline(gh):
         zero = {
@@ -274,7 +274,7 @@ def key_data_view(request):
                 for year in range(date_range[0].year, date_range[1].year + 1)
             ],
             "projected_gross_margin": [
-                projected_gross_margin["monthly_overall"].get((today.year, i), Z2)
+                snapshot.monthly_projected_gross_margin.get((today.year, i), Z2)
                 for i in range(1, 13)
             ],
             "invoiced_corrected_per_fte": [
@@ -77,16 +77,21 @@ class ServiceBase(Model):
         self._related_model = self._meta.get_field(self.RELATED_MODEL_FIELD)
         self._orig_related_id = getattr(self, self._related_model.attname)
 
+    def update_totals(self):
+        self.service_hours = self.effort_hours or Z1
+        self.service_cost = self.cost or Z2
+        if all((self.effort_hours, self.effort_rate)):
+            self.service_cost += self.effort_hours * self.effort_rate
+
+    update_totals.alters_data = True
+
     def save(self, *args, **kwargs):
         skip_related_model = kwargs.pop("skip_related_model", False)
 
         if not self.position:
             max_pos = self.__class__._default_manager.aggregate(m=Max("position"))["m"]
             self.position = 10 + (max_pos or 0)
-        self.service_hours = self.effort_hours or Z1
-        self.service_cost = self.cost or Z2
-        if all((self.effort_hours, self.effort_rate)):
-            self.service_cost += self.effort_hours * self.effort_rate
+        self.update_totals()
 
         super().save(*args, **kwargs)
 
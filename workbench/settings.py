@@ -24,6 +24,17 @@ RECURRING_INVOICES_CC = env("RECURRING_INVOICES_CC", default=[])
 GITHUB_API_TOKEN = env("GITHUB_API_TOKEN", default="")
 GITHUB_PROJECT_URLS = env("GITHUB_PROJECT_URLS", default=[])
 GITHUB_APP_REPOS = env("GITHUB_APP_REPOS", default={})
+GITHUB_CACHE_DIR = env("GITHUB_CACHE_DIR", default="")
+GITHUB_CACHE_TIMEOUT = env("GITHUB_CACHE_TIMEOUT", default=3600)
+REQUEST_INSTRUMENTATION = env("REQUEST_INSTRUMENTATION", default=False)
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = env(
+    "REQUEST_INSTRUMENTATION_SAMPLE_RATE", default=1.0
+)
+REQUEST_INSTRUMENTATION_DAYS = env("REQUEST_INSTRUMENTATION_DAYS", default=14)
+EXCHANGE_RATES_PROVIDER = env(
+    "EXCHANGE_RATES_PROVIDER", default="workbench.expenses.rates.remote_rates"
+)
+EXCHANGE_RATES_FILE = env("EXCHANGE_RATES_FILE", default="")
 
 DEBUG_TOOLBAR = DEBUG and not TESTING
 
@@ -84,6 +95,9 @@ MIDDLEWARE = [
     m
     for m in [
         "django.middleware.security.SecurityMiddleware" if LIVE else "",
+        "workbench.middleware.request_instrumentation"
+        if REQUEST_INSTRUMENTATION
+        else "",
         "debug_toolbar.middleware.DebugToolbarMiddleware" if DEBUG_TOOLBAR else "",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -129,6 +143,14 @@ DATABASES["default"] |= {
     "CONN_MAX_AGE": 300,
     "DISABLE_SERVER_SIDE_CURSORS": True,
 }
+# Reports read from a replica if one is configured, see workbench.tools.routing
+if REPORTING_DATABASE_URL := env("REPORTING_DATABASE_URL", default=""):
+    DATABASES["reporting"] = django_database_url(REPORTING_DATABASE_URL) | {
+        "CONN_HEALTH_CHECKS": True,
+        "CONN_MAX_AGE": 300,
+        "DISABLE_SERVER_SIDE_CURSORS": True,
+    }
+DATABASE_ROUTERS = ["workbench.tools.routing.ReportingRouter"]
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 ATOMIC_REQUESTS = True
 
@@ -507,6 +529,8 @@ if SENTRY_DSN := env("SENTRY_DSN"):
 if TESTING:  # pragma: no cover
     PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
     DATABASES["default"]["TEST"] = {"SERIALIZE": False}
+    if "reporting" in DATABASES:
+        DATABASES["reporting"]["TEST"] = {"MIRROR": "default"}
     FEATURES = defaultdict(lambda: F.ALWAYS, {"COFFEE": F.USER, "LATE_LOGGING": F.USER})
 
 BREVO_WEBHOOK_URL = env("BREVO_WEBHOOK_URL")
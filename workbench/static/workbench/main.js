@@ -292,7 +292,7 @@ $(() => {
   $(".form-search").each(() => {
     let params = new URLSearchParams(window.location.search.slice(1))
     // Also see workbench/generic.py
-    ;["disposition", "error", "export", "page"].forEach((key) => {
+    ;["after", "before", "disposition", "error", "export", "page"].forEach((key) => {
       params.delete(key)
     })
     params = params.toString()
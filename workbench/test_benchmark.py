@@ -0,0 +1,80 @@
+import datetime as dt
+import io
+import json
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase
+
+from workbench.benchmark import ENGINES, compare, engines, generate, run
+from workbench.logbook.models import LoggedHours
+
+
+def _fingerprint():
+    return list(
+        LoggedHours.objects.order_by(
+            "rendered_on", "rendered_by___short_name", "service__title", "hours"
+        ).values_list(
+            "rendered_on", "rendered_by___short_name", "service__title", "hours"
+        )
+    )
+
+
+class BenchmarkTest(TestCase):
+    def test_generate_is_deterministic(self):
+        """Generating twice with the same seed creates the same data"""
+        fingerprints = []
+        for _idx in range(2):
+            with transaction.atomic():
+                stats = generate(users=2, years=1, seed=3)
+                fingerprints.append((stats, _fingerprint()))
+                transaction.set_rollback(True)
+
+        self.assertEqual(fingerprints[0], fingerprints[1])
+        self.assertTrue(fingerprints[0][1])
+
+    def test_generate_and_run(self):
+        """All engines run on the generated data"""
+        today = dt.date(2025, 3, 14)
+        stats = generate(users=2, years=1, seed=3, today=today)
+        self.assertEqual(stats["projects"], 2)
+        self.assertEqual(stats["logged_hours"], LoggedHours.objects.count())
+        self.assertEqual(list(engines(today=today)), ENGINES)
+
+        results = run(repeat=1, today=today)
+        self.assertIn("reporting.squeeze_data", results)
+        for result in results.values():
+            self.assertEqual(len(result["runs"]), 1)
+            self.assertGreater(result["queries"], 0)
+
+        report = {"engines": results}
+        self.assertEqual(
+            [name for name, *_rest in compare(report, report)], list(results)
+        )
+
+    def test_command(self):
+        """The command writes a report and rolls back the generated data"""
+        with tempfile.NamedTemporaryFile(suffix=".json") as f:
+            call_command(
+                "benchmark",
+                users=1,
+                years=1,
+                repeat=1,
+                engine=["awt.annual_working_time"],
+                output=f.name,
+                stderr=io.StringIO(),
+            )
+            report = json.load(f)
+
+        self.assertEqual(list(report["engines"]), ["awt.annual_working_time"])
+        self.assertEqual(report["scale"]["users"], 1)
+        self.assertEqual(LoggedHours.objects.count(), 0)
+
+    def test_compare_reference_day(self):
+        """Reports using a different reference day are not compared"""
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".json") as f:
+            json.dump({"today": "2020-01-01", "engines": {}}, f)
+            f.flush()
+            with self.assertRaisesRegex(CommandError, "reference day"):
+                call_command("benchmark", compare=f.name, stderr=io.StringIO())
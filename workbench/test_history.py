@@ -1,15 +1,18 @@
 import datetime as dt
 from types import SimpleNamespace
 
+from django.db import connection
 from django.test import TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
 from workbench import factories
 from workbench.accounts.features import FEATURES, F
 from workbench.accounts.middleware import set_user_name
 from workbench.audit.models import LoggedAction
+from workbench.audit.tasks import prune_audit
 from workbench.projects.models import Project
 from workbench.tools.history import EVERYTHING, Prettifier
+from workbench.tools.validation import in_days
 
 
 class HistoryTest(TestCase):
@@ -33,6 +36,28 @@ class HistoryTest(TestCase):
         response = self.client.get(f"/history/accounts_user/id/{user3.pk}/")
         self.assertContains(response, f"INSERT accounts_user {user3.pk}")
 
+    def test_transaction_local_user_name(self):
+        """The audit user name is only sent before the first write"""
+        set_user_name("lazy")
+        with CaptureQueriesContext(connection) as ctx:
+            Project.objects.count()
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            user = factories.UserFactory.create()
+            user.save()
+        self.assertEqual(
+            sum("set_config" in query["sql"] for query in ctx.captured_queries), 1
+        )
+        self.assertEqual(
+            set(
+                LoggedAction.objects.filter(
+                    table_name="accounts_user", row_id=user.pk
+                ).values_list("user_name", flat=True)
+            ),
+            {"lazy"},
+        )
+
     def test_history(self):
         """Initial values and changed values"""
         project = factories.ProjectFactory.create()
@@ -114,6 +139,43 @@ class HistoryTest(TestCase):
         actions = LoggedAction.objects.for_model(service).with_data(id=service.id)
         self.assertEqual(len(actions), 2)  # Position updates not logged by trigger
 
+    def test_row_id(self):
+        """The audit trigger records the primary key of the row in row_id"""
+        service = factories.ServiceFactory.create()
+        pk = service.pk
+        service.title += " test"
+        service.save()
+        service.delete()
+
+        actions = LoggedAction.objects.for_model(service).with_data(id=pk)
+        self.assertEqual([action.action for action in actions], ["I", "U", "D"])
+        self.assertEqual({action.row_id for action in actions}, {pk})
+
+    def test_prune_audit(self):
+        """Pruning the audit log drops whole monthly partitions"""
+        day = in_days(-3 * 366)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT audit_create_partition('audit_logged_actions_2y', %s)", [day]
+            )
+            cursor.execute(
+                """
+INSERT INTO audit_logged_actions (table_name, created_at, action)
+VALUES ('logbook_break', %s, 'I'), ('contacts_person', %s, 'I')
+                """,
+                [day, day],
+            )
+
+        prune_audit()
+        self.assertEqual(
+            list(
+                LoggedAction.objects.filter(created_at__lt=in_days(-366)).values_list(
+                    "table_name", flat=True
+                )
+            ),
+            ["contacts_person"],
+        )
+
     def test_exclusion_in_python(self):
         """Versions with only hidden fields (in Python) are not shown in the modal"""
         employment = factories.EmploymentFactory.create()
@@ -3,7 +3,7 @@ from django.test.utils import override_settings
 
 from workbench import factories
 from workbench.accounts.features import F
-from workbench.tools.search import process_query
+from workbench.tools.search import process_query, ranked
 
 
 class SearchTest(TestCase):
@@ -38,6 +38,23 @@ class SearchTest(TestCase):
             self.assertNotContains(response, "/projects/offers/?q=Test")
             self.assertNotContains(response, "/deals/?q=Test")
 
+    def test_ranked(self):
+        """The search index is maintained by triggers and tolerates typos"""
+        project = factories.ProjectFactory.create(title="Kuchenbäckerei")
+        organization = factories.OrganizationFactory.create(name="Tortenfabrik")
+        tables = ["projects_project", "contacts_organization"]
+
+        self.assertEqual(ranked("kuchen", tables), [("projects_project", project.id)])
+        self.assertEqual(
+            ranked("tortenfabirk", tables),
+            [("contacts_organization", organization.id)],
+        )
+        self.assertEqual(ranked("tortenfabrik", ["contacts_person"]), [])
+        self.assertEqual(ranked("", tables), [])
+
+        organization.delete()
+        self.assertEqual(ranked("tortenfabrik", tables), [])
+
     def test_process_query(self):
         """Specific testing of query->tsquery conversion"""
         self.assertEqual(process_query(""), "")
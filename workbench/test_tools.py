@@ -1,16 +1,36 @@
+import io
+import json
+import threading
+from contextlib import ExitStack
 from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
 
 from django import forms
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connections
 from django.db.models import ProtectedError
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from workbench import factories
+from workbench.accounts.models import User
+from workbench.audit.models import TaskRun
 from workbench.awt.models import Year  # any tools.Model()
 from workbench.contacts.models import Organization
+from workbench.contacts.urls import person_typeahead
+from workbench.management.commands.fairy_tasks import TASKS
 from workbench.projects.models import Project
+from workbench.projects.urls import project_typeahead
+from workbench.reporting.models import GreenHoursMonth
 from workbench.tools import formats
 from workbench.tools.forms import Autocomplete
 from workbench.tools.models import CalculationModel
+from workbench.tools.reporting import query
+from workbench.tools.routing import ReportingRouter, primary, read_alias, reporting
+from workbench.tools.scheduler import Task, run, select
 from workbench.tools.testing import messages
 from workbench.tools.validation import is_title_specific
 
@@ -109,3 +129,183 @@ class ToolsTest(TestCase):
         ]:
             with self.subTest(value=value, result=result):
                 self.assertEqual(formats.hours_and_minutes(value), result)
+
+    def test_typeahead(self):
+        """The typeahead index answers from memory and follows writes"""
+        person = factories.PersonFactory.create(given_name="Jürg", family_name="Müller")
+        employee = factories.PersonFactory.create(
+            given_name="Jürgen",
+            family_name="Meier",
+            organization=factories.OrganizationFactory.create(),
+        )
+        rf = RequestFactory()
+
+        results, complete = person_typeahead.search("jurg mu", request=rf.get("/"))
+        self.assertTrue(complete)
+        self.assertEqual(results, [{"label": "Jürg Müller", "value": person.pk}])
+
+        with self.assertNumQueries(1):
+            results, _complete = person_typeahead.search(
+                "jürg", request=rf.get("/?only_employees=on")
+            )
+        self.assertEqual(
+            results,
+            [{"label": employee.name_with_organization, "value": employee.pk}],
+        )
+
+        person.is_archived = True
+        person.save()
+        results, _complete = person_typeahead.search("jurg", request=rf.get("/"))
+        self.assertEqual([row["value"] for row in results], [employee.pk])
+
+    def test_typeahead_user_changes(self):
+        """Only changes of indexed columns invalidate the project index"""
+        project = factories.ProjectFactory.create()
+        user = project.owned_by
+        version = project_typeahead.version()
+
+        User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+        Project.objects.filter(pk=project.pk).update(description="Nothing")
+        self.assertEqual(project_typeahead.version(), version)
+
+        User.objects.filter(pk=user.pk).update(_short_name="xyz")
+        self.assertNotEqual(project_typeahead.version(), version)
+
+        version = project_typeahead.version()
+        Project.objects.filter(pk=project.pk).update(title="Renamed")
+        self.assertNotEqual(project_typeahead.version(), version)
+
+    def test_reporting_routing_fallback(self):
+        """Reports read from the primary when no replica is configured"""
+        router = ReportingRouter()
+        with self.settings(DATABASES={"default": settings.DATABASES["default"]}):
+            self.assertEqual(read_alias(), "default")
+            with reporting():
+                self.assertEqual(read_alias(), "default")
+                self.assertEqual(router.db_for_read(Project), "default")
+                self.assertEqual(query("SELECT 1"), [(1,)])
+        self.assertEqual(router.db_for_write(Project), "default")
+
+    def test_scheduler(self):
+        """Independent tasks run concurrently, failures only affect dependents"""
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+
+        def fail():
+            raise ZeroDivisionError
+
+        tasks = [
+            Task("a", barrier.wait),
+            Task("b", barrier.wait),
+            Task("c", lambda: order.append("c"), depends_on=["a", "b"]),
+            Task("d", fail),
+            Task("e", lambda: order.append("e"), depends_on=["d"]),
+            Task("f", lambda: order.append("f"), depends_on=["e", "x"]),
+        ]
+        with self.assertLogs("workbench.tools.scheduler", "ERROR"):
+            results = run(tasks, workers=4)
+
+        self.assertEqual(
+            {name: result["status"] for name, result in results.items()},
+            {
+                "a": "success",
+                "b": "success",
+                "c": "success",
+                "d": "failed",
+                "e": "skipped",
+                "f": "skipped",
+            },
+        )
+        self.assertIn("ZeroDivisionError", results["d"]["error"])
+        self.assertEqual(order, ["c"])
+
+        self.assertEqual(
+            [task.name for task in select(tasks, only=["c", "e"], skip=["e"])], ["c"]
+        )
+        # Dependencies which are not part of the run are satisfied
+        self.assertEqual(run(select(tasks, only=["e"]))["e"]["status"], "success")
+
+        with self.assertRaises(ValueError):
+            run([
+                Task("g", print, depends_on=["h"]),
+                Task("h", print, depends_on=["g"]),
+            ])
+
+    def test_fairy_tasks(self):
+        """fairy_tasks runs the selected tasks and records their outcome"""
+        calls = []
+
+        def fn(name):
+            def task():
+                calls.append(name)
+                if name == "autodunning":
+                    raise ZeroDivisionError
+
+            return task
+
+        with ExitStack() as stack:
+            for task in TASKS:
+                stack.enter_context(patch.object(task, "fn", fn(task.name)))
+
+            stdout = io.StringIO()
+            call_command(
+                "fairy_tasks",
+                "--only=key_data_snapshot",
+                "--only=accruals",
+                "--report=-",
+                stdout=stdout,
+            )
+            # key_data_snapshot depends on accruals
+            self.assertEqual(calls, ["accruals", "key_data_snapshot"])
+            report = json.loads(stdout.getvalue())
+            self.assertEqual(
+                {name: result["status"] for name, result in report.items()},
+                {"accruals": "success", "key_data_snapshot": "success"},
+            )
+            self.assertEqual(
+                set(TaskRun.objects.values_list("name", "status")),
+                {("accruals", "success"), ("key_data_snapshot", "success")},
+            )
+
+            calls.clear()
+            TaskRun.objects.all().delete()
+            with (
+                self.assertLogs("workbench.tools.scheduler", "ERROR"),
+                self.assertRaisesMessage(
+                    CommandError, "Tasks did not succeed: autodunning"
+                ),
+            ):
+                call_command("fairy_tasks", "--skip=exchange_rates")
+
+        self.assertEqual(set(calls), {task.name for task in TASKS} - {"exchange_rates"})
+        runs = {task_run.name: task_run for task_run in TaskRun.objects.all()}
+        self.assertEqual(set(runs), set(calls))
+        self.assertEqual(runs["autodunning"].status, TaskRun.FAILED)
+        self.assertIn("ZeroDivisionError", runs["autodunning"].error)
+
+
+@skipUnless("reporting" in settings.DATABASES, "No reporting database configured")
+class ReportingRoutingTest(TestCase):
+    databases = {"default", "reporting"}
+
+    def test_routing(self):
+        """Reads inside reporting() go to the replica, writes to the primary"""
+        router = ReportingRouter()
+        with reporting():
+            self.assertEqual(read_alias(), "reporting")
+            self.assertEqual(router.db_for_read(Project), "reporting")
+            self.assertEqual(router.db_for_read(GreenHoursMonth), "default")
+            self.assertEqual(router.db_for_write(Project), "default")
+            self.assertEqual(Project.objects.all().db, "reporting")
+            with primary():
+                self.assertEqual(read_alias(), "default")
+                self.assertEqual(router.db_for_read(Project), "default")
+            self.assertEqual(read_alias(), "reporting")
+
+            with CaptureQueriesContext(connections["reporting"]) as ctx:
+                query("SELECT 1")
+            self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.assertEqual(read_alias(), "default")
+        self.assertEqual(Project.objects.all().db, "default")
+        self.assertFalse(router.allow_migrate("reporting", "projects"))
@@ -131,15 +131,39 @@ class TimestampQuerySet(models.QuerySet):
            and/or detected.
         """
         day = day or dt.date.today()
-        entries = list(
-            self.filter(user=user, created_at__date=day).select_related(
-                "logged_hours__service__project__owned_by", "logged_break"
-            )
-        )
+        return self.slices_range(user, [day, day])[day]
+
+    def slices_range(self, user, date_range):
+        """
+        Return a ``{day: slices}`` dict for all days in ``date_range``
+
+        Timestamps, logged hours and breaks are loaded using one query each
+        and partitioned by day; slices are built exactly like in ``slices``.
+        """
+        days = {}
+        day = date_range[0]
+        while day <= date_range[1]:
+            days[day] = ([], [], [])
+            day += dt.timedelta(days=1)
+
+        for entry in self.filter(
+            user=user, created_at__date__range=date_range
+        ).select_related("logged_hours__service__project__owned_by", "logged_break"):
+            days[timezone.localdate(entry.created_at)][0].append(entry)
+        for entry in user.loggedhours.filter(
+            rendered_on__range=date_range
+        ).select_related("service__project__owned_by"):
+            days[entry.rendered_on][1].append(entry)
+        for entry in user.breaks.filter(starts_at__date__range=date_range):
+            days[timezone.localdate(entry.starts_at)][2].append(entry)
+
+        return {
+            day: self._slices(day, entries, logged_hours, breaks)
+            for day, (entries, logged_hours, breaks) in days.items()
+        }
+
+    def _slices(self, day, entries, logged_hours, breaks):
         known_logged_hours = {entry.logged_hours for entry in entries}
-        logged_hours = user.loggedhours.filter(rendered_on=day).select_related(
-            "service__project__owned_by"
-        )
         entries.extend(
             self.model(
                 created_at=entry.created_at, type=self.model.LOGBOOK, logged_hours=entry
@@ -148,7 +172,6 @@ class TimestampQuerySet(models.QuerySet):
             if entry not in known_logged_hours
         )
         known_breaks = {entry.logged_break for entry in entries}
-        breaks = user.breaks.filter(starts_at__date=day)
         entries.extend(
             self.model(
                 created_at=entry.ends_at, type=self.model.BREAK, logged_break=entry
@@ -13,6 +13,7 @@ from workbench.accounts.models import User
 from workbench.logbook.forms import DetectedTimestampForm
 from workbench.timer.models import Timestamp
 from workbench.tools.formats import local_date_format
+from workbench.tools.validation import in_days
 
 
 class TimerTest(TestCase):
@@ -388,6 +389,34 @@ class TimestampsTest(TestCase):
         self.assertEqual(len(data["timestamps"]), 1)
         self.assertEqual(data["timestamps"][0]["elapsed"], "0.1")
 
+    def test_list_timestamps_range(self):
+        """The timestamps of several days are listed in one request"""
+        hours = factories.LoggedHoursFactory.create(rendered_on=in_days(-1), hours=2)
+        user = hours.rendered_by
+        user.timestamp_set.create(type=Timestamp.STOP)
+
+        slices = Timestamp.objects.slices_range(user, [in_days(-2), in_days(0)])
+        self.assertEqual(list(slices), [in_days(-2), in_days(-1), in_days(0)])
+        self.assertEqual([len(day) for day in slices.values()], [0, 1, 1])
+        self.assertEqual(slices[in_days(0)], Timestamp.objects.slices(user))
+
+        url = f"/list-timestamps/?token={user.token}"
+        response = self.client.get(
+            f"{url}&date_from={in_days(-2).isoformat()}"
+            f"&date_until={in_days(0).isoformat()}"
+        )
+        data = response.json()
+        self.assertEqual(data["hours"], "2.0")
+        self.assertEqual([len(day["timestamps"]) for day in data["days"]], [0, 1, 1])
+
+        response = self.client.get(f"{url}&date_from={in_days(0).isoformat()}")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            f"{url}&date_from={in_days(-40).isoformat()}"
+            f"&date_until={in_days(0).isoformat()}"
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_post_split(self):
         """Backwards compatibility: Type "split" still works"""
         self.client.force_login(factories.UserFactory.create())
@@ -92,6 +92,21 @@ class TokenUserForm(TokenUserMixin, Form):
     pass
 
 
+class ListTimestampsForm(TokenUserForm):
+    date_from = forms.DateField(required=False)
+    date_until = forms.DateField(required=False)
+
+    def clean(self):
+        data = super().clean()
+        if bool(data.get("date_from")) != bool(data.get("date_until")):
+            raise forms.ValidationError("Provide both date_from and date_until")
+        if data.get("date_from") and not (
+            0 <= (data["date_until"] - data["date_from"]).days < 31
+        ):
+            raise forms.ValidationError("Invalid date range")
+        return data
+
+
 class SplitTimestampForm(Form):
     parts = forms.IntegerField(label=_("Number of parts"), min_value=2)
 
@@ -116,24 +131,16 @@ class SplitTimestampForm(Form):
         return [base] * (parts - 1) + [base + remainder]
 
 
-@decorator_from_middleware(CorsMiddleware)
-@require_GET
-def list_timestamps(request):
-    form = TokenUserForm(request.GET, request=request)
-    if not form.is_valid():
-        return JsonResponse({"errors": form.errors.as_json()}, status=400)
-
-    user = form.cleaned_data["user"]
-    slices = Timestamp.objects.slices(user)
-    daily_hours = sum(
-        (slice["logged_hours"].hours for slice in slices if slice.get("logged_hours")),
-        Z1,
-    )
-
-    return JsonResponse({
-        "success": True,
-        "user": str(user),
-        "hours": daily_hours,
+def _serialize_slices(slices):
+    return {
+        "hours": sum(
+            (
+                slice["logged_hours"].hours
+                for slice in slices
+                if slice.get("logged_hours")
+            ),
+            Z1,
+        ),
         "timestamps": [
             {
                 "timestamp": "{:>5} - {:>5} {:^7} {}".format(
@@ -151,6 +158,35 @@ def list_timestamps(request):
             }
             for slice in slices
         ],
+    }
+
+
+@decorator_from_middleware(CorsMiddleware)
+@require_GET
+def list_timestamps(request):
+    form = ListTimestampsForm(request.GET, request=request)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.as_json()}, status=400)
+
+    user = form.cleaned_data["user"]
+    if not form.cleaned_data.get("date_from"):
+        return JsonResponse({
+            "success": True,
+            "user": str(user),
+            **_serialize_slices(Timestamp.objects.slices(user)),
+        })
+
+    days = [
+        {"day": day, **_serialize_slices(slices)}
+        for day, slices in Timestamp.objects.slices_range(
+            user, [form.cleaned_data["date_from"], form.cleaned_data["date_until"]]
+        ).items()
+    ]
+    return JsonResponse({
+        "success": True,
+        "user": str(user),
+        "hours": sum((day["hours"] for day in days), Z1),
+        "days": days,
     })
 
 
@@ -31,6 +31,9 @@ CREATE EXTENSION IF NOT EXISTS hstore;
 -- you're interested in, into a temporary table where you CREATE any useful
 -- indexes and do your analysis.
 --
+-- The table is converted into a table partitioned by retention class and month
+-- by the audit.0007_partitioned_logged_actions migration.
+--
 CREATE TABLE IF NOT EXISTS audit_logged_actions (
     event_id bigserial primary key,
     table_name text not null,
@@ -38,10 +41,16 @@ CREATE TABLE IF NOT EXISTS audit_logged_actions (
     created_at TIMESTAMP WITH TIME ZONE NOT NULL,
     action TEXT NOT NULL CHECK (action IN ('I','D','U', 'T')),
     row_data hstore,
-    changed_fields hstore
+    changed_fields hstore,
+    row_id bigint
 );
 
+-- The primary key of the audited row, if it has a numeric "id" column. Allows
+-- loading the history of a single row without scanning the hstore columns.
+ALTER TABLE audit_logged_actions ADD COLUMN IF NOT EXISTS row_id bigint;
+
 CREATE INDEX IF NOT EXISTS logged_actions_relid_idx ON audit_logged_actions(table_name);
+CREATE INDEX IF NOT EXISTS logged_actions_row_id_idx ON audit_logged_actions(table_name, row_id);
 CREATE INDEX IF NOT EXISTS logged_actions_action_tstamp_tx_stm_idx ON audit_logged_actions(created_at);
 CREATE INDEX IF NOT EXISTS logged_actions_action_idx ON audit_logged_actions(action);
 
@@ -61,10 +70,15 @@ BEGIN
     audit_row = ROW(
         nextval('audit_logged_actions_event_id_seq'), -- event_id
         TG_TABLE_NAME::text,                          -- table_name
-        current_setting('application_name'),
+        -- user_name; see workbench.accounts.middleware.set_user_name
+        coalesce(
+            nullif(current_setting('workbench.user_name', true), ''),
+            current_setting('application_name')
+        ),
         current_timestamp,                            -- action_tstamp_tx
         substring(TG_OP,1,1),                         -- action
-        NULL, NULL                                    -- row_data, changed_fields
+        NULL, NULL,                                   -- row_data, changed_fields
+        NULL                                          -- row_id
         );
 
     IF TG_ARGV[0] IS NOT NULL THEN
@@ -87,6 +101,9 @@ BEGIN
         RAISE EXCEPTION '[audit_if_modified_func] - Trigger func added as trigger for unhandled case: %, %',TG_OP, TG_LEVEL;
         RETURN NULL;
     END IF;
+    IF (audit_row.row_data -> 'id') ~ '^[0-9]+$' THEN
+        audit_row.row_id = (audit_row.row_data -> 'id')::bigint;
+    END IF;
     INSERT INTO audit_logged_actions VALUES (audit_row.*);
     RETURN NULL;
 END;
@@ -119,9 +136,8 @@ There is no parameter to disable logging of values. Add this trigger as
 a 'FOR EACH STATEMENT' rather than 'FOR EACH ROW' trigger if you do not
 want to log row values.
 
-Note that the user name logged is the login role for the session. The audit trigger
-cannot obtain the active role because it is reset by the SECURITY DEFINER invocation
-of the audit trigger its self.
+Note that the user name logged is the transaction-local workbench.user_name
+setting, falling back to the application_name of the session.
 $body$;
 
 
@@ -0,0 +1,167 @@
+import base64
+import binascii
+import datetime as dt
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connections, models
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """
+    Return the query planner's estimate of the number of rows instead of
+    running a ``COUNT(*)`` over the queryset
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+def keyset_ordering(queryset):
+    """
+    Return the ordering of the queryset with the primary key appended as a
+    tie breaker, or ``None`` if the ordering cannot be used for seeking
+    """
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not ordering or not all(isinstance(field, str) for field in ordering):
+        return None
+    if any(field.lstrip("-") == "?" for field in ordering):
+        return None
+    if not {"pk", "id"} & {field.lstrip("-") for field in ordering}:
+        ordering.append("-pk" if ordering[-1].startswith("-") else "pk")
+    return ordering
+
+
+def _default(value):
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {value!r}")
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(
+        json.dumps(values, default=_default).encode()
+    ).decode()
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise Http404 from exc
+    if not isinstance(values, list) or len(values) != length:
+        raise Http404
+    return values
+
+
+def _seek(ordering, values, *, backwards):
+    """
+    Build the condition selecting all rows after (or before, if ``backwards``)
+    the row with the given ordering values
+    """
+    q = Q()
+    for idx, field in enumerate(ordering):
+        lookup = "lt" if field.startswith("-") != backwards else "gt"
+        condition = Q(**{f"{field.lstrip('-')}__{lookup}": values[idx]})
+        for previous, value in zip(ordering[:idx], values, strict=False):
+            condition &= Q(**{previous.lstrip("-"): value})
+        q |= condition
+    return q
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, *, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.cursor(self.object_list[0])
+        return ""
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.cursor(self.object_list[-1])
+        return ""
+
+
+class KeysetPaginator:
+    """
+    Paginate by seeking past the last row of the previous page instead of
+    using ``OFFSET``
+
+    The queryset has to be ordered by plain, non-nullable fields; the primary
+    key is added as a tie breaker automatically.
+    """
+
+    def __init__(self, queryset, per_page, *, ordering, estimated_count=False):
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+        self.estimated_count = estimated_count
+
+    @cached_property
+    def count(self):
+        if self.estimated_count:
+            return estimated_count(self.queryset)
+        return self.queryset.count()
+
+    def cursor(self, instance):
+        values = []
+        for field in self.ordering:
+            value = instance
+            for part in field.lstrip("-").split("__"):
+                value = getattr(value, part)
+            values.append(value.pk if isinstance(value, models.Model) else value)
+        return encode_cursor(values)
+
+    def page(self, *, after=None, before=None):
+        queryset = self.queryset
+        if before or after:
+            values = decode_cursor(before or after, len(self.ordering))
+            try:
+                queryset = queryset.filter(
+                    _seek(self.ordering, values, backwards=bool(before))
+                )
+            except (ValidationError, ValueError, TypeError) as exc:
+                raise Http404 from exc
+            if before:
+                queryset = queryset.reverse()
+
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if before:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_previous=has_more, has_next=True)
+        return KeysetPage(
+            object_list, self, has_previous=bool(after), has_next=has_more
+        )
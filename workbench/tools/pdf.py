@@ -1,8 +1,14 @@
 import datetime as dt
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 from decimal import Decimal as D
+from functools import cache
 
+import django
 from django.conf import settings
+from django.db import connections
 from django.utils.text import Truncator, capfirst
 from django.utils.translation import activate, gettext as _
 from pdfdocument.document import (
@@ -44,6 +50,114 @@ def style(base, **kwargs):
     return style
 
 
+@cache
+def compiled_style(font_name, font_size):
+    """
+    Build the style sheet and page bounds of documents once per process
+    instead of deep copying the ReportLab styles for every document
+    """
+    sheet = Empty()
+    sheet.fontName = font_name
+    sheet.fontSize = font_size
+
+    sheet.normal = style(
+        getSampleStyleSheet()["Normal"],
+        fontName="Rep",
+        fontSize=sheet.fontSize,
+        firstLineIndent=0,
+    )
+    sheet.normalWithExtraLeading = style(
+        sheet.normal,
+        leading=1.75 * sheet.fontSize,
+    )
+    sheet.heading1 = style(
+        sheet.normal,
+        fontName="Rep-Bold",
+        fontSize=1.25 * sheet.fontSize,
+        leading=1.25 * sheet.fontSize,
+    )
+    sheet.heading2 = style(
+        sheet.normal,
+        fontName="Rep-Bold",
+        fontSize=1.15 * sheet.fontSize,
+        leading=1.15 * sheet.fontSize,
+    )
+    sheet.heading3 = style(
+        sheet.normal,
+        fontName="Rep-Bold",
+        fontSize=1.1 * sheet.fontSize,
+        leading=1.2 * sheet.fontSize,
+    )
+
+    sheet.right = style(sheet.normal, alignment=TA_RIGHT)
+
+    sheet.small = style(sheet.normal, fontSize=sheet.fontSize * 0.9)
+    sheet.smaller = style(sheet.normal, fontSize=sheet.fontSize * 0.75)
+    sheet.bold = style(sheet.normal, fontName="Rep-Bold")
+    sheet.paragraph = style(sheet.normal, spaceBefore=1, spaceAfter=1)
+    sheet.table = (
+        ("FONT", (0, 0), (-1, -1), "Rep", sheet.fontSize),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ("FIRSTLINEINDENT", (0, 0), (-1, -1), 0),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    )
+    sheet.tableServices = (
+        *sheet.table,
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+    )
+    sheet.tableAgreement = (
+        *sheet.table,
+        ("TOPPADDING", (0, 0), (-1, -1), 5 * mm),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 2 * mm),
+        ("LINEBELOW", (2, 0), (2, -2), 0.2, colors.black),
+        ("LINEBELOW", (4, 0), (4, -2), 0.2, colors.black),
+    )
+
+    sheet.tableHeadLine = (
+        *sheet.table,
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("RIGHTPADDING", (0, 0), (0, -1), 2 * mm),
+        ("LINEABOVE", (0, 0), (-1, 0), 0.2, colors.black),
+        ("LINEBELOW", (0, 0), (-1, 0), 0.2, colors.black),
+        ("FONT", (0, 0), (-1, 0), "Rep-Bold", sheet.fontSize),
+        ("TOPPADDING", (0, 0), (-1, 0), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 2),
+    )
+
+    sheet.tableHead = (
+        *sheet.tableHeadLine,
+        ("TOPPADDING", (0, 1), (-1, 1), 1),
+    )
+
+    bounds = Empty()
+    bounds.N = 275 * mm
+    bounds.E = 190 * mm
+    bounds.S = 18 * mm
+    bounds.W = 20 * mm
+    bounds.outsideN = bounds.N + 5 * mm
+    bounds.outsideS = bounds.S - 5 * mm
+    sheet.tableColumns = (bounds.E - bounds.W - 32 * mm, 32 * mm)
+    sheet.tableColumnsLeft = list(reversed(sheet.tableColumns))
+    sheet.tableThreeColumns = (
+        bounds.E - bounds.W - 32 * mm,
+        16 * mm,
+        16 * mm,
+    )
+    sheet.tableAgreementColumns = (
+        3 * cm,
+        0.5 * cm,
+        6 * cm,
+        0.5 * cm,
+        6 * cm,
+        bounds.E - bounds.W - 16 * cm,
+    )
+    return sheet, bounds
+
+
 class PDFDocument(_PDFDocument):
     def __init__(self, *args, **kwargs):
         kwargs.setdefault("font_name", "Rep")
@@ -51,107 +165,7 @@ class PDFDocument(_PDFDocument):
         super().__init__(*args, **kwargs)
 
     def generate_style(self, *args, **kwargs):
-        self.style = Empty()
-        self.style.fontName = self.font_name
-        self.style.fontSize = self.font_size
-
-        self.style.normal = style(
-            getSampleStyleSheet()["Normal"],
-            fontName="Rep",
-            fontSize=self.style.fontSize,
-            firstLineIndent=0,
-        )
-        self.style.normalWithExtraLeading = style(
-            self.style.normal,
-            leading=1.75 * self.style.fontSize,
-        )
-        self.style.heading1 = style(
-            self.style.normal,
-            fontName="Rep-Bold",
-            fontSize=1.25 * self.style.fontSize,
-            leading=1.25 * self.style.fontSize,
-        )
-        self.style.heading2 = style(
-            self.style.normal,
-            fontName="Rep-Bold",
-            fontSize=1.15 * self.style.fontSize,
-            leading=1.15 * self.style.fontSize,
-        )
-        self.style.heading3 = style(
-            self.style.normal,
-            fontName="Rep-Bold",
-            fontSize=1.1 * self.style.fontSize,
-            leading=1.2 * self.style.fontSize,
-        )
-
-        self.style.right = style(self.style.normal, alignment=TA_RIGHT)
-
-        self.style.small = style(self.style.normal, fontSize=self.style.fontSize * 0.9)
-        self.style.smaller = style(
-            self.style.normal, fontSize=self.style.fontSize * 0.75
-        )
-        self.style.bold = style(self.style.normal, fontName="Rep-Bold")
-        self.style.paragraph = style(self.style.normal, spaceBefore=1, spaceAfter=1)
-        self.style.table = (
-            ("FONT", (0, 0), (-1, -1), "Rep", self.style.fontSize),
-            ("TOPPADDING", (0, 0), (-1, -1), 0),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
-            ("LEFTPADDING", (0, 0), (-1, -1), 0),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-            ("FIRSTLINEINDENT", (0, 0), (-1, -1), 0),
-            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        )
-        self.style.tableServices = (
-            *self.style.table,
-            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-        )
-        self.style.tableAgreement = (
-            *self.style.table,
-            ("TOPPADDING", (0, 0), (-1, -1), 5 * mm),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 2 * mm),
-            ("LINEBELOW", (2, 0), (2, -2), 0.2, colors.black),
-            ("LINEBELOW", (4, 0), (4, -2), 0.2, colors.black),
-        )
-
-        self.style.tableHeadLine = (
-            *self.style.table,
-            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-            ("RIGHTPADDING", (0, 0), (0, -1), 2 * mm),
-            ("LINEABOVE", (0, 0), (-1, 0), 0.2, colors.black),
-            ("LINEBELOW", (0, 0), (-1, 0), 0.2, colors.black),
-            ("FONT", (0, 0), (-1, 0), "Rep-Bold", self.style.fontSize),
-            ("TOPPADDING", (0, 0), (-1, 0), 1),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 2),
-        )
-
-        self.style.tableHead = (
-            *self.style.tableHeadLine,
-            ("TOPPADDING", (0, 1), (-1, 1), 1),
-        )
-
-        self.bounds = Empty()
-        self.bounds.N = 275 * mm
-        self.bounds.E = 190 * mm
-        self.bounds.S = 18 * mm
-        self.bounds.W = 20 * mm
-        self.bounds.outsideN = self.bounds.N + 5 * mm
-        self.bounds.outsideS = self.bounds.S - 5 * mm
-        self.style.tableColumns = (self.bounds.E - self.bounds.W - 32 * mm, 32 * mm)
-        self.style.tableColumnsLeft = list(reversed(self.style.tableColumns))
-        self.style.tableThreeColumns = (
-            self.bounds.E - self.bounds.W - 32 * mm,
-            16 * mm,
-            16 * mm,
-        )
-        self.style.tableAgreementColumns = (
-            3 * cm,
-            0.5 * cm,
-            6 * cm,
-            0.5 * cm,
-            6 * cm,
-            self.bounds.E - self.bounds.W - 16 * cm,
-        )
+        self.style, self.bounds = compiled_style(self.font_name, self.font_size)
 
         frame_kwargs = {
             "showBoundary": self.show_boundaries,
@@ -761,6 +775,75 @@ def pdf_response(*args, **kwargs):
     return _pdf_response(*args, **kwargs)
 
 
+def invoice_pdf(invoice, *, qr=True):
+    with io.BytesIO() as buf:
+        pdf = PDFDocument(buf)
+        pdf.init_invoice_letter()
+        pdf.process_invoice(invoice, qr=qr)
+        try:
+            pdf.generate()
+        except Exception:
+            print(f"Error while processing invoice {invoice} (ID {invoice.id})")
+            raise
+        return buf.getvalue()
+
+
+def _render_invoices(ids, *, qr, language):
+    activate(language)
+    return [
+        (invoice.id, invoice_pdf(invoice, qr=qr))
+        for invoice in Invoice.objects.filter(id__in=ids).select_related(
+            "project", "owned_by"
+        )
+    ]
+
+
+def _setup_worker(database):
+    # Use the database of the parent process, e.g. the test database
+    settings.DATABASES["default"]["NAME"] = database
+    django.setup()
+
+
+def render_invoices(invoices, *, qr=True, workers=1, chunk_size=20):
+    """
+    Yield ``(invoice, pdf_bytes)`` tuples in the order the PDFs are finished
+
+    By default invoices are rendered in the current process. With more than
+    one worker rendering is distributed over a pool of worker processes which
+    load the invoices themselves and keep their compiled styles and fonts
+    between documents. The pool spawns fresh Python interpreters and should
+    only be used from management commands, not from inside the application
+    server.
+    """
+    invoices = {invoice.id: invoice for invoice in invoices}
+    language = settings.WORKBENCH.PDF_LANGUAGE
+
+    if workers == 1 or len(invoices) <= chunk_size:
+        activate(language)
+        for invoice in invoices.values():
+            yield invoice, invoice_pdf(invoice, qr=qr)
+        return
+
+    ids = list(invoices)
+    # Spawn fresh interpreters instead of forking so that workers do not
+    # inherit the database connections of this process.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_setup_worker,
+        initargs=(connections["default"].settings_dict["NAME"],),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _render_invoices, ids[i : i + chunk_size], qr=qr, language=language
+            )
+            for i in range(0, len(ids), chunk_size)
+        ]
+        for future in as_completed(futures):
+            for id, pdf in future.result():
+                yield invoices[id], pdf
+
+
 def get_debtor_address(postal_address):
     address_lines = postal_address.splitlines()
     country = "CH"
@@ -1,8 +1,10 @@
 from django.db import connections
 
+from workbench.tools.routing import read_alias
 
-def query(sql, params=(), *, as_dict=False):
-    with connections["default"].cursor() as cursor:
+
+def query(sql, params=(), *, as_dict=False, using=None):
+    with connections[using or read_alias()].cursor() as cursor:
         cursor.execute(sql, params)
         if as_dict:
             names = [col.name for col in cursor.description]
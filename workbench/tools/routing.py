@@ -0,0 +1,76 @@
+"""
+Read replica routing for reports
+
+Code running inside ``with reporting():`` (or decorated with
+``@reporting()``) reads from the ``reporting`` database alias if one is
+configured (see ``REPORTING_DATABASE_URL``) and from ``default`` otherwise.
+Writes always go to ``default``.
+
+Rollups which reports refresh and read back in the same request are always
+read from ``default``, the replica would not see the refreshed rows yet. Code
+refreshing rollups runs inside ``with primary():`` so that the rows written
+back are computed from current data and not from a lagging replica.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPORTING = "reporting"
+
+PRIMARY_MODELS = {
+    "awt.annualworkingtimemonth",
+    "projects.projectstatistics",
+    "reporting.greenhoursmonth",
+    "reporting.keydatasnapshot",
+}
+
+_reporting = ContextVar("reporting", default=False)
+
+
+@contextmanager
+def reporting():
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+@contextmanager
+def primary():
+    token = _reporting.set(False)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+def read_alias():
+    """
+    Return the database alias reads in the current context should use
+    """
+    return (
+        REPORTING
+        if _reporting.get() and REPORTING in settings.DATABASES
+        else DEFAULT_DB_ALIAS
+    )
+
+
+class ReportingRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,118 @@
+"""
+Small task scheduler for the nightly fairy tasks
+
+Tasks declare the names of the tasks they depend on. All tasks whose
+dependencies have finished run concurrently in a thread pool. A failing task
+is logged and recorded, tasks depending on it are skipped and all other tasks
+keep running. Dependencies which are not part of the run (e.g. because of
+``--only``) are considered satisfied.
+"""
+
+import logging
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Task:
+    def __init__(self, name, fn, *, depends_on=()):
+        self.name = name
+        self.fn = fn
+        self.depends_on = tuple(depends_on)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+
+def select(tasks, *, only=None, skip=None):
+    return [
+        task
+        for task in tasks
+        if (not only or task.name in only) and not (skip and task.name in skip)
+    ]
+
+
+def _check_cycles(dependencies):
+    done = set()
+    while remaining := [name for name in dependencies if name not in done]:
+        ready = [name for name in remaining if dependencies[name] <= done]
+        if not ready:
+            raise ValueError(f"Cyclic task dependencies: {', '.join(remaining)}")
+        done.update(ready)
+
+
+def _execute(task, setup):
+    started_at = timezone.now()
+    start = time.perf_counter()
+    status, error = SUCCESS, ""
+    try:
+        if setup:
+            setup()
+        task.fn()
+    except Exception:
+        logger.exception("Task %s failed", task.name)
+        status, error = FAILED, traceback.format_exc()
+    finally:
+        # Worker threads have their own connections, do not leak them
+        connections.close_all()
+    return {
+        "status": status,
+        "started_at": started_at,
+        "duration": round((time.perf_counter() - start) * 1000, 3),
+        "error": error,
+    }
+
+
+def run(tasks, *, workers=4, setup=None):
+    """
+    Run ``tasks`` and return a dict of results keyed by task name
+
+    ``setup`` is called in the worker thread before each task, e.g. to
+    activate a language; thread and context local state is not inherited
+    from the calling thread.
+    """
+    names = {task.name for task in tasks}
+    dependencies = {
+        task.name: {name for name in task.depends_on if name in names} for task in tasks
+    }
+    _check_cycles(dependencies)
+
+    pending = {task.name: task for task in tasks}
+    results = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            for name in [n for n in pending if dependencies[n] <= results.keys()]:
+                task = pending.pop(name)
+                if failed := sorted(
+                    dependency
+                    for dependency in dependencies[name]
+                    if results[dependency]["status"] != SUCCESS
+                ):
+                    results[name] = {
+                        "status": SKIPPED,
+                        "started_at": None,
+                        "duration": None,
+                        "error": f"Dependencies did not succeed: {', '.join(failed)}",
+                    }
+                    continue
+                running[executor.submit(_execute, task, setup)] = name
+
+            if not running:
+                # Skipping tasks may have made other tasks ready
+                continue
+            done, _not_done = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return {task.name: results[task.name] for task in tasks}
@@ -26,6 +26,8 @@ look like this::
 
 import re
 
+from workbench.tools.reporting import query
+
 
 def drop_old_fts(table):
     return f"""\
@@ -46,7 +48,68 @@ CREATE INDEX {table}_fts_index ON {table} USING gin(fts_document);
 """
 
 
-def fts(table, fields):
+def create_index():
+    """
+    Create the ``search_index`` table which contains a row per searchable
+    object of all tables using ``fts(..., index=True)``
+    """
+    return """\
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS search_index (
+  table_name text NOT NULL,
+  row_id integer NOT NULL,
+  fts_document tsvector,
+  title text NOT NULL,
+  PRIMARY KEY (table_name, row_id)
+);
+CREATE INDEX IF NOT EXISTS search_index_fts_index
+  ON search_index USING gin(fts_document);
+CREATE INDEX IF NOT EXISTS search_index_title_index
+  ON search_index USING gin(title gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION search_index_delete() RETURNS trigger AS $$
+begin
+  DELETE FROM search_index WHERE table_name=TG_TABLE_NAME AND row_id=old.id;
+  return old;
+end
+$$ LANGUAGE plpgsql;
+"""
+
+
+def fts(table, fields, *, index=False, title=None):
+    """
+    Maintain the ``fts_document`` column of ``table``
+
+    With ``index=True`` the document is also copied into the ``search_index``
+    table together with the unaccented ``title`` fields (defaults to the first
+    field) for similarity matching.
+    """
+    index_sql = (
+        """\
+  INSERT INTO search_index (table_name, row_id, fts_document, title)
+  VALUES (
+    TG_TABLE_NAME,
+    new.id,
+    new.fts_document,
+    unaccent(concat_ws(' ', {title}))
+  )
+  ON CONFLICT (table_name, row_id) DO UPDATE SET
+    fts_document=EXCLUDED.fts_document,
+    title=EXCLUDED.title;
+""".format(title=", ".join(f"new.{field}" for field in title or fields[:1]))
+        if index
+        else ""
+    )
+    delete_sql = (
+        f"""
+DROP TRIGGER IF EXISTS {table}_fts_delete_trigger ON {table};
+CREATE TRIGGER {table}_fts_delete_trigger AFTER DELETE
+  ON {table} FOR EACH ROW EXECUTE PROCEDURE search_index_delete();
+"""
+        if index
+        else ""
+    )
     return """\
 CREATE OR REPLACE FUNCTION {table}_fts() RETURNS trigger AS $$
 begin
@@ -59,14 +122,19 @@ begin
       'g'
     )
   );
-  return new;
+{index_sql}  return new;
 end
 $$ LANGUAGE plpgsql;
 
 DROP TRIGGER IF EXISTS {table}_fts_trigger ON {table};
 CREATE TRIGGER {table}_fts_trigger BEFORE INSERT OR UPDATE
   ON {table} FOR EACH ROW EXECUTE PROCEDURE {table}_fts();
-""".format(table=table, fields=", ".join(f"new.{field}" for field in fields))
+{delete_sql}""".format(
+        table=table,
+        fields=", ".join(f"new.{field}" for field in fields),
+        index_sql=index_sql,
+        delete_sql=delete_sql,
+    )
 
 
 def process_query(s):
@@ -99,3 +167,43 @@ def search(queryset, terms):
         if terms
         else queryset
     )
+
+
+def ranked(terms, tables, *, limit=100):
+    """
+    Return ``(table_name, row_id)`` tuples from the search index, best matches
+    first
+
+    Rows match if their document matches the full text query or if their title
+    is similar to the search terms, so that typos still find something. At
+    most ``limit`` rows are returned per table.
+    """
+    if not (tsquery := process_query(terms)):
+        return []
+    return query(
+        """
+WITH hits AS (
+    SELECT
+        table_name,
+        row_id,
+        ts_rank(fts_document, q) + word_similarity(unaccent(%s), title) AS rank
+    FROM search_index, to_tsquery('pg_catalog.german', unaccent(%s)) AS q
+    WHERE
+        table_name=ANY(%s)
+        AND (fts_document @@ q OR unaccent(%s) <%% title)
+),
+numbered AS (
+    SELECT
+        table_name,
+        row_id,
+        rank,
+        row_number() OVER (PARTITION BY table_name ORDER BY rank DESC) AS position
+    FROM hits
+)
+SELECT table_name, row_id
+FROM numbered
+WHERE position <= %s
+ORDER BY rank DESC, table_name, row_id
+        """,
+        [terms, tsquery, list(tables), terms, limit],
+    )
@@ -0,0 +1,222 @@
+"""
+In-memory typeahead indexes
+
+Autocomplete requests for the objects picked most often (open projects,
+active organizations and people) are answered from a per-process prefix
+index instead of running a full text query and instantiating model objects
+on every keystroke.
+
+Triggers record a version per table in the ``typeahead_version`` table;
+indexes compare the versions of the tables they depend on with a single cheap
+query per search and rebuild themselves when something changed. Versions are
+drawn from a sequence and are therefore never reused, even when transactions
+are rolled back.
+
+An example migration::
+
+    from django.db import migrations
+    from workbench.tools import typeahead
+
+    class Migration(migrations.Migration):
+        operations = [
+            migrations.RunSQL(typeahead.create_structure()),
+            migrations.RunSQL(typeahead.track("database_table")),
+            # Only updates of the given columns change the version
+            migrations.RunSQL(typeahead.track("other_table", columns=["name"])),
+        ]
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from contextlib import suppress
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from workbench.tools.reporting import query
+
+
+PREFIX_LENGTH = 8
+
+_indexes = []
+
+
+def create_structure():
+    return """\
+CREATE SEQUENCE IF NOT EXISTS typeahead_version_seq;
+
+CREATE TABLE IF NOT EXISTS typeahead_version (
+  table_name text PRIMARY KEY,
+  version bigint NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION typeahead_version_bump() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO typeahead_version (table_name, version)
+  VALUES (TG_TABLE_NAME, nextval('typeahead_version_seq'))
+  ON CONFLICT (table_name) DO UPDATE SET version=EXCLUDED.version;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def track(table, *, columns=None):
+    sql = f"""\
+DROP TRIGGER IF EXISTS {table}_typeahead_trigger ON {table};
+DROP TRIGGER IF EXISTS {table}_typeahead_update ON {table};
+"""
+    if not columns:
+        return f"""{sql}\
+CREATE TRIGGER {table}_typeahead_trigger AFTER INSERT OR UPDATE OR DELETE
+  ON {table} FOR EACH STATEMENT EXECUTE PROCEDURE typeahead_version_bump();
+"""
+    changed = " OR ".join(
+        f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in columns
+    )
+    return f"""{sql}\
+CREATE TRIGGER {table}_typeahead_trigger AFTER INSERT OR DELETE
+  ON {table} FOR EACH STATEMENT EXECUTE PROCEDURE typeahead_version_bump();
+CREATE TRIGGER {table}_typeahead_update AFTER UPDATE
+  ON {table} FOR EACH ROW WHEN ({changed})
+  EXECUTE PROCEDURE typeahead_version_bump();
+"""
+
+
+def terms(s):
+    """
+    Split ``s`` into lowercased words without accents
+    """
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return re.findall(r"[+@\w]+", s.lower())
+
+
+class Typeahead:
+    """
+    Prefix index of the labels of ``get_queryset()``
+
+    ``text_from_instance`` returns additional searchable text,
+    ``tags_from_instance`` a set of tags which may be required by
+    ``filter(request)``. ``filter`` returns the set of required tags or
+    ``None`` if the index does not cover the objects the request asks for,
+    in which case the caller has to complement the results.
+    """
+
+    def __init__(
+        self,
+        get_queryset,
+        *,
+        tables,
+        label_from_instance=str,
+        text_from_instance=None,
+        tags_from_instance=None,
+        filter=None,
+    ):
+        self.get_queryset = get_queryset
+        self.tables = sorted(tables)
+        self.label_from_instance = label_from_instance
+        self.text_from_instance = text_from_instance
+        self.tags_from_instance = tags_from_instance
+        self.filter = filter
+        self._lock = threading.Lock()
+        self._index = (None, [], {})
+        _indexes.append(self)
+
+    def version(self):
+        return tuple(
+            query(
+                "SELECT table_name, version FROM typeahead_version"
+                " WHERE table_name=ANY(%s) ORDER BY table_name",
+                [self.tables],
+            )
+        )
+
+    def refresh(self):
+        version = self.version()
+        if self._index[0] == version:
+            return self._index
+        with self._lock:
+            if self._index[0] != version:
+                self._index = self._build(version)
+        return self._index
+
+    def _build(self, version):
+        entries = []
+        prefixes = defaultdict(set)
+        for instance in self.get_queryset():
+            label = self.label_from_instance(instance)
+            label_terms = terms(label)
+            words = set(label_terms)
+            if self.text_from_instance:
+                words.update(terms(self.text_from_instance(instance)))
+            tags = (
+                frozenset(self.tags_from_instance(instance))
+                if self.tags_from_instance
+                else frozenset()
+            )
+            for word in words:
+                for length in range(1, min(len(word), PREFIX_LENGTH) + 1):
+                    prefixes[word[:length]].add(len(entries))
+            entries.append((
+                instance.pk,
+                label,
+                label_terms[0] if label_terms else "",
+                frozenset(words),
+                tags,
+            ))
+        return (version, entries, dict(prefixes))
+
+    def search(self, q, *, request, limit=50):
+        """
+        Return ``(results, complete)``
+
+        ``results`` is a list of ``{"label", "value"}`` dicts, best matches
+        first. ``complete`` is ``False`` if the index does not cover all
+        objects the request is interested in.
+        """
+        required = self.filter(request) if self.filter else frozenset()
+        if not (query_terms := terms(q)):
+            return [], required is not None
+
+        _version, entries, prefixes = self.refresh()
+        candidates = None
+        for term in query_terms:
+            ids = prefixes.get(term[:PREFIX_LENGTH], set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return [], required is not None
+
+        ranked = []
+        for idx in candidates:
+            pk, label, first, words, tags = entries[idx]
+            if required and not required <= tags:
+                continue
+            if not all(any(w.startswith(t) for w in words) for t in query_terms):
+                continue
+            ranked.append((
+                -sum(term in words for term in query_terms),
+                not first.startswith(query_terms[0]),
+                len(label),
+                label,
+                pk,
+            ))
+        ranked.sort()
+        return (
+            [{"label": row[3], "value": row[4]} for row in ranked[:limit]],
+            required is not None,
+        )
+
+
+def warm():
+    """
+    Build all indexes; called when the application server starts
+    """
+    get_resolver().url_patterns  # noqa: B018 Import all URLconfs
+    for index in _indexes:
+        with suppress(DatabaseError):
+            index.refresh()
+    # Do not hand the connections used for warming to the forked workers
+    connections.close_all()
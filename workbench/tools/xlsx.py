@@ -5,34 +5,40 @@ from django.utils.text import capfirst, slugify
 from django.utils.translation import gettext as _
 from xlsxdocument import XLSXDocument
 
+from workbench.accounts.models import User
 from workbench.contacts.models import PostalAddress
+from workbench.invoices.models import Service as InvoiceService
+from workbench.logbook.models import LoggedHours
+from workbench.projects.models import Service
 from workbench.templatetags.workbench import label
 from workbench.tools.formats import Z1
 
 
 class WorkbenchXLSXDocument(XLSXDocument):
     def logged_hours(self, queryset):
-        queryset = queryset.select_related(
-            "created_by",
-            "rendered_by",
-            "service__project__owned_by",
-            "invoice_service__invoice__owned_by",
-            "invoice_service__invoice__project",
-        )
-
-        self.table_from_queryset(
-            queryset,
-            additional=[
-                (capfirst(_("hourly rate")), lambda hours: hours.service.effort_rate),
-                (capfirst(_("project")), lambda hours: hours.service.project),
-                (
-                    capfirst(_("invoice")),
-                    lambda hours: (
-                        hours.invoice_service.invoice if hours.invoice_service else None
-                    ),
-                ),
-            ],
-        )
+        # Rows are read as tuples in chunks of primary keys (server-side
+        # cursors are disabled) and the pivot tables are built in the same
+        # pass; related objects are loaded once.
+        services = {
+            service.id: service
+            for service in Service.objects.filter(
+                id__in=queryset.order_by().values("service")
+            ).select_related("project__owned_by")
+        }
+        users = {user.id: user for user in User.objects.all()}
+        invoice_services = {
+            service.id: service
+            for service in InvoiceService.objects.filter(
+                id__in=queryset.order_by().values("invoice_service")
+            ).select_related("invoice__owned_by", "invoice__project")
+        }
+        related = {
+            "service": services,
+            "created_by": users,
+            "rendered_by": users,
+            "invoice_service": invoice_services,
+        }
+        fields = LoggedHours._meta.fields
 
         by_service_and_user = defaultdict(lambda: defaultdict(lambda: Z1))
         by_user = defaultdict(lambda: Z1)
@@ -40,14 +46,56 @@ class WorkbenchXLSXDocument(XLSXDocument):
         by_user_and_month = defaultdict(lambda: defaultdict(lambda: Z1))
         by_month = defaultdict(lambda: Z1)
 
-        for h in queryset:
-            by_service_and_user[h.service][h.rendered_by] += h.hours
-            by_user[h.rendered_by] += h.hours
+        def chunks(size=2000):
+            ids = list(queryset.values_list("id", flat=True))
+            for offset in range(0, len(ids), size):
+                chunk = ids[offset : offset + size]
+                by_id = {
+                    values[0]: values
+                    for values in LoggedHours.objects
+                    .filter(id__in=chunk)
+                    .order_by()
+                    .values_list("id", *(field.attname for field in fields))
+                }
+                for pk in chunk:
+                    yield by_id[pk][1:]
+
+        def rows():
+            for values in chunks():
+                h = {
+                    field.name: related[field.name].get(value)
+                    if field.is_relation
+                    else value
+                    for field, value in zip(fields, values, strict=True)
+                }
+
+                by_service_and_user[h["service"]][h["rendered_by"]] += h["hours"]
+                by_user[h["rendered_by"]] += h["hours"]
+
+                month = h["rendered_on"].replace(day=1)
+                by_service_and_month[h["service"]][month] += h["hours"]
+                by_user_and_month[h["rendered_by"]][month] += h["hours"]
+                by_month[month] += h["hours"]
+
+                yield [
+                    f"{h['service'].title}: {h['description']}",  # __str__
+                    *h.values(),
+                    h["service"].effort_rate,
+                    h["service"].project,
+                    h["invoice_service"].invoice if h["invoice_service"] else None,
+                ]
 
-            month = h.rendered_on.replace(day=1)
-            by_service_and_month[h.service][month] += h.hours
-            by_user_and_month[h.rendered_by][month] += h.hours
-            by_month[month] += h.hours
+        self.add_sheet(slugify(str(LoggedHours._meta.verbose_name_plural)))
+        self.table(
+            [
+                "__str__",
+                *(str(capfirst(field.verbose_name)) for field in fields),
+                capfirst(_("hourly rate")),
+                capfirst(_("project")),
+                capfirst(_("invoice")),
+            ],
+            rows(),
+        )
 
         self.add_sheet(slugify(_("By service and user")))
         users = sorted(
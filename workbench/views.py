@@ -1,4 +1,5 @@
 import datetime as dt
+from collections import defaultdict
 
 from django.apps import apps
 from django.contrib import messages
@@ -20,6 +21,7 @@ from workbench.offers.models import Offer
 from workbench.planning.models import PlannedWork
 from workbench.projects.models import Campaign, Project
 from workbench.tools.history import HISTORY, changes
+from workbench.tools.search import ranked
 from workbench.tools.validation import in_days
 
 
@@ -169,19 +171,28 @@ def search(request):
             sources.extend([
                 Invoice.objects.select_related("project", "owned_by"),
                 RecurringInvoice.objects.all(),
-                Offer.objects.select_related("project", "owned_by").order_by("-pk"),
-                Deal.objects.order_by("-pk"),
+                Offer.objects.select_related("project", "owned_by"),
+                Deal.objects.all(),
             ])
-        results = [
-            {
+        sources = {queryset.model._meta.db_table: queryset for queryset in sources}
+
+        hits = defaultdict(list)
+        for table, id in ranked(q, sources, limit=101):
+            hits[table].append(id)
+
+        # Types with the best matches first
+        order = {table: index for index, table in enumerate(hits)}
+        for table, queryset in sorted(
+            sources.items(), key=lambda item: order.get(item[0], len(order))
+        ):
+            instances = queryset.in_bulk(hits[table]) if hits[table] else {}
+            results.append({
                 "verbose_name_plural": queryset.model._meta.verbose_name_plural,
                 "url": reverse(
                     f"{queryset.model._meta.app_label}_{queryset.model._meta.model_name}_list"
                 ),
-                "results": queryset.search(q)[:101],
-            }
-            for queryset in sources
-        ]
+                "results": [instances[id] for id in hits[table] if id in instances],
+            })
     else:
         messages.error(request, _("Search query missing."))
 
@@ -10,3 +10,8 @@ BASE_DIR = Path(__file__).resolve().parent
 speckenv.read_speckenv(filename=os.environ.get("DOTENV", ".env"))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "workbench.settings")
 application = get_wsgi_application()
+
+from workbench.tools.typeahead import warm  # noqa: E402
+
+
+warm()